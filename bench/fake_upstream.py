@@ -0,0 +1,247 @@
+# bench/fake_upstream.py
+"""
+로컬 업스트림 대역 서버 (부하 테스트용 - 실제 공공 API/쿼터를 쓰지 않음)
+- KMA: getUltraSrtNcst / getVilageFcst / getMidTa / getMidLandFcst
+- AirKorea: getMinuDustFrcstDspth(XML) / getCtprvnRltmMesureDnsty(JSON)
+- odcloud: 도시가스 데이터셋(15040818) / 그 외 데이터셋은 KPX 형태
+- KEPCO: powerUsage/houseAve.do
+- 같은 요청 파라미터면 같은 응답 (파라미터 해시로 난수 시드) -> 캐시/ETag 동작이 실제와 같음
+- 지연/에러율/크기는 env 또는 실행 중 POST /_fake/config 로 변경, provider별로 덮어쓰기 가능
+
+실행 (저장소 루트에서):
+  uvicorn bench.fake_upstream:app --port 9100
+앱 쪽:
+  UPSTREAM_KMA_BASE_URL=http://127.0.0.1:9100 UPSTREAM_AIRKOREA_BASE_URL=http://127.0.0.1:9100
+  UPSTREAM_ODCLOUD_BASE_URL=http://127.0.0.1:9100 UPSTREAM_KEPCO_BASE_URL=http://127.0.0.1:9100
+"""
+import asyncio
+import hashlib
+import os
+import random
+import time
+from datetime import datetime
+
+from fastapi import Body, FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from bench import payloads
+
+FAKE_LATENCY_MS = float(os.getenv("FAKE_LATENCY_MS", "80"))
+FAKE_JITTER_MS = float(os.getenv("FAKE_JITTER_MS", "40"))
+FAKE_ERROR_RATE = float(os.getenv("FAKE_ERROR_RATE", "0"))
+# 응답 항목 수 배율 (1 = 실제 API 와 비슷한 크기)
+FAKE_SIZE = float(os.getenv("FAKE_SIZE", "1"))
+
+PROVIDERS = ("kma", "airkorea", "odcloud", "kepco")
+
+GAS_DATASET = "15040818"
+
+_config = {
+    "latency_ms": FAKE_LATENCY_MS,
+    "jitter_ms": FAKE_JITTER_MS,
+    "error_rate": FAKE_ERROR_RATE,
+    "size": FAKE_SIZE,
+    # provider -> {latency_ms, jitter_ms, error_rate, size} (없는 값은 위 기본값)
+    "providers": {},
+}
+_stats: dict = {}
+_errors = random.Random()
+
+app = FastAPI(title="fake-upstream")
+
+
+def _conf(provider: str) -> dict:
+    return {**_config, **_config["providers"].get(provider, {})}
+
+
+def _rng(request: Request) -> random.Random:
+    # 인증키는 빼고 나머지 파라미터로 시드 -> 같은 요청이면 같은 값
+    items = sorted(
+        (k, v) for k, v in request.query_params.multi_items()
+        if k not in ("authKey", "serviceKey", "apiKey")
+    )
+    raw = request.url.path + repr(items)
+    return random.Random(int(hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16], 16))
+
+
+def _n(base: int, conf: dict) -> int:
+    return max(1, int(base * conf["size"]))
+
+
+async def _begin(provider: str, endpoint: str) -> tuple[dict, Response | None]:
+    """
+    지연 + 에러 주입 -> (설정, 에러 응답 또는 None)
+    """
+    conf = _conf(provider)
+    s = _stats.setdefault(f"{provider}:{endpoint}", {"requests": 0, "errors": 0, "bytes": 0})
+    s["requests"] += 1
+    delay = conf["latency_ms"] + _errors.uniform(-1, 1) * conf["jitter_ms"]
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+    if conf["error_rate"] > 0 and _errors.random() < conf["error_rate"]:
+        s["errors"] += 1
+        return conf, Response("Service Unavailable (fake)", status_code=503, media_type="text/plain")
+    return conf, None
+
+
+def _done(provider: str, endpoint: str, resp: Response) -> Response:
+    _stats[f"{provider}:{endpoint}"]["bytes"] += len(resp.body)
+    return resp
+
+
+def _int(v, default: int) -> int:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return default
+
+
+# =========================
+# KMA
+# =========================
+@app.get("/api/typ02/openApi/VilageFcstInfoService_2.0/getUltraSrtNcst")
+async def ultra_srt_ncst(request: Request):
+    conf, err = await _begin("kma", "ultra_ncst")
+    if err is not None:
+        return err
+    q = request.query_params
+    items = payloads.ultra_ncst_items(
+        _rng(request), q.get("base_date", ""), q.get("base_time", ""), _int(q.get("nx"), 60), _int(q.get("ny"), 127),
+    )
+    body = payloads.kma_body(items, _int(q.get("pageNo"), 1), _int(q.get("numOfRows"), 1000))
+    return _done("kma", "ultra_ncst", JSONResponse(body))
+
+
+@app.get("/api/typ02/openApi/VilageFcstInfoService_2.0/getVilageFcst")
+async def vilage_fcst(request: Request):
+    conf, err = await _begin("kma", "vilage_fcst")
+    if err is not None:
+        return err
+    q = request.query_params
+    items = payloads.vilage_items(
+        _rng(request), q.get("base_date", "20260101"), q.get("base_time", "0500"),
+        _int(q.get("nx"), 60), _int(q.get("ny"), 127), hours=_n(payloads.VILAGE_HOURS, conf),
+    )
+    body = payloads.kma_body(items, _int(q.get("pageNo"), 1), _int(q.get("numOfRows"), 1000))
+    return _done("kma", "vilage_fcst", JSONResponse(body))
+
+
+@app.get("/api/typ02/openApi/MidFcstInfoService/getMidTa")
+async def mid_ta(request: Request):
+    conf, err = await _begin("kma", "mid_ta")
+    if err is not None:
+        return err
+    q = request.query_params
+    item = payloads.mid_ta_item(_rng(request), q.get("regId", ""))
+    return _done("kma", "mid_ta", JSONResponse(payloads.kma_body([item], 1, _int(q.get("numOfRows"), 100))))
+
+
+@app.get("/api/typ02/openApi/MidFcstInfoService/getMidLandFcst")
+async def mid_land_fcst(request: Request):
+    conf, err = await _begin("kma", "mid_land")
+    if err is not None:
+        return err
+    q = request.query_params
+    item = payloads.mid_land_item(_rng(request), q.get("regId", ""))
+    return _done("kma", "mid_land", JSONResponse(payloads.kma_body([item], 1, _int(q.get("numOfRows"), 100))))
+
+
+# =========================
+# AirKorea
+# =========================
+@app.get("/B552584/ArpltnInforInqireSvc/getMinuDustFrcstDspth")
+async def dust_forecast(request: Request):
+    conf, err = await _begin("airkorea", "forecast")
+    if err is not None:
+        return err
+    q = request.query_params
+    try:
+        day = datetime.strptime(q.get("searchDate", ""), "%Y-%m-%d")
+    except ValueError:
+        day = datetime(2026, 1, 1)
+    xml = payloads.dust_forecast_xml(_rng(request), day, q.get("InformCode", "PM10"), days=_n(1, conf))
+    return _done("airkorea", "forecast", Response(xml, media_type="application/xml; charset=utf-8"))
+
+
+@app.get("/B552584/ArpltnInforInqireSvc/getCtprvnRltmMesureDnsty")
+async def dust_realtime(request: Request):
+    conf, err = await _begin("airkorea", "realtime")
+    if err is not None:
+        return err
+    q = request.query_params
+    sido = q.get("sidoName", "서울")
+    stations = payloads.STATIONS_NATIONWIDE if sido == "전국" else payloads.STATIONS_PER_SIDO
+    items = payloads.dust_realtime_items(_rng(request), sido, _n(stations, conf))
+    body = payloads.dust_realtime_body(items, _int(q.get("pageNo"), 1), _int(q.get("numOfRows"), 100))
+    return _done("airkorea", "realtime", JSONResponse(body))
+
+
+# =========================
+# odcloud (도시가스 / KPX)
+# =========================
+@app.get("/api/{dataset:path}")
+async def odcloud(request: Request, dataset: str):
+    gas = dataset.startswith(GAS_DATASET)
+    endpoint = "gas" if gas else "dataset"
+    conf, err = await _begin("odcloud", endpoint)
+    if err is not None:
+        return err
+    q = request.query_params
+    if gas:
+        rows = payloads.gas_rows(random.Random(GAS_DATASET), years=_n(10, conf))
+    else:
+        rows = payloads.kpx_rows(_rng(request), _n(288, conf))
+    body = payloads.odcloud_body(rows, max(1, _int(q.get("page"), 1)), max(1, _int(q.get("perPage"), 10)))
+    return _done("odcloud", endpoint, JSONResponse(body))
+
+
+# =========================
+# KEPCO
+# =========================
+@app.get("/openapi/v1/powerUsage/houseAve.do")
+async def house_ave(request: Request):
+    conf, err = await _begin("kepco", "house_ave")
+    if err is not None:
+        return err
+    q = request.query_params
+    data = payloads.house_ave_data(
+        _rng(request), q.get("year", ""), _int(q.get("month"), 1), q.get("metroCd", "11"), cities=_n(20, conf),
+    )
+    return _done("kepco", "house_ave", JSONResponse({"data": data}))
+
+
+# =========================
+# 제어 (부하 하네스에서 사용)
+# =========================
+@app.get("/_fake/config")
+async def get_config():
+    return _config
+
+
+@app.post("/_fake/config")
+async def set_config(body: dict = Body(...)):
+    """
+    {"latency_ms": 200, "error_rate": 0.1, "providers": {"kma": {"latency_ms": 1000}}}
+    providers 는 통째로 교체 (빈 dict 면 provider별 설정 제거)
+    """
+    for k in ("latency_ms", "jitter_ms", "error_rate", "size"):
+        if k in body:
+            _config[k] = float(body[k])
+    if "providers" in body:
+        _config["providers"] = {
+            p: {k: float(v) for k, v in (body["providers"].get(p) or {}).items()}
+            for p in PROVIDERS if p in body["providers"]
+        }
+    return _config
+
+
+@app.get("/_fake/stats")
+async def get_stats():
+    # 엔드포인트별 호출 수 -> 하네스가 구간 전후 차이로 업스트림 호출 수를 계산
+    return {"time": time.time(), "endpoints": _stats}
+
+
+@app.post("/_fake/reset")
+async def reset_stats():
+    _stats.clear()
+    return {"ok": True}
@@ -0,0 +1,376 @@
+# bench/load.py
+"""
+두 FastAPI 앱(kma-api, energy-api) end-to-end 부하 측정
+- cold: 라우트별 키(파라미터 조합)를 1번씩만 요청 -> miss 경로 (업스트림/DB 적재)
+- warm: 같은 키 집합을 --duration 초 동안 무작위로 반복 -> hit 경로
+- 구간/라우트별 처리량(req/s)과 p50/p95/p99, 상태 코드, 업스트림 호출 수(--fake 가 있으면)
+- 결과는 bench/results/load-<시각>-<git sha>.json 으로 저장, --compare 로 이전 실행과 비교
+
+격자/날짜 키는 --seed 로 옮겨가므로 실행마다 새 키(cold)가 됨
+mid/power/gas 는 키 공간이 작고 DB 에 남으므로 두 번째 실행부터 cold 도 DB 경로
+(완전히 비우려면 --flush-redis + 앱 재시작(L1) + DB 테이블 비우기)
+
+실행 (저장소 루트에서, 앱은 bench/fake_upstream.py 를 보도록 띄운 상태):
+  python -m bench.load run --kma http://127.0.0.1:3000 --energy http://127.0.0.1:8000 \\
+      --fake http://127.0.0.1:9100 --concurrency 32 --duration 30 --compare latest
+  python -m bench.load compare bench/results/a.json bench/results/b.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+from bench import runs
+
+SIDO_ALIASES = (
+    "seoul", "busan", "daegu", "incheon", "gwangju", "daejeon", "ulsan", "sejong", "gyeonggi",
+    "gangwon", "chungbuk", "chungnam", "jeonbuk", "jeonnam", "gyeongbuk", "gyeongnam", "jeju",
+)
+METRO_CODES = ("11", "26", "27", "28", "29", "30", "31", "36", "41", "42", "43", "44", "45", "46", "47", "48", "50")
+MID_LAND_REG_IDS = (
+    "11B00000", "11D10000", "11D20000", "11C20000", "11C10000",
+    "11F20000", "11F10000", "11H10000", "11H20000", "11G00000",
+)
+MID_TEMP_REG_IDS = (
+    "11B10101", "11B20201", "11D10301", "11C20401", "11C10301",
+    "11F20501", "11F10201", "11H10701", "11H20201", "11G00201",
+)
+
+
+def _grid(i: int, seed: int) -> dict:
+    # 격자 전체(149x253)에서 seed 만큼 밀어서 겹치지 않게
+    n = (seed * 1009 + i) % (149 * 253)
+    return {"nx": n % 149 + 1, "ny": n // 149 + 1}
+
+
+def _past_month(i: int) -> tuple[int, int]:
+    d = date.today().replace(day=1)
+    m = d.year * 12 + d.month - 2 - i  # 지난달부터 거꾸로
+    return m // 12, m % 12 + 1
+
+
+# (앱, 라우트 이름, 경로, 키 수 상한, i, seed -> 쿼리 파라미터)
+ROUTES = [
+    ("kma", "/weather/ultra", "/weather/ultra", None, _grid),
+    ("kma", "/weather/short", "/weather/short", None, _grid),
+    ("kma", "/weather/mid/land", "/weather/mid/land", len(MID_LAND_REG_IDS),
+     lambda i, seed: {"regId": MID_LAND_REG_IDS[i]}),
+    ("kma", "/weather/mid/temp", "/weather/mid/temp", len(MID_TEMP_REG_IDS),
+     lambda i, seed: {"regId": MID_TEMP_REG_IDS[i]}),
+    ("kma", "/dust/seoul", "/dust/seoul", 7,
+     lambda i, seed: {"search_date": (date.today() - timedelta(days=(seed + i) % 7)).isoformat()}),
+    ("kma", "/dust/{sido}", "/dust/{sido}", len(SIDO_ALIASES),
+     lambda i, seed: {"sido": SIDO_ALIASES[i]}),
+    ("energy", "/power/monthly", "/power/monthly", len(METRO_CODES) * 24,
+     lambda i, seed: dict(zip(("year", "month"), _past_month(i // len(METRO_CODES))),
+                          metroCd=METRO_CODES[i % len(METRO_CODES)])),
+    ("energy", "/gas/sido/year", "/gas/sido/year", len(METRO_CODES) * 10,
+     lambda i, seed: {"year": date.today().year - 2 - i // len(METRO_CODES),
+                      "regionCode": METRO_CODES[i % len(METRO_CODES)]}),
+    ("energy", "/kpx/now", "/kpx/now", 20,
+     lambda i, seed: {"page": i + 1, "perPage": 10}),
+]
+
+
+def _percentile(sorted_values: list, q: float):
+    # 선형 보간 (numpy.percentile 기본값과 같은 방식)
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return round(sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo), 2)
+
+
+def _targets(args) -> list[tuple[str, str, list[str]]]:
+    """
+    -> [(라우트 이름, base url, [요청 URL ...])]
+    """
+    bases = {"kma": args.kma, "energy": args.energy}
+    out = []
+    for app, name, path, limit, params in ROUTES:
+        base = bases[app]
+        if not base or (args.route and name not in args.route):
+            continue
+        n = args.keys if limit is None else min(args.keys, limit)
+        urls = []
+        for i in range(n):
+            p = params(i, args.seed)
+            url = path
+            if "{sido}" in url:
+                url = url.replace("{sido}", p.pop("sido"))
+            urls.append(str(httpx.URL(base.rstrip("/") + url, params=p)))
+        out.append((name, base, urls))
+    return out
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: dict = {}  # 라우트 -> [(ms, status, bytes)]
+
+    def add(self, route: str, ms: float, status, size: int):
+        self.samples.setdefault(route, []).append((ms, status, size))
+
+    def summary(self, elapsed: float) -> dict:
+        routes = {}
+        total = []
+        for route, rows in sorted(self.samples.items()):
+            routes[route] = self._stats(rows, elapsed)
+            total.extend(rows)
+        return {"elapsed_s": round(elapsed, 2), "total": self._stats(total, elapsed), "routes": routes}
+
+    @staticmethod
+    def _stats(rows: list, elapsed: float) -> dict:
+        ms = sorted(r[0] for r in rows)
+        status: dict = {}
+        for _, s, _ in rows:
+            status[str(s)] = status.get(str(s), 0) + 1
+        errors = sum(n for s, n in status.items() if not s.isdigit() or int(s) >= 400)
+        return {
+            "count": len(rows),
+            "errors": errors,
+            "status": status,
+            "rps": round(len(rows) / elapsed, 1) if elapsed > 0 else None,
+            "mean_ms": round(sum(ms) / len(ms), 2) if ms else None,
+            "p50_ms": _percentile(ms, 0.5),
+            "p95_ms": _percentile(ms, 0.95),
+            "p99_ms": _percentile(ms, 0.99),
+            "max_ms": round(ms[-1], 2) if ms else None,
+            "bytes": sum(r[2] for r in rows),
+        }
+
+
+async def _request(client: httpx.AsyncClient, rec: Recorder, route: str, url: str):
+    t0 = time.perf_counter()
+    try:
+        r = await client.get(url)
+        status, size = r.status_code, len(r.content)
+    except httpx.HTTPError as e:
+        status, size = type(e).__name__, 0
+    rec.add(route, (time.perf_counter() - t0) * 1000, status, size)
+
+
+async def _fake_stats(client: httpx.AsyncClient, fake: str | None) -> dict | None:
+    if not fake:
+        return None
+    try:
+        r = await client.get(fake.rstrip("/") + "/_fake/stats")
+        return r.json()["endpoints"]
+    except Exception:
+        return None
+
+
+def _upstream_delta(before: dict | None, after: dict | None) -> dict | None:
+    if before is None or after is None:
+        return None
+    out = {}
+    for k, v in after.items():
+        n = v["requests"] - before.get(k, {}).get("requests", 0)
+        if n:
+            out[k] = n
+    return out
+
+
+async def _cold(client, targets, concurrency: int) -> tuple[Recorder, float]:
+    # 모든 (라우트, 키) 를 1번씩, 섞어서 동시에
+    jobs = [(name, url) for name, _, urls in targets for url in urls]
+    random.Random(0).shuffle(jobs)
+    queue = iter(jobs)
+    rec = Recorder()
+
+    async def _worker():
+        for name, url in queue:
+            await _request(client, rec, name, url)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    return rec, time.perf_counter() - t0
+
+
+async def _warm(client, targets, concurrency: int, duration: float) -> tuple[Recorder, float]:
+    # 같은 키 집합을 closed-loop 로 반복 (워커마다 응답 받으면 바로 다음 요청)
+    jobs = [(name, url) for name, _, urls in targets for url in urls]
+    rec = Recorder()
+    deadline = time.perf_counter() + duration
+
+    async def _worker(n: int):
+        rnd = random.Random(n)
+        while time.perf_counter() < deadline:
+            name, url = rnd.choice(jobs)
+            await _request(client, rec, name, url)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_worker(n) for n in range(concurrency)))
+    return rec, time.perf_counter() - t0
+
+
+async def _flush_redis(url: str, prefixes: list[str]) -> int:
+    # 응답 캐시만 지움 (metrics/quota 키는 남김)
+    from redis.asyncio import Redis
+
+    r = Redis.from_url(url)
+    deleted = 0
+    try:
+        for prefix in prefixes:
+            batch = []
+            async for k in r.scan_iter(match=f"{prefix}:*", count=1000):
+                if b":metrics:" in k:
+                    continue
+                batch.append(k)
+                if len(batch) >= 500:
+                    deleted += await r.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await r.unlink(*batch)
+    finally:
+        await r.aclose()
+    return deleted
+
+
+async def run(args) -> dict:
+    targets = _targets(args)
+    if not targets:
+        raise SystemExit("no routes to run (need --kma and/or --energy)")
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    headers = {"Accept-Encoding": "gzip"} if args.gzip else {}
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout, headers=headers) as client:
+        for _, base, _ in targets:
+            r = await client.get(base.rstrip("/") + "/health")
+            r.raise_for_status()
+        if args.fake:
+            await client.post(args.fake.rstrip("/") + "/_fake/config", json=json.loads(args.fake_config))
+
+        flushed = None
+        if args.flush_redis:
+            flushed = await _flush_redis(args.flush_redis, args.redis_prefix)
+
+        phases = {}
+        for phase in ("cold", "warm"):
+            before = await _fake_stats(client, args.fake)
+            if phase == "cold":
+                rec, elapsed = await _cold(client, targets, args.concurrency)
+            else:
+                rec, elapsed = await _warm(client, targets, args.concurrency, args.duration)
+            phases[phase] = {
+                **rec.summary(elapsed),
+                "upstream_calls": _upstream_delta(before, await _fake_stats(client, args.fake)),
+            }
+
+    return {
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "tag": args.tag,
+        "git": runs.git_info(),
+        "config": {
+            "kma": args.kma,
+            "energy": args.energy,
+            "fake": args.fake,
+            "fake_config": json.loads(args.fake_config) if args.fake else None,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "keys": args.keys,
+            "seed": args.seed,
+            "gzip": args.gzip,
+            "flushed_keys": flushed,
+            "routes": {name: len(urls) for name, _, urls in targets},
+        },
+        "phases": phases,
+    }
+
+
+def _fmt(v, width: int = 8) -> str:
+    return f"{'-' if v is None else v:>{width}}"
+
+
+def print_result(res: dict) -> None:
+    git = res["git"]
+    print(f"# {res['started']}  git={git['sha']}{'+dirty' if git['dirty'] else ''}  tag={res['tag'] or '-'}")
+    for phase, p in res["phases"].items():
+        print(f"\n[{phase}] {p['elapsed_s']}s  upstream={json.dumps(p.get('upstream_calls'), ensure_ascii=False)}")
+        print(f"{'route':<22}{'n':>7}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+        for route, s in [*p["routes"].items(), ("TOTAL", p["total"])]:
+            print(f"{route:<22}{s['count']:>7}{s['errors']:>6}{_fmt(s['rps'], 9)}"
+                  f"{_fmt(s['p50_ms'], 9)}{_fmt(s['p95_ms'], 9)}{_fmt(s['p99_ms'], 9)}{_fmt(s['max_ms'], 9)}")
+
+
+def print_compare(old: dict, new: dict) -> None:
+    """
+    라우트별 rps / p50 / p95 / p99 변화 (지연은 + 가 나빠짐, rps 는 + 가 좋아짐)
+    """
+    print(f"# compare {old['git']['sha']} ({old['started']}) -> {new['git']['sha']} ({new['started']})")
+    for phase, p in new["phases"].items():
+        q = old.get("phases", {}).get(phase)
+        if not q:
+            continue
+        print(f"\n[{phase}]")
+        print(f"{'route':<22}{'rps':>18}{'p50':>18}{'p95':>18}{'p99':>18}")
+        rows = [*p["routes"].items(), ("TOTAL", p["total"])]
+        for route, s in rows:
+            o = q["total"] if route == "TOTAL" else q["routes"].get(route)
+            if not o:
+                continue
+            cells = [
+                f"{_fmt(s[k], 9)}{runs.pct(s[k], o[k]):>9}"
+                for k in ("rps", "p50_ms", "p95_ms", "p99_ms")
+            ]
+            print(f"{route:<22}{''.join(cells)}")
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m bench.load")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="부하 실행 + 결과 저장")
+    r.add_argument("--kma", default=os.getenv("BENCH_KMA_URL", "http://127.0.0.1:3000"))
+    r.add_argument("--energy", default=os.getenv("BENCH_ENERGY_URL", "http://127.0.0.1:8000"))
+    r.add_argument("--fake", default=os.getenv("BENCH_FAKE_URL"), help="fake_upstream 주소 (업스트림 호출 수 집계)")
+    r.add_argument("--fake-config", default="{}", help='fake_upstream 설정 JSON (예: \'{"latency_ms": 200}\')')
+    r.add_argument("--route", action="append", help="이 라우트만 (반복 가능, 예: /weather/ultra)")
+    r.add_argument("--concurrency", type=int, default=32)
+    r.add_argument("--duration", type=float, default=30, help="warm 구간 길이(초)")
+    r.add_argument("--keys", type=int, default=50, help="라우트별 키 수 (상한은 라우트별 키 공간)")
+    r.add_argument("--seed", type=int, default=int(time.time()) // 60, help="격자/날짜 키 이동값")
+    r.add_argument("--timeout", type=float, default=30)
+    r.add_argument("--gzip", action="store_true", help="Accept-Encoding: gzip 으로 요청")
+    r.add_argument("--flush-redis", metavar="REDIS_URL", help="시작 전 응답 캐시 키 삭제")
+    r.add_argument("--redis-prefix", action="append", default=None, help="삭제할 키 prefix (기본 weather, energy)")
+    r.add_argument("--tag", help="결과 파일 이름/메모용")
+    r.add_argument("--out", help="결과 파일 경로 (기본 bench/results/load-<시각>-<sha>.json)")
+    r.add_argument("--compare", help="비교 대상 결과 파일 또는 latest")
+
+    c = sub.add_parser("compare", help="결과 파일 2개 비교")
+    c.add_argument("old")
+    c.add_argument("new")
+
+    args = ap.parse_args(argv)
+
+    if args.cmd == "compare":
+        print_compare(runs.load(args.old), runs.load(args.new))
+        return
+
+    args.redis_prefix = args.redis_prefix or ["weather", "energy"]
+    res = asyncio.run(run(args))
+
+    out = runs.save(res, "load", args.tag, args.out)
+
+    print_result(res)
+    print(f"\nsaved: {out}")
+
+    if args.compare:
+        base = runs.latest("load", exclude=out) if args.compare == "latest" else Path(args.compare)
+        if base is None:
+            print("no previous result to compare", file=sys.stderr)
+        else:
+            print()
+            print_compare(runs.load(base), res)
+
+
+if __name__ == "__main__":
+    main()
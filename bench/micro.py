@@ -0,0 +1,263 @@
+# bench/micro.py
+"""
+응답 가공/파싱/캐시 키 hot path 마이크로벤치 (요청마다 도는 함수들)
+- kma-api: simplify_short_fcst, simplify_ultra_ncst, parse_seoul_realtime, parse_seoul_grade,
+  make_key / canonical_key / dust _cache_key, 응답 직렬화(cache.dumps / pack)
+- energy-api: kpx _strip_cache_fields / _make_cache_key, KPX 본문 dumps / pack / loads
+- 입력은 bench/payloads 의 합성 데이터: 실제 크기(typical)와 최악 크기(worst)
+  (단기예보 3일치 / numOfRows 상한, 서울 / 전국 측정소, KPX perPage=10 / 1000)
+- 측정: timeit autorange 후 REPEAT 번 중 최솟값 -> ops/sec, us/op
+  할당: tracemalloc 기준 호출 1번의 최대 사용량(peak, 임시 객체 포함)과 결과로 남는 양(retained)
+  (CPython 에는 호출당 할당 횟수를 세는 공개 API 가 없어 바이트로 봄)
+- 두 앱 모두 패키지 이름이 app 이라 앱별로 하위 프로세스에서 실행
+
+실행 (저장소 루트에서, 앱 의존성 설치된 환경):
+  python -m bench.micro run --compare latest
+  python -m bench.micro run --app kma --filter short
+  python -m bench.micro compare bench/results/micro-a.json bench/results/micro-b.json
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from bench import payloads, runs
+
+ROOT = Path(__file__).resolve().parent.parent
+APPS = {"kma": ROOT / "kma-api", "energy": ROOT / "energy-api"}
+
+REPEAT = int(os.getenv("MICRO_REPEAT", "5"))
+
+
+def _size_kib(obj) -> float:
+    if isinstance(obj, str):
+        return round(len(obj.encode("utf-8")) / 1024, 1)
+    return round(len(json.dumps(obj, ensure_ascii=False)) / 1024, 1)
+
+
+# =========================
+# 케이스: [(이름, 크기, 입력 KiB, fn)]
+# =========================
+def kma_cases() -> list:
+    from app.routers.dust import _cache_key
+    from app.routers.short_fcst import simplify_short_fcst
+    from app.routers.ultra_ncst import simplify_ultra_ncst
+    from app.services import cache
+    from app.services.air_parser import parse_seoul_grade, parse_seoul_realtime
+
+    cache.CACHE_COMPRESS = True
+    rnd = random.Random(0)
+    day = datetime(2026, 10, 18)
+    cases = []
+
+    ultra = payloads.kma_body(payloads.ultra_ncst_items(rnd, "20261018", "1400", 60, 127))
+    cases.append(("simplify_ultra_ncst", "typical", _size_kib(ultra), lambda: simplify_ultra_ncst(ultra)))
+
+    # 3일치 전체 / numOfRows=1000 을 꽉 채운 응답
+    short_sizes = {
+        "3day": payloads.VILAGE_HOURS,
+        "worst": -(-payloads.VILAGE_MAX_ROWS // 12),
+    }
+    for label, hours in short_sizes.items():
+        body = payloads.kma_body(
+            payloads.vilage_items(rnd, "20261018", "0500", 60, 127, hours=hours), num_rows=payloads.VILAGE_MAX_ROWS,
+        )
+        cases.append((
+            "simplify_short_fcst", label, _size_kib(body),
+            lambda body=body: simplify_short_fcst(body, 60, 127),
+        ))
+        simplified = simplify_short_fcst(body, 60, 127)
+        cases.append(("cache.dumps(short)", label, _size_kib(simplified), lambda v=simplified: cache.dumps(v)))
+        cases.append(("cache.pack(short,gzip)", label, _size_kib(simplified), lambda v=simplified: cache.pack(v)))
+
+    # 서울 시도 조회 / '전국' 조회(전체 측정소)
+    realtime_sizes = {"seoul": payloads.STATIONS_PER_SIDO, "worst": payloads.STATIONS_NATIONWIDE}
+    for label, stations in realtime_sizes.items():
+        items = payloads.dust_realtime_items(rnd, "서울", stations)
+        body = payloads.dust_realtime_body(items, num_rows=len(items))
+        cases.append((
+            "parse_seoul_realtime", label, _size_kib(body),
+            lambda body=body: parse_seoul_realtime(body, "PM10"),
+        ))
+        cases.append((
+            "parse_seoul_realtime(station)", label, _size_kib(body),
+            lambda body=body, st=items[-1]["stationName"]: parse_seoul_realtime(body, "PM25", station=st),
+        ))
+
+    # searchDate 하루치 발표 / 7일치 발표가 섞인 문서
+    for label, days in {"1day": 1, "worst": 7}.items():
+        xml = payloads.dust_forecast_xml(rnd, day, "PM10", days=days)
+        cases.append(("parse_seoul_grade", label, _size_kib(xml), lambda xml=xml: parse_seoul_grade(xml, "2026-10-18")))
+
+    cases.append(("cache.make_key", "typical", 0.0,
+                  lambda: cache.make_key("weather", "ultra?nx=60&ny=127&base_date=20261018&base_time=1400")))
+    cases.append(("cache.canonical_key", "typical", 0.0,
+                  lambda: cache.canonical_key("weather", "ultra", 60, 127, "20261018", "1400")))
+    cases.append(("dust._cache_key", "typical", 0.0, lambda: _cache_key("seoul", "2026-10-18", "중구")))
+    return cases
+
+
+def energy_cases() -> list:
+    from app.services import cache
+    from app.services.kpx_client import _make_cache_key, _strip_cache_fields
+
+    cache.CACHE_COMPRESS = True
+    rnd = random.Random(0)
+    cases = []
+
+    for label, per_page in {"perPage=10": 10, "perPage=1000": payloads.KPX_PER_PAGE_MAX}.items():
+        body = payloads.odcloud_body(payloads.kpx_rows(rnd, per_page), 1, per_page)
+        size = _size_kib(body)
+        # 캐시에 남아 있던 예전 필드가 붙은 값
+        tagged = {**body, "cache": True, "cache_key": "energy-kpx:abc"}
+        cases.append(("kpx._strip_cache_fields", label, size, lambda v=tagged: _strip_cache_fields(v)))
+        cases.append(("cache.dumps(kpx)", label, size, lambda v=body: cache.dumps(v)))
+        cases.append(("cache.pack(kpx,gzip)", label, size, lambda v=body: cache.pack(v)))
+        packed = cache.pack(body)
+        cases.append(("cache.loads(kpx,gzip)", label, size, lambda b=packed: cache.loads(b)))
+
+    cases.append(("kpx._make_cache_key", "typical", 0.0,
+                  lambda: _make_cache_key("energy-kpx", "kpx_now?page=1&perPage=1000")))
+    cases.append(("cache.make_key", "typical", 0.0,
+                  lambda: cache.make_key("energy", "power?year=2024&month=12&metroCd=11")))
+    return cases
+
+
+CASES = {"kma": kma_cases, "energy": energy_cases}
+
+
+# =========================
+# 측정
+# =========================
+def measure(fn) -> dict:
+    fn()  # 지연 import / 캐시 워밍
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=REPEAT, number=number)) / number
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = fn()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    return {
+        "ops_per_sec": round(1 / best, 1),
+        "us_per_op": round(best * 1e6, 3),
+        "peak_kib": round((peak - base) / 1024, 1),
+        "retained_kib": round((current - base) / 1024, 1),
+    }
+
+
+def run_app(app: str, pattern: str | None) -> list[dict]:
+    out = []
+    for name, size, input_kib, fn in CASES[app]():
+        if pattern and pattern not in name:
+            continue
+        out.append({"app": app, "name": name, "size": size, "input_kib": input_kib, **measure(fn)})
+    return out
+
+
+def _spawn(app: str, pattern: str | None) -> list[dict]:
+    # 앱 디렉터리를 sys.path 앞에 -> 그 앱의 app 패키지를 import
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(APPS[app]), str(ROOT), os.environ.get("PYTHONPATH", "")])}
+    cmd = [sys.executable, "-m", "bench.micro", "child", "--app", app]
+    if pattern:
+        cmd += ["--filter", pattern]
+    p = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+    if p.returncode != 0:
+        raise SystemExit(f"{app} benchmark failed:\n{p.stderr}")
+    return json.loads(p.stdout)
+
+
+def print_result(res: dict) -> None:
+    git = res["git"]
+    print(f"# {res['started']}  git={git['sha']}{'+dirty' if git['dirty'] else ''}  python={res['python']}")
+    print(f"{'app':<7}{'case':<31}{'size':<13}{'in KiB':>8}{'ops/s':>12}{'us/op':>11}{'peak KiB':>10}{'kept KiB':>10}")
+    for c in res["cases"]:
+        print(f"{c['app']:<7}{c['name']:<31}{c['size']:<13}{c['input_kib']:>8}{c['ops_per_sec']:>12}"
+              f"{c['us_per_op']:>11}{c['peak_kib']:>10}{c['retained_kib']:>10}")
+
+
+def print_compare(old: dict, new: dict) -> None:
+    """
+    케이스별 ops/s (+ 가 좋아짐) / peak KiB (+ 가 나빠짐) 변화
+    """
+    print(f"# compare {old['git']['sha']} ({old['started']}) -> {new['git']['sha']} ({new['started']})")
+    before = {(c["app"], c["name"], c["size"]): c for c in old["cases"]}
+    print(f"{'app':<7}{'case':<31}{'size':<13}{'ops/s':>21}{'peak KiB':>19}")
+    for c in new["cases"]:
+        o = before.get((c["app"], c["name"], c["size"]))
+        if not o:
+            continue
+        print(f"{c['app']:<7}{c['name']:<31}{c['size']:<13}"
+              f"{c['ops_per_sec']:>12}{runs.pct(c['ops_per_sec'], o['ops_per_sec']):>9}"
+              f"{c['peak_kib']:>10}{runs.pct(c['peak_kib'], o['peak_kib']):>9}")
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m bench.micro")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="마이크로벤치 실행 + 결과 저장")
+    r.add_argument("--app", choices=[*APPS, "all"], default="all")
+    r.add_argument("--filter", help="케이스 이름에 이 문자열이 있는 것만")
+    r.add_argument("--tag", help="결과 파일 이름/메모용")
+    r.add_argument("--out", help="결과 파일 경로 (기본 bench/results/micro-<시각>-<sha>.json)")
+    r.add_argument("--compare", help="비교 대상 결과 파일 또는 latest")
+
+    # 하위 프로세스용 (앱 하나, 결과 JSON 을 stdout 으로)
+    ch = sub.add_parser("child")
+    ch.add_argument("--app", choices=list(APPS), required=True)
+    ch.add_argument("--filter")
+
+    c = sub.add_parser("compare", help="결과 파일 2개 비교")
+    c.add_argument("old")
+    c.add_argument("new")
+
+    args = ap.parse_args(argv)
+
+    if args.cmd == "child":
+        print(json.dumps(run_app(args.app, args.filter), ensure_ascii=False))
+        return
+    if args.cmd == "compare":
+        print_compare(runs.load(args.old), runs.load(args.new))
+        return
+
+    apps = list(APPS) if args.app == "all" else [args.app]
+    res = {
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "tag": args.tag,
+        "git": runs.git_info(),
+        "python": sys.version.split()[0],
+        "repeat": REPEAT,
+        "cases": [c for app in apps for c in _spawn(app, args.filter)],
+    }
+    out = runs.save(res, "micro", args.tag, args.out)
+
+    print_result(res)
+    print(f"\nsaved: {out}")
+
+    if args.compare:
+        base = runs.latest("micro", exclude=out) if args.compare == "latest" else Path(args.compare)
+        if base is None:
+            print("no previous result to compare", file=sys.stderr)
+        else:
+            print()
+            print_compare(runs.load(base), res)
+
+
+if __name__ == "__main__":
+    main()
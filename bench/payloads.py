@@ -0,0 +1,245 @@
+# bench/payloads.py
+"""
+업스트림 응답과 같은 형태의 합성 데이터 (표준 라이브러리만 사용)
+- fake_upstream(부하 테스트 대역 서버)과 micro(마이크로벤치)가 같은 데이터를 씀
+- 난수는 호출부가 넘기는 random.Random -> 같은 시드면 같은 값
+"""
+import random
+from datetime import datetime, timedelta
+
+SIDO = (
+    "서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종", "경기",
+    "강원", "충북", "충남", "전북", "전남", "경북", "경남", "제주",
+)
+
+# KEPCO metroCd -> 시도명
+METRO = {
+    "11": "서울특별시", "26": "부산광역시", "27": "대구광역시", "28": "인천광역시",
+    "29": "광주광역시", "30": "대전광역시", "31": "울산광역시", "36": "세종특별자치시",
+    "41": "경기도", "42": "강원특별자치도", "43": "충청북도", "44": "충청남도",
+    "45": "전북특별자치도", "46": "전라남도", "47": "경상북도", "48": "경상남도",
+    "50": "제주특별자치도",
+}
+
+GRADES = ("좋음", "보통", "나쁨", "매우나쁨")
+WF = ("맑음", "구름많음", "구름많고 비", "흐림", "흐리고 비", "흐리고 비/눈")
+
+# 실제 API 기준 크기
+VILAGE_HOURS = 70          # 단기예보 1회 발표 = 약 3일치 시간별 (시간당 12개 항목)
+VILAGE_MAX_ROWS = 1000     # 앱이 요청하는 numOfRows
+STATIONS_PER_SIDO = 40
+STATIONS_NATIONWIDE = 660  # 시도 '전국' 조회 시 측정소 수
+KPX_PER_PAGE_MAX = 1000
+
+
+def kma_body(items: list, page_no: int = 1, num_rows: int = 1000) -> dict:
+    return {
+        "response": {
+            "header": {"resultCode": "00", "resultMsg": "NORMAL_SERVICE"},
+            "body": {
+                "dataType": "JSON",
+                "items": {"item": items[(page_no - 1) * num_rows: page_no * num_rows]},
+                "pageNo": page_no,
+                "numOfRows": num_rows,
+                "totalCount": len(items),
+            },
+        }
+    }
+
+
+def ultra_ncst_items(rnd: random.Random, base_date: str, base_time: str, nx: int, ny: int) -> list[dict]:
+    base = {"baseDate": base_date, "baseTime": base_time, "nx": nx, "ny": ny}
+    values = {
+        "T1H": round(rnd.uniform(-10, 33), 1), "RN1": rnd.choice((0, 0, 0, 0.5, 2)),
+        "UUU": round(rnd.uniform(-5, 5), 1), "VVV": round(rnd.uniform(-5, 5), 1),
+        "REH": rnd.randint(20, 100), "PTY": rnd.choice((0, 0, 0, 1)),
+        "VEC": rnd.randint(0, 359), "WSD": round(rnd.uniform(0, 12), 1),
+    }
+    return [{**base, "category": c, "obsrValue": str(v)} for c, v in values.items()]
+
+
+def vilage_items(
+    rnd: random.Random, base_date: str, base_time: str, nx: int, ny: int, hours: int = VILAGE_HOURS,
+) -> list[dict]:
+    # 발표 +4시간부터 시간 단위, 06시 TMN / 15시 TMX 추가
+    try:
+        t = datetime.strptime(base_date + base_time, "%Y%m%d%H%M")
+    except ValueError:
+        t = datetime(2026, 1, 1, 5)
+    items = []
+    temp = rnd.uniform(-5, 25)
+    for h in range(hours):
+        ft = t + timedelta(hours=4 + h)
+        temp += rnd.uniform(-1.5, 1.5)
+        fd, fh = ft.strftime("%Y%m%d"), ft.strftime("%H00")
+        values = {
+            "TMP": round(temp), "UUU": round(rnd.uniform(-5, 5), 1), "VVV": round(rnd.uniform(-5, 5), 1),
+            "VEC": rnd.randint(0, 359), "WSD": round(rnd.uniform(0, 10), 1), "SKY": rnd.choice((1, 3, 4)),
+            "PTY": rnd.choice((0, 0, 0, 1, 3)), "POP": rnd.choice((0, 10, 20, 30, 60, 80)),
+            "WAV": 0, "PCP": rnd.choice(("강수없음", "강수없음", "1.0mm")),
+            "REH": rnd.randint(20, 100), "SNO": "적설없음",
+        }
+        if fh == "0600":
+            values["TMN"] = round(temp - 3, 1)
+        if fh == "1500":
+            values["TMX"] = round(temp + 3, 1)
+        for c, v in values.items():
+            items.append({"baseDate": base_date, "baseTime": base_time, "category": c,
+                          "fcstDate": fd, "fcstTime": fh, "fcstValue": str(v), "nx": nx, "ny": ny})
+    return items
+
+
+def mid_ta_item(rnd: random.Random, reg_id: str) -> dict:
+    item = {"regId": reg_id}
+    for d in range(4, 11):
+        lo = rnd.randint(-10, 20)
+        hi = lo + rnd.randint(4, 12)
+        item.update({
+            f"taMin{d}": lo, f"taMin{d}Low": 1, f"taMin{d}High": 1,
+            f"taMax{d}": hi, f"taMax{d}Low": 1, f"taMax{d}High": 1,
+        })
+    return item
+
+
+def mid_land_item(rnd: random.Random, reg_id: str) -> dict:
+    item = {"regId": reg_id}
+    for d in range(4, 11):
+        if d <= 7:
+            item.update({
+                f"rnSt{d}Am": rnd.choice((0, 10, 20, 30, 60)), f"rnSt{d}Pm": rnd.choice((0, 10, 20, 30, 60)),
+                f"wf{d}Am": rnd.choice(WF), f"wf{d}Pm": rnd.choice(WF),
+            })
+        else:
+            item.update({f"rnSt{d}": rnd.choice((0, 10, 20, 30, 60)), f"wf{d}": rnd.choice(WF)})
+    return item
+
+
+def dust_forecast_xml(rnd: random.Random, day: datetime, code: str = "PM10", days: int = 1) -> str:
+    """
+    getMinuDustFrcstDspth XML: 하루 4번 발표(5/11/17/23시), 발표마다 오늘~모레 (최신 발표가 문서 앞쪽)
+    days: 며칠치 발표를 담을지 (searchDate 없이 조회하면 여러 날이 섞여 옴)
+    """
+    parts = []
+    for back in range(days):
+        issued = day - timedelta(days=back)
+        for hour in (23, 17, 11, 5):
+            for d in range(3):
+                target = (issued + timedelta(days=d)).strftime("%Y-%m-%d")
+                grade = ",".join(f"{s} : {rnd.choice(GRADES[:3])}" for s in SIDO)
+                parts.append(
+                    "<item>"
+                    f"<informCode>{code}</informCode>"
+                    f"<informData>{target}</informData>"
+                    f"<informGrade>{grade}</informGrade>"
+                    f"<dataTime>{issued:%Y-%m-%d} {hour}시 발표</dataTime>"
+                    "<informOverall>○ [미세먼지] 전 권역이 '좋음'∼'보통'으로 예상됩니다.</informOverall>"
+                    "<informCause>○ [미세먼지] 원활한 대기 확산으로 대기질이 대체로 청정할 것으로 예상됩니다.</informCause>"
+                    "<actionKnack/><imageUrl1>https://example.invalid/fake.gif</imageUrl1>"
+                    "</item>"
+                )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        "<response><header><resultCode>00</resultCode><resultMsg>NORMAL_CODE</resultMsg></header>"
+        f"<body><items>{''.join(parts)}</items>"
+        f"<numOfRows>{len(parts)}</numOfRows><pageNo>1</pageNo><totalCount>{len(parts)}</totalCount>"
+        "</body></response>"
+    )
+
+
+def dust_realtime_items(rnd: random.Random, sido: str, stations: int = STATIONS_PER_SIDO) -> list[dict]:
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    items = []
+    for i in range(stations):
+        missing = rnd.random() < 0.05
+        items.append({
+            "stationName": f"{sido}측정소{i + 1}",
+            "sidoName": sido,
+            "dataTime": f"{now:%Y-%m-%d %H:%M}",
+            "pm10Value": "-" if missing else str(rnd.randint(5, 120)),
+            "pm25Value": "-" if missing else str(rnd.randint(2, 70)),
+            "so2Value": f"{rnd.uniform(0.001, 0.006):.3f}",
+            "coValue": f"{rnd.uniform(0.2, 0.8):.1f}",
+            "o3Value": f"{rnd.uniform(0.005, 0.06):.3f}",
+            "no2Value": f"{rnd.uniform(0.005, 0.05):.3f}",
+            "khaiValue": str(rnd.randint(30, 150)),
+            "pm10Grade": str(rnd.randint(1, 3)),
+            "pm25Grade": str(rnd.randint(1, 3)),
+            "mangName": "도시대기",
+        })
+    return items
+
+
+def dust_realtime_body(items: list, page_no: int = 1, num_rows: int = 100) -> dict:
+    return {
+        "response": {
+            "body": {
+                "totalCount": len(items),
+                "items": items[(page_no - 1) * num_rows: page_no * num_rows],
+                "pageNo": page_no,
+                "numOfRows": num_rows,
+            },
+            "header": {"resultMsg": "NORMAL_CODE", "resultCode": "00"},
+        }
+    }
+
+
+def gas_rows(rnd: random.Random, years: int = 10, last_year: int = 2024) -> list[dict]:
+    rows = []
+    for y in range(last_year - years + 1, last_year + 1):
+        for m in range(1, 13):
+            for s in SIDO:
+                uses = {
+                    "가정용": rnd.randint(10_000, 900_000),
+                    "일반용": rnd.randint(5_000, 300_000),
+                    "업무용": rnd.randint(5_000, 300_000),
+                    "산업용": rnd.randint(1_000, 800_000),
+                    "수송용": rnd.randint(100, 50_000),
+                }
+                rows.append({"연도": y, "월": m, "시도": s, **uses, "합계": sum(uses.values())})
+    return rows
+
+
+def kpx_rows(rnd: random.Random, n: int) -> list[dict]:
+    now = datetime.now().replace(second=0, microsecond=0)
+    rows = []
+    for i in range(n):
+        t = now - timedelta(minutes=5 * i)
+        demand = rnd.randint(55_000, 90_000)
+        rows.append({
+            "기준일시": f"{t:%Y-%m-%d %H:%M}",
+            "공급능력(MW)": demand + rnd.randint(8_000, 20_000),
+            "현재수요(MW)": demand,
+            "최대예측수요(MW)": demand + rnd.randint(0, 5_000),
+            "공급예비력(MW)": rnd.randint(8_000, 20_000),
+            "공급예비율(%)": round(rnd.uniform(8, 25), 2),
+        })
+    return rows
+
+
+def odcloud_body(rows: list, page: int, per_page: int) -> dict:
+    data = rows[(page - 1) * per_page: page * per_page]
+    return {
+        "page": page,
+        "perPage": per_page,
+        "totalCount": len(rows),
+        "currentCount": len(data),
+        "matchCount": len(rows),
+        "data": data,
+    }
+
+
+def house_ave_data(rnd: random.Random, year: str, month: int, metro: str, cities: int = 20) -> list[dict]:
+    name = METRO.get(metro, metro)
+    data = []
+    for i in range(cities):
+        usage = rnd.randint(230, 420)
+        data.append({
+            "year": year,
+            "month": f"{month:02d}",
+            "metro": name,
+            "city": f"{name} {i + 1}구",
+            "houseCnt": rnd.randint(50_000, 400_000),
+            "powerUsage": usage,
+            "bill": usage * rnd.randint(110, 140),
+        })
+    return data
@@ -0,0 +1,49 @@
+# bench/runs.py
+"""
+벤치 결과 파일 저장/조회 (load, micro 공용)
+- bench/results/<종류>-<시각>-<git sha>[-tag].json
+"""
+import json
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def git_info() -> dict:
+    root = Path(__file__).resolve().parent.parent
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return {"sha": sha, "dirty": dirty}
+    except Exception:
+        return {"sha": None, "dirty": None}
+
+
+def save(res: dict, kind: str, tag: str | None = None, out: str | None = None) -> Path:
+    if out:
+        path = Path(out)
+    else:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        name = f"{kind}-{datetime.now():%Y%m%d-%H%M%S}-{res['git']['sha'] or 'nogit'}"
+        path = RESULTS_DIR / f"{name}{'-' + tag if tag else ''}.json"
+    path.write_text(json.dumps(res, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def latest(kind: str, exclude: Path | None = None) -> Path | None:
+    files = sorted(p for p in RESULTS_DIR.glob(f"{kind}-*.json") if p != exclude)
+    return files[-1] if files else None
+
+
+def load(path) -> dict:
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def pct(new, old) -> str:
+    if new is None or old in (None, 0):
+        return "-"
+    return f"{(new - old) / old * 100:+.1f}%"
@@ -1,13 +1,44 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 
 from app.routers.health import router as health_router
 from app.routers.gas import router as gas_router
 from app.routers.power import router as power_router
 from app.routers.kpx_now import router as kpx_now_router
+from app.services import cache, http_clients, metrics, migrations, retention
+from app.services.db import close_async_pool
+
+
+HTTP_GZIP_MIN_BYTES = int(os.getenv("HTTP_GZIP_MIN_BYTES", "1024"))
+HTTP_GZIP_LEVEL = int(os.getenv("HTTP_GZIP_LEVEL", "6"))
+
 
-app = FastAPI(title="Energy API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    http_clients.startup()
+    await migrations.startup()
+    retention.start()
+    metrics.start(cache.aclient())
+    yield
+    await metrics.stop(cache.aclient())
+    await retention.stop()
+    await cache.ashutdown()
+    await http_clients.shutdown()
+    await close_async_pool()
 
-# /health
+
+app = FastAPI(title="Energy API", version="1.0.0", lifespan=lifespan)
+
+# Accept-Encoding: gzip 이면 응답 압축 (이 크기 이상만)
+# 캐시에 gzip 으로 저장된 본문은 라우트가 Content-Encoding 을 달아 보냄 -> 여기서 다시 압축 안 함
+app.add_middleware(GZipMiddleware, minimum_size=HTTP_GZIP_MIN_BYTES, compresslevel=HTTP_GZIP_LEVEL)
+# 라우트별 지연/상태 (가장 바깥: 압축 시간까지 포함)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# /health, /metrics
 app.include_router(health_router)
 
 # /gas/...
@@ -18,4 +49,3 @@ app.include_router(power_router, prefix="/power", tags=["power"])
 
 # /kpx/...
 app.include_router(kpx_now_router, prefix="/kpx", tags=["kpx"])
-
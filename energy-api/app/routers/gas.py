@@ -1,102 +1,70 @@
-from psycopg2.extras import Json
 import os
 from fastapi import APIRouter, HTTPException, Query
-from app.services.datago_client import call_odcloud
-from app.services.db import fetch_one, execute
+from app.services.db import afetch_all
+from app.services.gas_ingest import SIDO_MAP, ingest
+from app.services.migrations import ensure_migrated
 
 router = APIRouter(prefix="/gas", tags=["gas"])
 
 SCHEMA = os.getenv("DB_SCHEMA", "api")
 
-ODCLOUD_DATASET_URL = "https://api.odcloud.kr/api/15040818/v1/uddi:0873d163-4ed7-49f9-bf95-8eb5c7e35fad"
 
-SIDO_MAP = {
-    "서울": "11",
-    "부산": "26",
-    "대구": "27",
-    "인천": "28",
-    "광주": "29",
-    "대전": "30",
-    "울산": "31",
-    "세종": "36",
-    "경기": "41",
-    "강원": "42",
-    "충북": "43",
-    "충남": "44",
-    "전북": "45",
-    "전남": "46",
-    "경북": "47",
-    "경남": "48",
-    "제주": "50",
-}
+async def _lookup(region_code: str, year: str):
+    # (region_code, year, month) 유니크 인덱스 범위 조회 -> 요청한 지역/연도 행만
+    return await afetch_all(
+        f"""
+        SELECT month, data, updated_at, created_at
+        FROM {SCHEMA}.energy_gas
+        WHERE region_code = %s AND year = %s AND month IS NOT NULL
+        ORDER BY month
+        """,
+        (region_code, year),
+    )
+
+
+def _response(source: str, region_code: str, year: str, rows) -> dict:
+    stamps = [r.get("updated_at") or r.get("created_at") for r in rows]
+    stamps = [t for t in stamps if t is not None]
+    return {
+        "source": source,
+        "regionCode": region_code,
+        "year": year,
+        "createdAt": max(stamps).isoformat() if stamps else None,
+        "data": [{"month": r["month"], **(r["data"] or {})} for r in rows],
+    }
 
 
 @router.get("/sido/year")
-def gas_sido_year(
+async def gas_sido_year(
     year: int = Query(..., ge=2000, le=2100),
-    regionCode: str = Query("11", min_length=1),  # 기본 서울
-    page: int = 1,
-    perPage: int = 200,
+    regionCode: str = Query("11", min_length=1),  # 기본 서울 (시도명도 허용: 서울, 부산 ...)
 ):
     y = str(year)
+    code = SIDO_MAP.get(regionCode, regionCode)
 
-    # 1) DB 조회 (최신 1건)
-    row = fetch_one(
-        f"""
-        SELECT id, region_code, year, data, created_at
-        FROM {SCHEMA}.energy_gas
-        WHERE region_code = %s AND year = %s
-        ORDER BY created_at DESC
-        LIMIT 1
-        """,
-        (regionCode, y),
-    )
-    if row:
-        return {
-            "source": "db",
-            "regionCode": row["region_code"],
-            "year": row["year"].strip() if isinstance(row["year"], str) else row["year"],
-            "createdAt": row["created_at"].isoformat() if row.get("created_at") else None,
-            "data": row["data"],
-        }
+    # 1) DB 조회 (정규화된 행)
+    #    month 컬럼이 마이그레이션 후에만 있음 -> 시작 시 실패했으면 여기서 재시도 (성공 후엔 no-op)
+    await ensure_migrated()
+    rows = await _lookup(code, y)
+    if rows:
+        return _response("db", code, y, rows)
 
-    # 2) 외부 API 호출
+    # 2) 없으면 데이터셋 전체 적재 (지역마다 호출하지 않음 / 최소 간격 내 재적재 안 함)
     try:
-        result = call_odcloud(
-            ODCLOUD_DATASET_URL,
-            params={"page": page, "perPage": perPage, "returnType": "JSON"},
-        )
+        result = await ingest()
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    # 3) 원본 json 저장 (그냥 통째로)
-    execute(
-        f"""
-        INSERT INTO {SCHEMA}.energy_gas (region_code, year, data)
-        VALUES (%s, %s, %s)
-        """,
-        (regionCode, y, Json(result)),
-    )
-
-    # 4) 다시 DB 조회
-    row = fetch_one(
-        f"""
-        SELECT id, region_code, year, data, created_at
-        FROM {SCHEMA}.energy_gas
-        WHERE region_code = %s AND year = %s
-        ORDER BY created_at DESC
-        LIMIT 1
-        """,
-        (regionCode, y),
-    )
-
-    return {
-        "source": "api→db",
-        "regionCode": row["region_code"],
-        "year": row["year"].strip() if isinstance(row["year"], str) else row["year"],
-        "createdAt": row["created_at"].isoformat() if row.get("created_at") else None,
-        "data": row["data"],
-    }
-
+    # 3) 방금 적재한 값에서 바로 응답 (DB 재조회 없음)
+    #    result=None: 최근에 이미 적재했는데도 없던 지역/연도
+    normalized = (result or {}).get("normalized") or {}
+    rows = [
+        {"month": month, "data": values, "updated_at": None, "created_at": None}
+        for (c, yy, month), values in sorted(normalized.items())
+        if c == code and yy == y and month is not None
+    ]
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"no gas data for regionCode={code}, year={y}")
+    return _response("api→db", code, y, rows)
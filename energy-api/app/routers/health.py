@@ -1,8 +1,39 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services import cache, http_clients, metrics, quota
+from app.services.db import pool_stats
 
 router = APIRouter()
 
 @router.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
+@router.get("/health/db")
+async def health_db():
+    # 레플리카별 풀 사이징용 (워커 프로세스 단위 값)
+    return {"status": "ok", "pool": pool_stats()}
+
+@router.get("/health/http")
+async def health_http():
+    # provider별 업스트림 커넥션 풀 사용량 + 서킷 브레이커 상태
+    return {"status": "ok", **http_clients.stats()}
+
+@router.get("/health/cache")
+async def health_cache():
+    # 워커 단위 L1/L2(Redis) hit/miss
+    return {"status": "ok", **cache.stats()}
+
+@router.get("/health/quota")
+async def health_quota():
+    # API 키별 쿼터 한도 + 오늘 사용량 (Redis 공유 값)
+    return {"status": "ok", **await quota.status()}
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    # Prometheus 텍스트 형식 (레플리카 내 전체 워커 합계)
+    return PlainTextResponse(
+        await metrics.exposition(cache.aclient()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Query
-from app.services.kpx_client import call_kpx_now
+from fastapi import APIRouter, Query, Request
+from app.services.cache import cached_response
+from app.services.kpx_client import acall_kpx_now
 
 router = APIRouter()
 
 @router.get("/now")
-def kpx_now(
+async def kpx_now(
+    request: Request,
     page: int = Query(1, ge=1),
     perPage: int = Query(10, ge=1, le=1000),
 ):
     # ✅ KPX 캐시는 services(kpx_client)에서 단일 관리
     # router에서 Redis를 또 적용하면 "cache": false가 저장되어 다음 요청에도 고정되는 문제가 생김
-    return call_kpx_now(page=page, perPage=perPage)
+    # 캐시 본문 바이트 그대로 응답 / cache, stale, cache_key 는 X-Cache, X-Cache-Stale, X-Cache-Key 헤더
+    body, cached, stale, cache_key = await acall_kpx_now(page=page, perPage=perPage)
+    return cached_response(request, body, cached, stale, {"X-Cache-Key": cache_key})
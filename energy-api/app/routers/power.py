@@ -1,16 +1,45 @@
-from psycopg2.extras import Json
+from psycopg.types.json import Jsonb
+import asyncio
 import os
-from fastapi import APIRouter, Query, HTTPException
-from app.services.kepco_client import call_kepco_house_ave
-from app.services.db import fetch_one, execute
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Query, HTTPException, Request
+from app.services.conditional import cache_control, conditional_json, content_hash, not_modified
+from app.services.kepco_client import acall_kepco_house_ave
+from app.services.db import afetch_one, afetch_all, aexecute_values
+from app.services.migrations import ensure_migrated
 
 router = APIRouter(tags=["power"])
 
 SCHEMA = os.getenv("DB_SCHEMA", "api")
 
+# /power/range: 한 요청 최대 (지역 x 월) 칸 수 / KEPCO 동시 호출 수
+POWER_RANGE_MAX_CELLS = int(os.getenv("POWER_RANGE_MAX_CELLS", "500"))
+POWER_RANGE_CONCURRENCY = int(os.getenv("POWER_RANGE_CONCURRENCY", "8"))
+
+# (region_code, ym) 유니크 키 (migrations 4) 기준, 동시 miss면 나중 값으로 덮어씀
+SQL_UPSERT = f"""
+INSERT INTO {SCHEMA}.energy_kepco_monthly (region_code, ym, data, content_hash)
+VALUES %s
+ON CONFLICT (region_code, ym) DO UPDATE SET
+    data = EXCLUDED.data,
+    content_hash = EXCLUDED.content_hash,
+    created_at = now()
+RETURNING region_code, ym, created_at
+"""
+SQL_UPSERT_ONE = SQL_UPSERT.replace("VALUES %s", "VALUES (%s, %s, %s, %s)")
+
+KST = timezone(timedelta(hours=9))
+
+
+def _month_cache_control(ym: str, data) -> str:
+    # 지난 달 + 정상 응답이면 다시 바뀌지 않음 / 이번 달(집계 중)·에러 응답은 짧게
+    ok = isinstance(data, dict) and bool(data.get("ok"))
+    return cache_control(ok and ym < datetime.now(KST).strftime("%Y%m"))
+
 
 @router.get("/monthly")
-def power_monthly(
+async def power_monthly(
+    request: Request,
     year: int = Query(..., ge=2000, le=2100),
     month: int = Query(..., ge=1, le=12),
     metroCd: str = Query(..., min_length=1),
@@ -20,11 +49,30 @@ def power_monthly(
     DB: api.energy_kepco_monthly(region_code, ym, data, created_at)
     """
     ym = f"{year}{month:02d}"  # YYYYMM
+    # 조회 컬럼(content_hash 등)이 마이그레이션 후에만 있음 -> 시작 시 실패했으면 여기서 재시도 (성공 후엔 no-op)
+    await ensure_migrated()
+
+    # 0) 재검증(If-None-Match)이면 해시만 보고 304 (data 안 읽음)
+    #    data 를 안 보니 정상 응답인지 모름 -> 304 의 Cache-Control 은 짧게 (다음 재검증도 304)
+    if request.headers.get("if-none-match"):
+        row = await afetch_one(
+            f"""
+            SELECT content_hash
+            FROM {SCHEMA}.energy_kepco_monthly
+            WHERE region_code = %s AND ym = %s
+            ORDER BY created_at DESC
+            LIMIT 1
+            """,
+            (metroCd, ym),
+        )
+        resp = not_modified(request, row and row["content_hash"], cache_control(False))
+        if resp is not None:
+            return resp
 
     # 1) DB 조회 (최신 1건)
-    row = fetch_one(
+    row = await afetch_one(
         f"""
-        SELECT id, region_code, ym, data, created_at
+        SELECT id, region_code, ym, data, content_hash, created_at
         FROM {SCHEMA}.energy_kepco_monthly
         WHERE region_code = %s AND ym = %s
         ORDER BY created_at DESC
@@ -34,46 +82,140 @@ def power_monthly(
     )
 
     if row:
-        return {
+        return conditional_json(request, {
             "source": "db",
             "regionCode": row["region_code"],
             "ym": row["ym"].strip() if isinstance(row["ym"], str) else row["ym"],
             "createdAt": row["created_at"].isoformat() if row.get("created_at") else None,
             "data": row["data"],
-        }
+        }, row["content_hash"] or content_hash(row["data"]), _month_cache_control(ym, row["data"]))
 
     # 2) 외부 API 호출
     try:
-        result = call_kepco_house_ave(year=year, month=month, metroCd=metroCd)
+        result = await acall_kepco_house_ave(year=year, month=month, metroCd=metroCd)
+    except HTTPException:
+        # 서킷 open(503) / 쿼터 초과(429) 는 Retry-After 그대로
+        raise
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
-    # 3) DB INSERT (원본 jsonb 저장)
-    execute(
-        f"""
-        INSERT INTO {SCHEMA}.energy_kepco_monthly (region_code, ym, data)
-        VALUES (%s, %s, %s)
-        """,
-        (metroCd, ym, Json(result)),
-    )
+    # 3) 에러 응답(ok=False)은 /range 와 같이 저장/ETag 안 함
+    if not result.get("ok"):
+        return conditional_json(request, {
+            "source": "api",
+            "regionCode": metroCd,
+            "ym": ym,
+            "createdAt": None,
+            "data": result,
+        }, None, cache_control(False, 0))
+
+    # 4) upsert 1번 + RETURNING (INSERT 후 같은 SELECT 를 다시 하지 않음)
+    h = content_hash(result)
+    row = await afetch_one(SQL_UPSERT_ONE, (metroCd, ym, Jsonb(result), h))
 
-    # 4) 다시 DB 조회
-    row = fetch_one(
+    return conditional_json(request, {
+        "source": "api→db",
+        "regionCode": row["region_code"],
+        "ym": row["ym"].strip() if isinstance(row["ym"], str) else row["ym"],
+        "createdAt": row["created_at"].isoformat() if row.get("created_at") else None,
+        "data": result,
+    }, h, _month_cache_control(ym, result))
+
+
+def _months(from_ym: str, to_ym: str) -> list[str]:
+    y, m = int(from_ym[:4]), int(from_ym[4:])
+    ty, tm = int(to_ym[:4]), int(to_ym[4:])
+    if not (1 <= m <= 12 and 1 <= tm <= 12):
+        raise HTTPException(status_code=400, detail="month must be 01..12")
+    out = []
+    while (y, m) <= (ty, tm):
+        out.append(f"{y}{m:02d}")
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    if not out:
+        raise HTTPException(status_code=400, detail="fromYm must be <= toYm")
+    return out
+
+
+@router.get("/range")
+async def power_range(
+    fromYm: str = Query(..., pattern=r"^\d{6}$"),
+    toYm: str = Query(..., pattern=r"^\d{6}$"),
+    metroCd: list[str] = Query(..., description="쉼표 구분 또는 반복 (예: 11,26 / metroCd=11&metroCd=26)"),
+):
+    """
+    /power/range?fromYm=202401&toYm=202412&metroCd=11,26,...
+    - DB에 있는 칸은 쿼리 1번 (ANY)
+    - 없는 칸만 KEPCO 동시 호출 -> 성공분은 multi-row upsert 1번으로 저장
+    - 응답: data[metroCd][ym] = {source, createdAt, data} 또는 {error}
+    """
+    metros = list(dict.fromkeys(x.strip() for v in metroCd for x in v.split(",") if x.strip()))
+    if not metros:
+        raise HTTPException(status_code=400, detail="metroCd required")
+    months = _months(fromYm, toYm)
+    if len(metros) * len(months) > POWER_RANGE_MAX_CELLS:
+        raise HTTPException(status_code=400, detail=f"too many cells (max {POWER_RANGE_MAX_CELLS})")
+
+    # 1) DB 조회: (지역, 월)별 최신 1건씩 한 번에
+    rows = await afetch_all(
         f"""
-        SELECT id, region_code, ym, data, created_at
+        SELECT DISTINCT ON (region_code, ym) region_code, ym, data, created_at
         FROM {SCHEMA}.energy_kepco_monthly
-        WHERE region_code = %s AND ym = %s
-        ORDER BY created_at DESC
-        LIMIT 1
+        WHERE region_code = ANY(%s) AND ym = ANY(%s)
+        ORDER BY region_code, ym, created_at DESC
         """,
-        (metroCd, ym),
+        (metros, months),
     )
 
+    data = {m: {} for m in metros}
+    for row in rows:
+        region = row["region_code"].strip() if isinstance(row["region_code"], str) else row["region_code"]
+        ym = row["ym"].strip() if isinstance(row["ym"], str) else row["ym"]
+        if region in data:
+            data[region][ym] = {
+                "source": "db",
+                "createdAt": row["created_at"].isoformat() if row.get("created_at") else None,
+                "data": row["data"],
+            }
+
+    # 2) 빈 칸만 KEPCO 동시 호출
+    missing = [(m, ym) for m in metros for ym in months if ym not in data[m]]
+    sem = asyncio.Semaphore(max(1, POWER_RANGE_CONCURRENCY))
+
+    async def _fetch(metro: str, ym: str):
+        async with sem:
+            return await acall_kepco_house_ave(year=int(ym[:4]), month=int(ym[4:]), metroCd=metro)
+
+    results = await asyncio.gather(*(_fetch(m, ym) for m, ym in missing), return_exceptions=True)
+
+    # 3) 성공분만 multi-row upsert 1번
+    new_rows = []
+    errors = 0
+    for (metro, ym), result in zip(missing, results):
+        if isinstance(result, BaseException):
+            errors += 1
+            detail = getattr(result, "detail", None) or str(result)
+            data[metro][ym] = {"source": "api", "error": detail}
+            continue
+        data[metro][ym] = {"source": "api→db" if result.get("ok") else "api", "createdAt": None, "data": result}
+        if result.get("ok"):
+            new_rows.append((metro, ym, Jsonb(result), content_hash(result)))
+        else:
+            errors += 1
+
+    if new_rows:
+        # upsert + RETURNING 으로 createdAt 까지 한 번에
+        await ensure_migrated()
+        for row in await aexecute_values(SQL_UPSERT, new_rows, fetch=True):
+            region = row["region_code"].strip() if isinstance(row["region_code"], str) else row["region_code"]
+            ym = row["ym"].strip() if isinstance(row["ym"], str) else row["ym"]
+            if ym in data.get(region, {}):
+                data[region][ym]["createdAt"] = row["created_at"].isoformat() if row.get("created_at") else None
+
     return {
-        "source": "api→db",
-        "regionCode": row["region_code"],
-        "ym": row["ym"].strip() if isinstance(row["ym"], str) else row["ym"],
-        "createdAt": row["created_at"].isoformat() if row.get("created_at") else None,
-        "data": row["data"],
+        "fromYm": fromYm,
+        "toYm": toYm,
+        "metros": metros,
+        "months": months,
+        "counts": {"db": len(metros) * len(months) - len(missing), "api": len(new_rows), "error": errors},
+        "data": data,
     }
-
@@ -0,0 +1,206 @@
+# app/services/breaker.py
+"""
+업스트림(provider)별 서킷 브레이커
+- closed: 최근 BREAKER_WINDOW 건 중 실패율 또는 느린 호출 비율이 임계 이상이면 open
+  (실패 = 예외/타임아웃/5xx, 느림 = BREAKER_SLOW_SECONDS 이상 걸린 호출)
+- open: 업스트림을 부르지 않고 바로 CircuitOpenError (BREAKER_OPEN_SECONDS 동안)
+  -> 업스트림이 멈춰도 요청마다 타임아웃(20초)만큼 붙잡히지 않음
+- half_open: 그 뒤 BREAKER_HALF_OPEN_PROBES 건만 통과, 전부 성공하면 closed / 하나라도 실패하면 다시 open
+- 상태는 워커(프로세스) 단위
+"""
+import os
+import threading
+import time
+from collections import deque
+
+import httpx
+from fastapi import HTTPException
+
+from app.services import metrics
+
+BREAKER_ENABLED = os.getenv("BREAKER_ENABLED", "1") == "1"
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))
+# 이보다 적게 호출됐으면 비율로 판단하지 않음
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_SECONDS = float(os.getenv("BREAKER_SLOW_SECONDS", "5"))
+BREAKER_SLOW_RATE = float(os.getenv("BREAKER_SLOW_RATE", "0.8"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "1"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+# /metrics gauge 값
+STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class UpstreamRejected(httpx.HTTPError):
+    """
+    업스트림을 부르지 않고 거절 (서킷 open, 쿼터 초과)
+    httpx.HTTPError 하위 클래스 -> 기존 except httpx.HTTPError 처리 경로를 그대로 탐
+    """
+    status_code = 503
+    reason = "rejected"
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} {self.reason} (retry in {retry_after:.0f}s)")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamRejected):
+    reason = "circuit open"
+
+
+class UpstreamUnavailable(HTTPException):
+    """
+    unavailable() 결과: 업스트림을 부르지 않고 거절한 503/429
+    업스트림이 실제로 돌려준 503 등과 구분할 때 isinstance 로 확인
+    """
+    def __init__(self, e: UpstreamRejected):
+        super().__init__(
+            status_code=e.status_code,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, int(e.retry_after)))},
+        )
+        self.rejected = e
+
+
+def unavailable(e: UpstreamRejected) -> UpstreamUnavailable:
+    # 타임아웃까지 기다리지 않고 바로 503/429 (+ 언제 다시 시도할지)
+    return UpstreamUnavailable(e)
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        enabled: bool = BREAKER_ENABLED,
+        window: int = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+        failure_rate: float = BREAKER_FAILURE_RATE,
+        slow_seconds: float = BREAKER_SLOW_SECONDS,
+        slow_rate: float = BREAKER_SLOW_RATE,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+        half_open_probes: int = BREAKER_HALF_OPEN_PROBES,
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.min_calls = max(1, min_calls)
+        self.failure_rate = failure_rate
+        self.slow_seconds = slow_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._calls = deque(maxlen=max(1, window))  # [(failed, slow)]
+        self._opened_at = 0.0
+        self._probes = 0      # half_open 에서 진행 중인 호출 수
+        self._probe_ok = 0    # half_open 에서 성공한 호출 수
+        self._stats = {"rejected": 0, "opened": 0}
+
+    def _set(self, state: str):
+        # self._lock 잡은 상태에서 호출
+        self._state = state
+        self._probes = 0
+        self._probe_ok = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self._stats["opened"] += 1
+        else:
+            self._calls.clear()
+        metrics.inc("upstream_breaker_transitions_total", metrics.labels(provider=self.name, state=state))
+
+    def before(self) -> bool:
+        """
+        호출 전: 막혀 있으면 CircuitOpenError
+        반환: half_open 시험 호출인지 (record 에 그대로 넘김)
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            retry_after = None
+            if self._state == OPEN:
+                remaining = self._opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    retry_after = remaining
+                else:
+                    self._set(HALF_OPEN)
+            if self._state == HALF_OPEN and retry_after is None:
+                if self._probes >= self.half_open_probes:
+                    # 시험 호출 결과 기다리는 중
+                    retry_after = 1.0
+                else:
+                    self._probes += 1
+                    return True
+            if retry_after is None:
+                return False
+            self._stats["rejected"] += 1
+        metrics.inc("upstream_breaker_rejected_total", metrics.labels(provider=self.name))
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record(self, probe: bool, outcome: str, elapsed: float):
+        """
+        호출 후: outcome = ok / http_5xx / exception / cancelled
+        """
+        if not self.enabled:
+            return
+        failed = outcome != "ok"
+        slow = elapsed >= self.slow_seconds
+        with self._lock:
+            if probe:
+                if self._state != HALF_OPEN:
+                    return
+                self._probes -= 1
+                if outcome == "cancelled":
+                    return
+                if failed or slow:
+                    self._set(OPEN)
+                    return
+                self._probe_ok += 1
+                if self._probe_ok >= self.half_open_probes:
+                    self._set(CLOSED)
+                return
+
+            # 취소는 업스트림 상태와 무관 / open 되기 전에 나갔던 호출은 무시
+            if outcome == "cancelled" or self._state != CLOSED:
+                return
+            self._calls.append((failed, slow))
+            n = len(self._calls)
+            if n < self.min_calls:
+                return
+            failures = sum(1 for f, _ in self._calls if f)
+            slows = sum(1 for _, s in self._calls if s)
+            if failures / n >= self.failure_rate or slows / n >= self.slow_rate:
+                self._set(OPEN)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() >= self._opened_at + self.open_seconds:
+                # 다음 호출이 half_open 시험 호출
+                return HALF_OPEN
+            return self._state
+
+    def is_open(self) -> bool:
+        return self.enabled and self.state == OPEN
+
+    def stats(self) -> dict:
+        state = self.state
+        with self._lock:
+            n = len(self._calls)
+            failures = sum(1 for f, _ in self._calls if f)
+            slows = sum(1 for _, s in self._calls if s)
+            retry_after = max(0.0, self._opened_at + self.open_seconds - time.monotonic()) if state == OPEN else 0.0
+            return {
+                "enabled": self.enabled,
+                "state": state,
+                "calls": n,
+                "failure_rate": round(failures / n, 3) if n else 0.0,
+                "slow_rate": round(slows / n, 3) if n else 0.0,
+                "retry_after": round(retry_after, 1),
+                **self._stats,
+            }
@@ -1,12 +1,87 @@
-import os, json, hashlib
-from redis import Redis
+import os, gzip, time, hashlib, logging, asyncio
+import orjson
+from fastapi import Request, Response
+from redis.asyncio import Redis as AsyncRedis
 
-def client() -> Redis:
+from app.services import metrics, singleflight
+from app.services.l1cache import l1
+
+log = logging.getLogger(__name__)
+
+def _redis_kwargs() -> dict:
     host = os.getenv("REDIS_HOST", "127.0.0.1")
     port = int(os.getenv("REDIS_PORT", "6379"))
     db = int(os.getenv("REDIS_DB", "0") or "0")
     password = os.getenv("REDIS_PASSWORD") or None
-    return Redis(host=host, port=port, db=db, password=password, decode_responses=True)
+    return {"host": host, "port": port, "db": db, "password": password, "decode_responses": False}
+
+# 캐시 값 압축 (gzip): 이 크기 이상만 / 기본 꺼짐
+# 켜기 전에 모든 레플리카가 압축 값을 읽을 수 있는 버전인지 확인 (롤링 배포 중 예전 버전은 못 읽음)
+CACHE_COMPRESS = os.getenv("CACHE_COMPRESS", "0") == "1"
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
+CACHE_COMPRESS_LEVEL = int(os.getenv("CACHE_COMPRESS_LEVEL", "6"))
+
+# 코덱 표시 = gzip 매직 바이트 (JSON 은 0x1f 로 시작할 수 없음 -> 예전 비압축 값도 그대로 읽힘)
+GZIP_MAGIC = b"\x1f\x8b"
+
+def dumps(value) -> bytes:
+    # 캐시 저장값 = 응답 본문 (orjson: json.dumps 보다 빠르고 바로 bytes)
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+def pack(value) -> bytes:
+    """
+    캐시에 저장할 바이트: JSON, 크면 gzip (mtime=0 -> 같은 값이면 같은 바이트)
+    gzip 이면 Accept-Encoding: gzip 클라이언트에 그대로 응답 (다시 압축 안 함)
+    """
+    raw = dumps(value)
+    if CACHE_COMPRESS and len(raw) >= CACHE_COMPRESS_MIN_BYTES:
+        return gzip.compress(raw, compresslevel=CACHE_COMPRESS_LEVEL, mtime=0)
+    return raw
+
+def unpack(stored: bytes) -> bytes:
+    # 저장된 바이트 -> JSON 바이트
+    if stored[:2] == GZIP_MAGIC:
+        return gzip.decompress(stored)
+    return stored
+
+def loads(stored):
+    return orjson.loads(unpack(stored))
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    # "gzip, deflate, br" / "gzip;q=0" / "*" 정도만 판단
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+def cached_response(request: Request, body: bytes, cached: bool, stale: bool, headers: dict | None = None) -> Response:
+    """
+    직렬화된 본문을 그대로 응답 (jsonable_encoder / json.dumps 재인코딩 없음)
+    캐시 메타데이터는 본문이 아니라 헤더로: X-Cache(HIT/MISS), X-Cache-Stale(1/0)
+    - 압축 저장된 값 + 클라이언트가 gzip 허용 -> 그 바이트 그대로 Content-Encoding: gzip
+      (Content-Encoding 이 이미 있으면 GZipMiddleware 는 건드리지 않음)
+    - gzip 미허용이면 풀어서 응답
+    """
+    h = {
+        "X-Cache": "HIT" if cached else "MISS",
+        "X-Cache-Stale": "1" if stale else "0",
+        "Vary": "Accept-Encoding",
+        **(headers or {}),
+    }
+    if body[:2] == GZIP_MAGIC:
+        if accepts_gzip(request.headers.get("accept-encoding")):
+            h["Content-Encoding"] = "gzip"
+        else:
+            body = gzip.decompress(body)
+    return Response(content=body, media_type="application/json", headers=h)
 
 def make_key(prefix: str, raw: str) -> str:
     h = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
@@ -17,29 +92,193 @@ def _strict() -> bool:
     # 기본(0)은 Redis 장애 시 캐시를 그냥 스킵 (None/return)
     return os.getenv("REDIS_STRICT", "0") == "1"
 
-def cache_get(r: Redis, k: str):
+_l2_stats = {"hits": 0, "misses": 0, "stale": 0, "refreshes": 0, "refresh_errors": 0}
+
+def count_l1(k: str):
+    metrics.cache_event(k, "hit_l1")
+
+def count_l2(hit: bool, k: str = ""):
+    _l2_stats["hits" if hit else "misses"] += 1
+    metrics.cache_event(k, "hit_l2" if hit else "miss")
+
+def count_stale(k: str):
+    _l2_stats["stale"] += 1
+    metrics.cache_stale(k)
+
+def stats() -> dict:
+    return {"l1": l1.stats(), "l2": dict(_l2_stats)}
+
+# 다른 워커가 fetch 중일 때: 락 TTL / 최대 대기 / 폴링 간격
+CACHE_LOCK_TTL_MS = int(os.getenv("CACHE_LOCK_TTL_MS", "15000"))
+CACHE_LOCK_WAIT_MS = int(os.getenv("CACHE_LOCK_WAIT_MS", "10000"))
+CACHE_LOCK_POLL_MS = int(os.getenv("CACHE_LOCK_POLL_MS", "50"))
+
+def is_stale(remaining, stale_ttl: int) -> bool:
+    # Redis 남은 TTL이 stale 구간 안으로 들어왔으면 soft TTL은 이미 지난 것
+    return stale_ttl > 0 and remaining is not None and remaining <= stale_ttl
+
+# =========================
+# Redis 조회/저장 (redis.asyncio) - 이벤트 루프를 막지 않음
+# =========================
+_aclient: AsyncRedis | None = None
+_arefreshing: dict = {}  # key -> 백그라운드 갱신 task (중복 방지 + GC 방지)
+
+def aclient() -> AsyncRedis:
+    """
+    워커(이벤트 루프)당 1개 공유 -> 내부 커넥션 풀 재사용
+    (decode_responses=False: GET 결과 바이트를 디코딩 없이 그대로 응답 본문으로 씀)
+    """
+    global _aclient
+    if _aclient is None:
+        _aclient = AsyncRedis(**_redis_kwargs())
+    return _aclient
+
+async def al2_get(r: AsyncRedis, k: str, with_ttl: bool = False):
+    if not (with_ttl or l1.enabled):
+        return await r.get(k), None
+    pipe = r.pipeline(transaction=False)
+    pipe.get(k)
+    pipe.pttl(k)
+    v, pttl = await pipe.execute()
+    return v, (pttl / 1000 if pttl and pttl > 0 else None)
+
+async def acache_get_raw(r: AsyncRedis, k: str, with_ttl: bool = False, count: bool = True):
     """
-    ✅ dict 또는 None만 반환
-    - Redis 장애 시: 기본은 None(캐시 미사용)
-    - REDIS_STRICT=1 이면 예외 raise
+    반환: (저장된 바이트(JSON 또는 gzip) | None, 남은 TTL 초 | None)  -- 파싱 안 함
     """
+    hit = l1.get(k)
+    if hit is not None:
+        if count:
+            count_l1(k)
+        return hit
     try:
-        v = r.get(k)
-        return json.loads(v) if v else None
+        v, ttl = await al2_get(r, k, with_ttl)
+        if count:
+            count_l2(bool(v), k)
+        if not v:
+            return None, None
+        l1.put(k, v, len(v), ttl)
+        return v, ttl
     except Exception:
         if _strict():
             raise
-        return None
+        return None, None
 
-def cache_set(r: Redis, k: str, value, ttl: int):
-    """
-    - Redis 장애 시: 기본은 조용히 스킵
-    - REDIS_STRICT=1 이면 예외 raise
-    """
+async def acache_set_raw(r: AsyncRedis, k: str, raw: bytes, ttl: int, stale_ttl: int = 0):
     try:
-        r.setex(k, ttl, json.dumps(value, ensure_ascii=False))
+        hard_ttl = ttl + max(0, stale_ttl)
+        await r.setex(k, hard_ttl, raw)
+        l1.put(k, raw, len(raw), hard_ttl)
     except Exception:
         if _strict():
             raise
         return
 
+async def acache_set(r: AsyncRedis, k: str, value, ttl: int, stale_ttl: int = 0):
+    await acache_set_raw(r, k, pack(value), ttl, stale_ttl)
+
+async def _arefresh(r: AsyncRedis, k: str, loader, stale_ttl: int):
+    token = None
+    try:
+        try:
+            token = await singleflight.aredis_lock(r, k, CACHE_LOCK_TTL_MS)
+        except Exception:
+            token = ""  # Redis 장애: 락 없이 진행
+        if token is None:
+            return
+        value, ttl = await loader()
+        if ttl:
+            await acache_set(r, k, value, ttl, stale_ttl)
+        _l2_stats["refreshes"] += 1
+    except Exception:
+        _l2_stats["refresh_errors"] += 1
+        log.warning("background refresh failed: %s", k, exc_info=True)
+    finally:
+        if token:
+            try:
+                await singleflight.aredis_unlock(r, k, token)
+            except Exception:
+                pass
+        _arefreshing.pop(k, None)
+
+def aschedule_refresh(r: AsyncRedis, k: str, loader, stale_ttl: int):
+    if k in _arefreshing:
+        return
+    l1.delete(k)
+    _arefreshing[k] = asyncio.create_task(_arefresh(r, k, loader, stale_ttl))
+
+async def _await_for_fill(r: AsyncRedis, k: str):
+    deadline = time.monotonic() + CACHE_LOCK_WAIT_MS / 1000
+    while time.monotonic() < deadline:
+        await asyncio.sleep(CACHE_LOCK_POLL_MS / 1000)
+        v, _ = await acache_get_raw(r, k, count=False)
+        if v is not None:
+            return v
+        try:
+            if not await r.exists(singleflight.lock_key(k)):
+                return None
+        except Exception:
+            return None
+    return None
+
+async def aget_or_load_raw(r: AsyncRedis | None, k: str, loader, stale_ttl: int = 0):
+    """
+    캐시 조회 -> miss면 loader()를 key당 1번만 실행 (single-flight)
+    반환: 값 대신 저장된 바이트(JSON 또는 gzip) -> (body, cached, stale)
+    - loader는 coroutine 함수 -> (value, ttl)  ttl이 None/0 이면 캐시 안 함
+    - stale_ttl > 0 이면 soft TTL 지난 값은 바로 내주고 백그라운드 갱신 (stale-while-revalidate)
+    - hit: L1/Redis 바이트를 그대로 (json.loads / 재인코딩 없음)
+    - miss: loader 값을 1번만 직렬화(+압축) -> 저장/응답에 같은 바이트
+    응답은 cached_response(request, body, cached, stale)
+    """
+    if r is not None:
+        v, remaining = await acache_get_raw(r, k, with_ttl=stale_ttl > 0)
+        if v is not None:
+            stale = is_stale(remaining, stale_ttl)
+            if stale:
+                count_stale(k)
+                aschedule_refresh(r, k, loader, stale_ttl)
+            return v, True, stale
+
+    async def _fill():
+        token = None
+        if r is not None:
+            try:
+                token = await singleflight.aredis_lock(r, k, CACHE_LOCK_TTL_MS)
+            except Exception:
+                token = None
+            else:
+                if token is None:
+                    v = await _await_for_fill(r, k)
+                    if v is not None:
+                        return v, True
+        try:
+            if token is not None:
+                # 락 잡는 사이 다른 워커가 막 채웠을 수 있음
+                v, _ = await acache_get_raw(r, k, count=False)
+                if v is not None:
+                    return v, True
+            value, ttl = await loader()
+            raw = pack(value)
+            if r is not None and ttl:
+                await acache_set_raw(r, k, raw, ttl, stale_ttl)
+            return raw, False
+        finally:
+            if token is not None:
+                try:
+                    await singleflight.aredis_unlock(r, k, token)
+                except Exception:
+                    pass
+
+    (body, cached), _shared = await singleflight.ado(k, _fill)
+    return body, cached, False
+
+async def ashutdown():
+    global _aclient
+    for t in list(_arefreshing.values()):
+        t.cancel()
+    await asyncio.gather(*_arefreshing.values(), return_exceptions=True)
+    _arefreshing.clear()
+    if _aclient is not None:
+        await _aclient.aclose()
+        _aclient = None
@@ -1,8 +1,11 @@
 import os
-import requests
+import httpx
 from fastapi import HTTPException
 
-def call_odcloud(url: str, params: dict, timeout: int = 20) -> dict:
+from app.services import http_clients
+from app.services.breaker import UpstreamRejected, unavailable
+
+def _odcloud_request(params: dict):
     """
     odcloud(api.odcloud.kr) 계열 호출:
     - 어떤 데이터셋은 Authorization 헤더
@@ -16,19 +19,20 @@ def call_odcloud(url: str, params: dict, timeout: int = 20) -> dict:
     p = dict(params or {})
     # ✅ 쿼리 serviceKey도 같이 보냄(이미 있으면 덮지 않음)
     p.setdefault("serviceKey", key)
+    return p, {"Authorization": key}
 
-    try:
-        r = requests.get(
-            url,
-            params=p,
-            headers={"Authorization": key},
-            timeout=timeout,
-        )
-    except requests.RequestException as e:
-        raise HTTPException(status_code=502, detail=f"odcloud request failed: {e}")
-
-    if not r.ok:
+def _odcloud_json(r: httpx.Response) -> dict:
+    if not r.is_success:
         raise HTTPException(status_code=r.status_code, detail=r.text[:500])
 
     return r.json()
 
+async def acall_odcloud(url: str, params: dict, timeout: int = 20) -> dict:
+    p, headers = _odcloud_request(params)
+    try:
+        r = await http_clients.aget("odcloud", url, params=p, headers=headers, timeout=timeout)
+    except UpstreamRejected as e:
+        raise unavailable(e)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"odcloud request failed: {e}")
+    return _odcloud_json(r)
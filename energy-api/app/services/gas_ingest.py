@@ -0,0 +1,244 @@
+# app/services/gas_ingest.py
+"""
+도시가스 데이터셋(odcloud 15040818) 적재
+- 데이터셋 전체를 1번만 받아서(페이지 끝까지) 지역/연도/월 단위 행으로 정규화
+- (region_code, year, month) 기준 upsert, 내용 해시가 같으면 건너뜀
+- 지역마다 업스트림 호출/원본 통째 저장하던 방식 대체
+
+수동 실행: python -m app.services.gas_ingest
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+
+from psycopg.types.json import Jsonb
+
+from app.services import quota, singleflight
+from app.services.conditional import content_hash
+from app.services.datago_client import acall_odcloud
+from app.services.db import aexecute_values, afetch_all
+from app.services.migrations import ensure_migrated
+
+log = logging.getLogger(__name__)
+
+SCHEMA = os.getenv("DB_SCHEMA", "api")
+
+ODCLOUD_DATASET_URL = "https://api.odcloud.kr/api/15040818/v1/uddi:0873d163-4ed7-49f9-bf95-8eb5c7e35fad"
+
+GAS_INGEST_PER_PAGE = int(os.getenv("GAS_INGEST_PER_PAGE", "1000"))
+GAS_INGEST_CONCURRENCY = int(os.getenv("GAS_INGEST_CONCURRENCY", "4"))
+# 조회 miss로 적재가 다시 트리거되는 최소 간격(초) - 없는 지역/연도 요청이 몰려도 업스트림 보호
+GAS_INGEST_MIN_INTERVAL = int(os.getenv("GAS_INGEST_MIN_INTERVAL", "3600"))
+
+SIDO_MAP = {
+    "서울": "11",
+    "부산": "26",
+    "대구": "27",
+    "인천": "28",
+    "광주": "29",
+    "대전": "30",
+    "울산": "31",
+    "세종": "36",
+    "경기": "41",
+    "강원": "42",
+    "충북": "43",
+    "충남": "44",
+    "전북": "45",
+    "전남": "46",
+    "경북": "47",
+    "경남": "48",
+    "제주": "50",
+}
+
+# 정식 명칭 -> 약칭 (서울특별시, 충청북도, 강원특별자치도 ...)
+_FULL_NAMES = {
+    "충청북": "충북", "충청남": "충남", "전라북": "전북", "전북특별자치": "전북",
+    "전라남": "전남", "경상북": "경북", "경상남": "경남",
+}
+
+# 데이터셋 컬럼명 후보 (연도/월이 한 컬럼이면 _YM_KEYS)
+_YEAR_KEYS = ("연도", "년도", "년", "기준연도", "YEAR", "year")
+_MONTH_KEYS = ("월", "기준월", "MONTH", "month")
+_YM_KEYS = ("연월", "년월", "기준년월", "기준연월", "YM", "ym")
+_REGION_KEYS = ("시도", "시도명", "지역", "지역명", "REGION", "region")
+
+_NUM_RE = re.compile(r"^-?[\d,]+(\.\d+)?$")
+
+_last_ingest = 0.0
+
+
+def region_code(name: str) -> str | None:
+    name = (name or "").strip()
+    if name in SIDO_MAP.values():
+        return name
+    if name[:2] in SIDO_MAP and not any(name.startswith(k) for k in _FULL_NAMES):
+        return SIDO_MAP[name[:2]]
+    for full, short in _FULL_NAMES.items():
+        if name.startswith(full):
+            return SIDO_MAP[short]
+    return None
+
+
+def _num(v):
+    if isinstance(v, (int, float)):
+        return v
+    s = str(v).strip()
+    if not _NUM_RE.match(s):
+        return None
+    f = float(s.replace(",", ""))
+    return int(f) if f.is_integer() else f
+
+
+def _pick(row: dict, keys: tuple):
+    for k in keys:
+        if k in row and row[k] not in (None, ""):
+            return k, row[k]
+    return None, None
+
+
+def _year_month(row: dict):
+    k, v = _pick(row, _YM_KEYS)
+    if k:
+        digits = re.sub(r"\D", "", str(v))
+        if len(digits) >= 6:
+            return digits[:4], int(digits[4:6]), {k}
+    ky, y = _pick(row, _YEAR_KEYS)
+    km, m = _pick(row, _MONTH_KEYS)
+    if ky is None:
+        return None, None, set()
+    year = re.sub(r"\D", "", str(y))[:4]
+    # 연 단위 데이터면 month=0
+    month = int(re.sub(r"\D", "", str(m)) or 0) if km else 0
+    return year, month, {ky, km} - {None}
+
+
+def normalize(records: list[dict]) -> dict:
+    """
+    원본 레코드 -> {(region_code, year, month): {컬럼: 숫자}}
+    - long 형식: 행마다 시도 컬럼이 있음
+    - wide 형식: 행 하나에 시도별 컬럼(서울, 부산, ...)이 나열됨 -> 시도별로 펼침
+    """
+    out: dict = {}
+    for row in records:
+        year, month, used = _year_month(row)
+        if not year:
+            continue
+
+        rk, rname = _pick(row, _REGION_KEYS)
+        if rk is not None:
+            code = region_code(str(rname))
+            if code is None:
+                continue
+            values = {k: n for k, v in row.items() if k not in used and k != rk and (n := _num(v)) is not None}
+            out.setdefault((code, year, month), {}).update(values)
+            continue
+
+        for k, v in row.items():
+            code = region_code(k) if k not in used else None
+            n = _num(v)
+            if code is not None and n is not None:
+                out.setdefault((code, year, month), {})["value"] = n
+    return out
+
+
+async def _fetch_all_pages() -> list[dict]:
+    params = {"page": 1, "perPage": GAS_INGEST_PER_PAGE, "returnType": "JSON"}
+    first = await acall_odcloud(ODCLOUD_DATASET_URL, params=params)
+    records = list(first.get("data") or [])
+    total = int(first.get("totalCount") or first.get("matchCount") or len(records))
+    pages = -(-total // GAS_INGEST_PER_PAGE) if GAS_INGEST_PER_PAGE > 0 else 1
+
+    sem = asyncio.Semaphore(max(1, GAS_INGEST_CONCURRENCY))
+
+    async def _page(n: int):
+        async with sem:
+            return await acall_odcloud(ODCLOUD_DATASET_URL, params={**params, "page": n})
+
+    rest = await asyncio.gather(*(_page(n) for n in range(2, pages + 1)))
+    for body in rest:
+        records.extend(body.get("data") or [])
+    return records
+
+
+async def _ingest() -> dict:
+    t0 = time.perf_counter()
+    await ensure_migrated()
+    records = await _fetch_all_pages()
+    rows = normalize(records)
+
+    # 이미 같은 내용이면 안 씀 (해시 비교는 한 번에 조회)
+    existing = await afetch_all(
+        f"""
+        SELECT region_code, year, month, content_hash
+        FROM {SCHEMA}.energy_gas
+        WHERE month IS NOT NULL
+        """
+    )
+    known = {
+        (r["region_code"].strip(), str(r["year"]).strip(), r["month"]): r["content_hash"]
+        for r in existing
+    }
+
+    changed = []
+    for (code, year, month), values in rows.items():
+        h = content_hash(values)
+        if known.get((code, year, month)) != h:
+            changed.append((code, year, month, Jsonb(values), h))
+
+    written = 0
+    if changed:
+        written = await aexecute_values(
+            f"""
+            INSERT INTO {SCHEMA}.energy_gas AS g (region_code, year, month, data, content_hash, updated_at)
+            SELECT v.region_code, v.year, v.month::smallint, v.data::jsonb, v.content_hash, now()
+            FROM (VALUES %s) AS v (region_code, year, month, data, content_hash)
+            ON CONFLICT (region_code, year, month) DO UPDATE SET
+                data = EXCLUDED.data,
+                content_hash = EXCLUDED.content_hash,
+                updated_at = now()
+            WHERE g.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+            """,
+            changed,
+        )
+
+    result = {
+        "records": len(records),
+        "rows": len(rows),
+        "written": written,
+        "unchanged": len(rows) - len(changed),
+        "took_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+    log.info("gas ingest done: %s", result)
+    # 조회 miss 경로가 DB를 다시 읽지 않도록 정규화 결과도 같이 넘김
+    return {**result, "normalized": rows}
+
+
+async def ingest(force: bool = False) -> dict | None:
+    """
+    데이터셋 전체 적재 (워커 내부 동시 호출은 1번으로 합침)
+    force=False 면 GAS_INGEST_MIN_INTERVAL 안에 다시 돌지 않음 -> None
+    결과의 "normalized": {(region_code, year, month): 값} (이번에 받은 전체)
+    """
+    if not force and time.monotonic() - _last_ingest < GAS_INGEST_MIN_INTERVAL and _last_ingest:
+        return None
+
+    async def _run():
+        global _last_ingest
+        # 페이지 일괄 호출이 중간에 쿼터(429)로 끊기지 않게 prefetch 우선순위 (빈도는 MIN_INTERVAL 로 제한)
+        with quota.priority(quota.PREFETCH):
+            result = await _ingest()
+        # 성공했을 때만 간격 시작 (odcloud/쿼터/DB 실패면 다음 요청에서 바로 재시도)
+        _last_ingest = time.monotonic()
+        return result
+
+    result, _shared = await singleflight.ado("gas:ingest", _run)
+    return result
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    out = asyncio.run(ingest(force=True))
+    out.pop("normalized", None)
+    print(out)
@@ -0,0 +1,181 @@
+# app/services/http_clients.py
+"""
+업스트림(provider)별 장수명 HTTP 클라이언트
+- 요청마다 DNS/TCP/TLS 새로 맺지 않도록 keep-alive 커넥션 풀 재사용
+- 앱 시작 시 생성(startup), 종료 시 정리(shutdown)
+- httpx.AsyncClient 만 사용 (lifespan 밖에서 호출되면 최초 사용 시 생성)
+"""
+import importlib.util
+import os
+import time
+import asyncio
+import logging
+import threading
+
+import httpx
+
+from app.services import metrics, quota
+from app.services.breaker import CircuitBreaker
+
+log = logging.getLogger(__name__)
+
+# provider -> base url (참고/로그용, 대체 주소 판단 기준)
+PROVIDERS = {
+    "odcloud": "https://api.odcloud.kr",
+    "kepco": "https://bigdata.kepco.co.kr",
+}
+
+# 부하 테스트/로컬용: UPSTREAM_<PROVIDER>_BASE_URL 이 있으면 그 주소로 보냄 (bench/fake_upstream.py)
+# 예: UPSTREAM_KMA_BASE_URL=http://127.0.0.1:9100
+BASE_URLS = {
+    name: (os.getenv(f"UPSTREAM_{name.upper()}_BASE_URL") or "").rstrip("/") or base
+    for name, base in PROVIDERS.items()
+}
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "5"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "0") == "1"
+
+_async_clients: dict = {}
+_lock = threading.Lock()
+_stats = {
+    name: {"requests": 0, "errors": 0, "in_flight": 0, "time_ms_total": 0.0}
+    for name in PROVIDERS
+}
+# provider별 서킷 브레이커 (열려 있으면 업스트림 안 부르고 바로 CircuitOpenError)
+breakers = {name: CircuitBreaker(name) for name in PROVIDERS}
+
+
+def _http2() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    # httpx[http2] 설치 여부만 확인 (import 하지 않음)
+    if importlib.util.find_spec("h2") is not None:
+        return True
+    log.warning("HTTP2_ENABLED=1 but h2 is not installed; falling back to HTTP/1.1")
+    return False
+
+
+def _client_kwargs() -> dict:
+    return {
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(20.0, pool=HTTP_POOL_TIMEOUT),
+        "http2": _http2(),
+        # requests 시절과 동일하게 리다이렉트 따라감
+        "follow_redirects": True,
+    }
+
+
+def get_async_client(provider: str) -> httpx.AsyncClient:
+    c = _async_clients.get(provider)
+    if c is None:
+        c = httpx.AsyncClient(**_client_kwargs())
+        _async_clients[provider] = c
+    return c
+
+
+def startup():
+    # provider별 클라이언트 미리 생성 (첫 요청이 생성 비용을 안 치르게)
+    for name in PROVIDERS:
+        get_async_client(name)
+
+
+async def shutdown():
+    for c in list(_async_clients.values()):
+        await c.aclose()
+    _async_clients.clear()
+
+
+def _begin(provider: str) -> float:
+    with _lock:
+        _stats[provider]["requests"] += 1
+        _stats[provider]["in_flight"] += 1
+    return time.perf_counter()
+
+
+def _url(provider: str, url: str) -> str:
+    base = BASE_URLS[provider]
+    if base != PROVIDERS[provider] and url.startswith(PROVIDERS[provider]):
+        return base + url[len(PROVIDERS[provider]):]
+    return url
+
+
+def _end(provider: str, t0: float, outcome: str, probe: bool = False):
+    """
+    outcome: ok / http_5xx / exception (타임아웃, 연결 실패 등) / cancelled
+    """
+    elapsed = time.perf_counter() - t0
+    breakers[provider].record(probe, outcome, elapsed)
+    with _lock:
+        s = _stats[provider]
+        s["in_flight"] -= 1
+        s["time_ms_total"] += elapsed * 1000
+        if outcome != "ok":
+            s["errors"] += 1
+    lbl = metrics.labels(provider=provider)
+    metrics.observe("upstream_request_duration_seconds", lbl, elapsed)
+    metrics.inc("upstream_requests_total", f'{lbl},outcome="{outcome}"')
+
+
+async def aget(provider: str, url: str, **kwargs) -> httpx.Response:
+    # 서킷 먼저 (open 이면 쿼터 안 씀) -> 키 쿼터
+    probe = breakers[provider].before()
+    try:
+        await quota.acquire(provider)
+    except BaseException:
+        # 시험 호출 자리 반납 (업스트림 상태와 무관)
+        breakers[provider].record(probe, "cancelled", 0)
+        raise
+    t0 = _begin(provider)
+    outcome = "exception"
+    try:
+        r = await get_async_client(provider).get(_url(provider, url), **kwargs)
+        outcome = "http_5xx" if r.status_code >= 500 else "ok"
+        return r
+    except asyncio.CancelledError:
+        # 요청 쪽 취소 -> 업스트림 실패로 세지 않음
+        outcome = "cancelled"
+        raise
+    finally:
+        _end(provider, t0, outcome, probe)
+
+
+def _pool_usage(client) -> dict:
+    # httpcore 커넥션 풀 상태 (내부 속성이라 없으면 생략)
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    conns = getattr(pool, "connections", None)
+    if conns is None:
+        return {}
+    idle = sum(1 for c in conns if c.is_idle())
+    return {"connections": len(conns), "idle": idle, "active": len(conns) - idle}
+
+
+def stats() -> dict:
+    out = {}
+    with _lock:
+        snapshot = {k: dict(v) for k, v in _stats.items()}
+    for name, s in snapshot.items():
+        s["time_ms_total"] = round(s["time_ms_total"], 1)
+        client = _async_clients.get(name)
+        out[name] = {
+            "base": BASE_URLS[name],
+            "open": client is not None,
+            **s,
+            "breaker": breakers[name].stats(),
+            **(_pool_usage(client) if client is not None else {}),
+        }
+    return {
+        "limits": {
+            "max_connections": HTTP_MAX_CONNECTIONS,
+            "max_keepalive": HTTP_MAX_KEEPALIVE,
+            "keepalive_expiry": HTTP_KEEPALIVE_EXPIRY,
+            "http2": HTTP2_ENABLED,
+        },
+        "providers": out,
+    }
@@ -1,10 +1,13 @@
 import os
-import requests
+import httpx
 from fastapi import HTTPException
 
+from app.services import http_clients
+from app.services.breaker import UpstreamRejected, unavailable
+
 KEPCO_HOUSE_AVE_URL = "https://bigdata.kepco.co.kr/openapi/v1/powerUsage/houseAve.do"
 
-def call_kepco_house_ave(year: int, month: int, metroCd: str, timeout: int = 20) -> dict:
+def _house_ave_params(year: int, month: int, metroCd: str) -> dict:
     """
     KEPCO 가구평균 전력사용량 조회 (houseAve)
     - cityCd는 생략
@@ -15,7 +18,7 @@ def call_kepco_house_ave(year: int, month: int, metroCd: str, timeout: int = 20)
     if not api_key:
         raise HTTPException(status_code=500, detail="EMP_API_KEY not set (or KEPCO_API_KEY)")
 
-    params = {
+    return {
         "year": year,
         "month": month,
         "metroCd": metroCd,
@@ -23,12 +26,8 @@ def call_kepco_house_ave(year: int, month: int, metroCd: str, timeout: int = 20)
         "apiKey": api_key,
     }
 
-    try:
-        r = requests.get(KEPCO_HOUSE_AVE_URL, params=params, timeout=timeout)
-    except requests.RequestException as e:
-        raise HTTPException(status_code=502, detail=f"KEPCO request failed: {e}")
-
-    safe_url = r.url.replace(api_key, "***")
+def _house_ave_result(r: httpx.Response, api_key: str) -> dict:
+    safe_url = str(r.url).replace(api_key, "***")
 
     if r.status_code == 200:
         try:
@@ -44,3 +43,12 @@ def call_kepco_house_ave(year: int, month: int, metroCd: str, timeout: int = 20)
         "text_head": r.text[:500],
     }
 
+async def acall_kepco_house_ave(year: int, month: int, metroCd: str, timeout: int = 20) -> dict:
+    params = _house_ave_params(year, month, metroCd)
+    try:
+        r = await http_clients.aget("kepco", KEPCO_HOUSE_AVE_URL, params=params, timeout=timeout)
+    except UpstreamRejected as e:
+        raise unavailable(e)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"KEPCO request failed: {e}")
+    return _house_ave_result(r, params["apiKey"])
@@ -2,8 +2,8 @@ import os
 import hashlib
 from fastapi import HTTPException
 
-from app.services.datago_client import call_odcloud
-from app.services.cache import client as redis_client, cache_get, cache_set
+from app.services.datago_client import acall_odcloud
+from app.services.cache import aclient as aredis_client, aget_or_load_raw
 
 
 def _clean_url(v: str) -> str:
@@ -27,7 +27,10 @@ def _strip_cache_fields(obj: dict) -> dict:
     return obj
 
 
-def call_kpx_now(page: int = 1, perPage: int = 10) -> dict:
+def _kpx_request(page: int, perPage: int):
+    """
+    반환: (dataset url, cache_key, ttl, stale_ttl)
+    """
     url = os.getenv("KPX_ODCLOUD_DATASET_URL")
     if not url:
         raise HTTPException(500, "KPX_ODCLOUD_DATASET_URL not set")
@@ -38,28 +41,30 @@ def call_kpx_now(page: int = 1, perPage: int = 10) -> dict:
     prefix = f"{base_prefix}-kpx"
 
     ttl = int(os.getenv("KPX_CACHE_TTL", "600"))
+    # soft TTL(ttl) 지난 뒤 이 시간 동안은 stale 값 즉시 응답 + 백그라운드 갱신
+    stale_ttl = int(os.getenv("KPX_CACHE_STALE_TTL", str(ttl)))
     raw_key = f"kpx_now?page={page}&perPage={perPage}"
-    cache_key = _make_cache_key(prefix, raw_key)
+    return url, _make_cache_key(prefix, raw_key), ttl, stale_ttl
 
-    # HIT
-    try:
-        r = redis_client()
-        cached = cache_get(r, cache_key)
-        if cached is not None:
-            cached = _strip_cache_fields(cached)
-            return {**cached, "cache": True, "cache_key": cache_key}
-    except Exception:
-        pass
 
-    # MISS
-    data = call_odcloud(url, params={"page": page, "perPage": perPage, "returnType": "JSON"})
-    data_to_store = _strip_cache_fields(data)
+async def acall_kpx_now(page: int = 1, perPage: int = 10):
+    """
+    KPX 현재 수급 (redis.asyncio + httpx.AsyncClient)
+    - 동시 miss는 key당 odcloud 1번만, 레플리카 간은 Redis 락
+    반환: (직렬화된 본문 바이트, cached, stale, cache_key)
+    - hit는 캐시 바이트 그대로 (perPage=1000 같은 큰 페이지도 파싱/재인코딩 없음)
+    - cache/stale/cache_key 는 본문이 아니라 라우터에서 응답 헤더로
+    """
+    url, cache_key, ttl, stale_ttl = _kpx_request(page, perPage)
 
     try:
-        r = redis_client()
-        cache_set(r, cache_key, data_to_store, ttl)
+        r = aredis_client()
     except Exception:
-        pass
+        r = None
 
-    return {**data_to_store, "cache": False, "cache_key": cache_key}
+    async def _load():
+        data = await acall_odcloud(url, params={"page": page, "perPage": perPage, "returnType": "JSON"})
+        return _strip_cache_fields(data), ttl
 
+    body, cached, stale = await aget_or_load_raw(r, cache_key, _load, stale_ttl)
+    return body, cached, stale, cache_key
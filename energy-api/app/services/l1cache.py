@@ -0,0 +1,105 @@
+# app/services/l1cache.py
+"""
+워커 프로세스 내부 L1 캐시 (Redis = L2 앞단)
+- LRU + 최대 엔트리 수/바이트 예산 (크기는 직렬화 문자열 길이 기준 근사)
+- TTL = min(L1_CACHE_TTL_SECONDS, Redis 남은 TTL) -> Redis보다 오래 살지 않음
+- 기본 비활성 (L1_CACHE_ENABLED=1 로 켬)
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+
+L1_CACHE_ENABLED = os.getenv("L1_CACHE_ENABLED", "0") == "1"
+L1_CACHE_MAX_ENTRIES = int(os.getenv("L1_CACHE_MAX_ENTRIES", "512"))
+L1_CACHE_MAX_BYTES = int(os.getenv("L1_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+L1_CACHE_TTL_SECONDS = float(os.getenv("L1_CACHE_TTL_SECONDS", "60"))
+
+
+def _copy(v):
+    # 호출부가 응답 dict에 필드를 덧붙이는 경우가 있어 최상위는 복사해서 내줌
+    return dict(v) if isinstance(v, dict) else v
+
+
+class L1Cache:
+    def __init__(self, enabled: bool, max_entries: int, max_bytes: int, max_ttl: float):
+        self.enabled = enabled and max_entries > 0 and max_bytes > 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_ttl = max_ttl
+
+        self._lock = threading.Lock()
+        # key -> (value, l1_expires_at, l2_expires_at, size)
+        self._data: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key: str):
+        """
+        반환: (value, Redis 기준 남은 TTL 초) 또는 None
+        """
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            value, expires_at, l2_expires_at, size = entry
+            if expires_at <= now:
+                self._drop(key, size)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+        remaining = int(l2_expires_at - now) if l2_expires_at is not None else None
+        return _copy(value), remaining
+
+    def put(self, key: str, value, size: int, l2_ttl: float | None):
+        """
+        l2_ttl: Redis에 남은 TTL(초). None 이면 만료 없음으로 보고 max_ttl만 적용
+        """
+        if not self.enabled or size > self.max_bytes:
+            return
+        if l2_ttl is not None and l2_ttl <= 0:
+            return
+        now = time.monotonic()
+        ttl = self.max_ttl if l2_ttl is None else min(self.max_ttl, l2_ttl)
+        l2_expires_at = now + l2_ttl if l2_ttl is not None else None
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[3]
+            self._data[key] = (_copy(value), now + ttl, l2_expires_at, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                k, entry = self._data.popitem(last=False)
+                self._bytes -= entry[3]
+                self._stats["evictions"] += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._drop(key, entry[3])
+
+    def _drop(self, key: str, size: int):
+        del self._data[key]
+        self._bytes -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "max_ttl": self.max_ttl,
+                **self._stats,
+            }
+
+
+l1 = L1Cache(L1_CACHE_ENABLED, L1_CACHE_MAX_ENTRIES, L1_CACHE_MAX_BYTES, L1_CACHE_TTL_SECONDS)
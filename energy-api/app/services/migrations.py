@@ -0,0 +1,155 @@
+# app/services/migrations.py
+"""
+DB 스키마 마이그레이션 (테이블 / 유니크 키 / 조회 인덱스)
+- MIGRATIONS 를 버전 순서대로 적용, schema_migrations 에 기록된 버전은 건너뜀
+- 전체를 트랜잭션 1개 + advisory lock 으로 실행 -> 레플리카가 동시에 떠도 1곳만 적용
+- 이미 손으로 만든 테이블이 있어도 깨지지 않게 IF NOT EXISTS 로 작성
+- 이미 적용된 버전은 고치지 말고 새 버전을 뒤에 추가
+
+수동 실행: python -m app.services.migrations
+"""
+import asyncio
+import logging
+import os
+
+from app.services.db import aget_cursor
+
+log = logging.getLogger(__name__)
+
+SCHEMA = os.getenv("DB_SCHEMA", "api")
+
+# 앱에서 자동 적용 (lifespan 시작 시 1번, 실패했으면 새 컬럼을 쓰는 라우트에서 재시도) / 0이면 수동 실행만
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "1") == "1"
+
+# pg_advisory_xact_lock 키 (서비스별로 다르게)
+MIGRATION_LOCK_ID = 7_301_001
+
+MIGRATIONS: list[tuple[int, str, list[str]]] = [
+    (1, "base tables", [
+        f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA}.energy_kepco_monthly (
+            id bigserial PRIMARY KEY,
+            region_code varchar(8) NOT NULL,
+            ym varchar(6) NOT NULL,
+            data jsonb NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now()
+        )
+        """,
+        f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA}.energy_gas (
+            id bigserial PRIMARY KEY,
+            region_code varchar(8) NOT NULL,
+            year varchar(4) NOT NULL,
+            data jsonb NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now()
+        )
+        """,
+    ]),
+    # gas_ingest 가 쓰는 지역/연도/월 정규화 행 (예전 원본 통째 저장 행은 month IS NULL)
+    (2, "energy_gas normalized rows", [
+        f"""
+        ALTER TABLE {SCHEMA}.energy_gas
+            ADD COLUMN IF NOT EXISTS month smallint,
+            ADD COLUMN IF NOT EXISTS content_hash text,
+            ADD COLUMN IF NOT EXISTS updated_at timestamptz
+        """,
+        f"""
+        CREATE UNIQUE INDEX IF NOT EXISTS energy_gas_region_year_month_uq
+        ON {SCHEMA}.energy_gas (region_code, year, month)
+        """,
+    ]),
+    # WHERE 키 = .. ORDER BY created_at DESC LIMIT 1 -> 인덱스 첫 항목만 읽음
+    (3, "latest-row indexes", [
+        f"""
+        CREATE INDEX IF NOT EXISTS energy_kepco_monthly_region_ym_created_idx
+        ON {SCHEMA}.energy_kepco_monthly (region_code, ym, created_at DESC)
+        """,
+        f"""
+        CREATE INDEX IF NOT EXISTS energy_gas_region_year_created_idx
+        ON {SCHEMA}.energy_gas (region_code, year, created_at DESC)
+        """,
+    ]),
+    # miss 경로를 upsert 1번으로: (region_code, ym) 당 1행 (기존 중복은 최신만 남김)
+    (4, "energy_kepco_monthly unique key", [
+        f"""
+        DELETE FROM {SCHEMA}.energy_kepco_monthly t
+        USING {SCHEMA}.energy_kepco_monthly newer
+        WHERE newer.region_code = t.region_code
+          AND newer.ym = t.ym
+          AND (newer.created_at, newer.id) > (t.created_at, t.id)
+        """,
+        f"""
+        CREATE UNIQUE INDEX IF NOT EXISTS energy_kepco_monthly_region_ym_uq
+        ON {SCHEMA}.energy_kepco_monthly (region_code, ym)
+        """,
+    ]),
+    # ETag 용 (새 행은 앱에서 conditional.content_hash, 기존 행은 md5 로 채움 - 행마다 일정하기만 하면 됨)
+    (5, "energy_kepco_monthly content_hash", [
+        f"ALTER TABLE {SCHEMA}.energy_kepco_monthly ADD COLUMN IF NOT EXISTS content_hash text",
+        f"UPDATE {SCHEMA}.energy_kepco_monthly SET content_hash = md5(data::text) WHERE content_hash IS NULL",
+    ]),
+]
+
+_migrated = False
+_lock = asyncio.Lock()
+
+
+async def migrate() -> list[int]:
+    """
+    아직 안 된 버전 적용 -> 이번에 적용한 버전 목록
+    """
+    applied = []
+    async with aget_cursor(False) as cur:
+        # 락을 먼저: 동시에 뜬 레플리카는 여기서 대기 후 이미 적용된 걸 보고 건너뜀
+        await cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        await cur.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+        await cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {SCHEMA}.schema_migrations (
+                version integer PRIMARY KEY,
+                name text NOT NULL,
+                applied_at timestamptz NOT NULL DEFAULT now()
+            )
+            """
+        )
+        await cur.execute(f"SELECT version FROM {SCHEMA}.schema_migrations")
+        done = {r[0] for r in await cur.fetchall()}
+
+        for version, name, statements in MIGRATIONS:
+            if version in done:
+                continue
+            for sql in statements:
+                await cur.execute(sql)
+            await cur.execute(
+                f"INSERT INTO {SCHEMA}.schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name),
+            )
+            applied.append(version)
+            log.info("migration %s applied: %s", version, name)
+    return applied
+
+
+async def ensure_migrated() -> None:
+    """
+    워커당 1번만 실제로 확인 (시작 시 실패했으면 다음 요청에서 다시 시도, 성공 후엔 바로 return)
+    """
+    global _migrated
+    if _migrated or not DB_AUTO_MIGRATE:
+        return
+    async with _lock:
+        if not _migrated:
+            await migrate()
+            _migrated = True
+
+
+async def startup() -> None:
+    try:
+        await ensure_migrated()
+    except Exception:
+        # 부팅 시 DB가 잠깐 늦어도 앱이 안 죽게 (라우트에서 다시 시도)
+        log.warning("DB migration on startup failed", exc_info=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print({"applied": asyncio.run(migrate())})
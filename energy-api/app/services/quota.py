@@ -0,0 +1,247 @@
+# app/services/quota.py
+"""
+업스트림 API 키 쿼터 (Redis 토큰 버킷, 모든 레플리카/워커 공유)
+- API 키별 초당 한도(토큰 버킷) + 하루 한도(KST 날짜별 카운터)를 Lua 1번으로 확인/차감
+- 같은 키 값을 쓰는 provider/서비스는 같은 버킷 (키 값의 해시로 구분)
+  -> 한도도 키 기준: QUOTA_KEY_<key_id>_* 가 있으면 provider 설정보다 우선 (key_id 는 /health/quota 에 노출)
+     공유 키를 쓰는 서비스들은 모두 같은 QUOTA_KEY_<key_id>_* 를 둘 것 (다르면 호출마다 다른 한도로 버킷을 계산)
+- 우선순위: prefetch(스케줄/수동 적재) > user(요청 miss)
+  user 는 버킷에 QUOTA_USER_RESERVE_RATIO 만큼 남겨두고, 하루 한도도 QUOTA_USER_DAILY_SHARE 까지만
+  -> 트래픽 스파이크가 하루 쿼터를 다 써도 prefetch 는 돌 수 있음
+- 초과하면 업스트림을 부르지 않고 QuotaExceededError(429) -> 라우트의 캐시/DB 폴백으로
+- Redis 장애 시에는 통과 (쿼터 때문에 서비스가 멈추지 않게)
+"""
+import asyncio
+import hashlib
+import logging
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+
+from app.services import metrics
+from app.services.breaker import UpstreamRejected
+
+log = logging.getLogger(__name__)
+
+QUOTA_ENABLED = os.getenv("QUOTA_ENABLED", "1") == "1"
+# 서비스가 달라도 같은 Redis 면 같은 키 값은 같은 버킷 -> 서비스별 REDIS_PREFIX 와 별개
+QUOTA_PREFIX = os.getenv("QUOTA_PREFIX", "quota")
+QUOTA_USER_RESERVE_RATIO = float(os.getenv("QUOTA_USER_RESERVE_RATIO", "0.2"))
+QUOTA_USER_DAILY_SHARE = float(os.getenv("QUOTA_USER_DAILY_SHARE", "0.8"))
+# prefetch 는 초당 한도에 걸리면 실패 대신 이 시간(초)까지 기다렸다가 호출 (하루 한도는 기다리지 않음)
+QUOTA_PREFETCH_MAX_WAIT_SECONDS = float(os.getenv("QUOTA_PREFETCH_MAX_WAIT_SECONDS", "30"))
+
+PREFETCH = "prefetch"
+USER = "user"
+
+# provider -> API 키 env (앞에서부터 처음 있는 것)
+API_KEY_ENVS = {
+    "odcloud": ("DATA_GO_KR_SERVICE_KEY",),
+    "kepco": ("EMP_API_KEY", "KEPCO_API_KEY", "KEPCO_SERVICE_KEY"),
+}
+
+# provider -> (초당, 버스트, 하루) 기본값 / QUOTA_<PROVIDER>_PER_SECOND|BURST|DAILY 로 변경, 0이면 제한 없음
+# 발급받은 키의 실제 한도에 맞출 것 / 같은 키를 여러 provider·서비스가 쓰면 QUOTA_KEY_<key_id>_* 로 한 번에
+_DEFAULTS = {
+    "odcloud": (10, 20, 10000),
+    "kepco": (5, 10, 10000),
+}
+
+KST = timezone(timedelta(hours=9))
+
+_priority: ContextVar[str] = ContextVar("quota_priority", default=USER)
+
+# KEYS[1]=버킷 해시, KEYS[2]=오늘 사용량
+# ARGV: now_ms, 초당, 버스트, 남겨둘 토큰, 하루 한도(이 우선순위 기준), 하루 키 TTL(초)
+# 반환: {1, 0} 통과 / {0, 대기 ms} 초당 초과 / {0, -1} 하루 한도 초과
+_LUA = """
+local now = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local reserve = tonumber(ARGV[4])
+local daily = tonumber(ARGV[5])
+
+if daily > 0 then
+  local used = tonumber(redis.call('GET', KEYS[2]) or '0')
+  if used >= daily then
+    return {0, -1}
+  end
+end
+
+if rate > 0 then
+  local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+  local tokens = tonumber(b[1])
+  local ts = tonumber(b[2])
+  if tokens == nil or ts == nil then
+    tokens = burst
+    ts = now
+  end
+  tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / 1000)
+  local ttl = math.ceil(burst / rate * 1000) + 1000
+  if tokens < 1 + reserve then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], ttl)
+    return {0, math.ceil((1 + reserve - tokens) * 1000 / rate)}
+  end
+  redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - 1), 'ts', now)
+  redis.call('PEXPIRE', KEYS[1], ttl)
+end
+
+if daily > 0 then
+  if redis.call('INCR', KEYS[2]) == 1 then
+    redis.call('EXPIRE', KEYS[2], tonumber(ARGV[6]))
+  end
+end
+return {1, 0}
+"""
+
+
+class QuotaExceededError(UpstreamRejected):
+    status_code = 429
+    reason = "quota exceeded"
+
+
+@contextmanager
+def priority(cls: str):
+    """
+    with quota.priority(quota.PREFETCH): ...  -> 그 안의 업스트림 호출은 이 우선순위
+    (contextvar: 안에서 만든 asyncio task 에도 전달됨)
+    """
+    token = _priority.set(cls)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def _budget(provider: str) -> tuple[float, float, int]:
+    # 우선순위: QUOTA_KEY_<key_id>_* (버킷과 같은 기준) > QUOTA_<PROVIDER>_* > _DEFAULTS
+    rate, burst, daily = _DEFAULTS.get(provider, (0, 0, 0))
+    key_env = f"QUOTA_KEY_{_key_id(provider).upper()}"
+    env = f"QUOTA_{provider.upper()}"
+
+    def _get(suffix: str, default) -> str:
+        return os.getenv(f"{key_env}_{suffix}") or os.getenv(f"{env}_{suffix}", str(default))
+
+    rate = float(_get("PER_SECOND", rate))
+    burst = float(_get("BURST", burst)) or rate
+    daily = int(_get("DAILY", daily))
+    return rate, max(burst, 1.0), daily
+
+
+def _key_id(provider: str) -> str:
+    # 키 값 자체는 Redis 에 남기지 않음
+    for name in API_KEY_ENVS.get(provider, ()):
+        v = os.getenv(name)
+        if v:
+            return hashlib.sha256(v.encode("utf-8")).hexdigest()[:16]
+    return provider
+
+
+def _now_kst() -> datetime:
+    return datetime.now(KST)
+
+
+def _args(provider: str, cls: str):
+    rate, burst, daily = _budget(provider)
+    user = cls != PREFETCH
+    reserve = burst * QUOTA_USER_RESERVE_RATIO if user else 0
+    if daily > 0 and user:
+        daily = int(daily * QUOTA_USER_DAILY_SHARE)
+    now = _now_kst()
+    kid = _key_id(provider)
+    keys = [f"{QUOTA_PREFIX}:{kid}:bucket", f"{QUOTA_PREFIX}:{kid}:day:{now:%Y%m%d}"]
+    args = [int(now.timestamp() * 1000), rate, burst, reserve, daily, 2 * 86400]
+    return keys, args, (rate, daily)
+
+
+def _seconds_to_midnight() -> float:
+    now = _now_kst()
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+def _wait(cls: str, res, waited: float) -> float | None:
+    # prefetch + 초당 한도 초과면 기다릴 시간(초), 아니면 None
+    ok, wait_ms = int(res[0]), int(res[1])
+    if ok or cls != PREFETCH or wait_ms < 0:
+        return None
+    delay = wait_ms / 1000
+    return delay if waited + delay <= QUOTA_PREFETCH_MAX_WAIT_SECONDS else None
+
+
+def _verdict(provider: str, cls: str, res) -> None:
+    ok, wait_ms = int(res[0]), int(res[1])
+    if ok:
+        return
+    metrics.inc("upstream_quota_rejected_total", metrics.labels(
+        provider=provider, priority=cls, limit="daily" if wait_ms < 0 else "rate",
+    ))
+    raise QuotaExceededError(provider, _seconds_to_midnight() if wait_ms < 0 else wait_ms / 1000)
+
+
+_scripts: dict = {}
+
+
+def _script(r):
+    # 클라이언트별로 1번 등록 (EVALSHA, 없으면 EVAL)
+    s = _scripts.get(id(r))
+    if s is None:
+        s = _scripts[id(r)] = r.register_script(_LUA)
+    return s
+
+
+async def acquire(provider: str) -> None:
+    """
+    업스트림 호출 전: 한도 안이면 통과(차감), 넘으면 QuotaExceededError
+    """
+    if not QUOTA_ENABLED:
+        return
+    cls = _priority.get()
+    # cache -> http_clients 순환 import 없음 (cache 는 http_clients 를 안 씀)
+    from app.services.cache import aclient
+
+    waited = 0.0
+    while True:
+        keys, args, (rate, daily) = _args(provider, cls)
+        if rate <= 0 and daily <= 0:
+            return
+        try:
+            res = await _script(aclient())(keys=keys, args=args)
+        except Exception:
+            metrics.inc("upstream_quota_errors_total", metrics.labels(provider=provider))
+            log.debug("quota check failed, allowing: %s", provider, exc_info=True)
+            return
+        delay = _wait(cls, res, waited)
+        if delay is None:
+            break
+        waited += delay
+        await asyncio.sleep(delay)
+    _verdict(provider, cls, res)
+
+
+async def status() -> dict:
+    """
+    /health/quota: provider별 한도와 오늘 사용량 (키 값은 노출 안 함)
+    """
+    from app.services.cache import aclient
+
+    out = {}
+    for provider in API_KEY_ENVS:
+        rate, burst, daily = _budget(provider)
+        keys, _, _ = _args(provider, PREFETCH)
+        try:
+            used = await aclient().get(keys[1])
+            used = int(used or 0)
+        except Exception:
+            used = None
+        out[provider] = {
+            "key_id": _key_id(provider),
+            "per_second": rate,
+            "burst": burst,
+            "daily": daily,
+            "user_daily": int(daily * QUOTA_USER_DAILY_SHARE) if daily > 0 else 0,
+            "used_today": used,
+        }
+    return {"enabled": QUOTA_ENABLED, "providers": out}
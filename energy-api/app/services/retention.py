@@ -0,0 +1,96 @@
+# app/services/retention.py
+"""
+오래된 중복 행 정리 (테이블이 커져도 조회가 인덱스 몇 페이지로 끝나게)
+- energy_gas: 정규화 행(month)이 생긴 지역/연도의 예전 원본 통째 저장 행(month IS NULL) 삭제,
+  나머지 원본 행도 (region_code, year) 별 최신 1행만 유지
+- 레플리카 여러 개면 advisory lock 잡은 1곳만 실행
+
+수동 실행: python -m app.services.retention
+"""
+import asyncio
+import logging
+import os
+import time
+
+from app.services.db import aget_cursor
+
+log = logging.getLogger(__name__)
+
+SCHEMA = os.getenv("DB_SCHEMA", "api")
+
+# 주기(초), 0이면 백그라운드 실행 안 함 (수동 실행만)
+RETENTION_INTERVAL_SECONDS = int(os.getenv("RETENTION_INTERVAL_SECONDS", "86400"))
+
+RETENTION_LOCK_ID = 7_301_002
+
+PRUNE_SQL = {
+    "gas_legacy_superseded": f"""
+        DELETE FROM {SCHEMA}.energy_gas t
+        WHERE t.month IS NULL
+          AND EXISTS (
+              SELECT 1 FROM {SCHEMA}.energy_gas n
+              WHERE n.region_code = t.region_code
+                AND n.year = t.year
+                AND n.month IS NOT NULL
+          )
+    """,
+    "gas_legacy_duplicates": f"""
+        DELETE FROM {SCHEMA}.energy_gas t
+        USING {SCHEMA}.energy_gas newer
+        WHERE t.month IS NULL
+          AND newer.month IS NULL
+          AND newer.region_code = t.region_code
+          AND newer.year = t.year
+          AND (newer.created_at, newer.id) > (t.created_at, t.id)
+    """,
+}
+
+_task: asyncio.Task | None = None
+
+
+async def prune() -> dict | None:
+    """
+    정리 1회 -> {항목: 삭제 행 수}, 다른 레플리카가 실행 중이면 None
+    """
+    t0 = time.perf_counter()
+    out = {}
+    async with aget_cursor(False) as cur:
+        await cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (RETENTION_LOCK_ID,))
+        if not (await cur.fetchone())[0]:
+            return None
+        for name, sql in PRUNE_SQL.items():
+            await cur.execute(sql)
+            out[name] = cur.rowcount
+    out["took_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    log.info("retention done: %s", out)
+    return out
+
+
+async def _loop() -> None:
+    while True:
+        await asyncio.sleep(RETENTION_INTERVAL_SECONDS)
+        try:
+            await prune()
+        except Exception:
+            log.warning("retention failed", exc_info=True)
+
+
+def start() -> None:
+    global _task
+    if RETENTION_INTERVAL_SECONDS <= 0 or _task is not None:
+        return
+    _task = asyncio.create_task(_loop())
+
+
+async def stop() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    await asyncio.gather(_task, return_exceptions=True)
+    _task = None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(prune()))
@@ -0,0 +1,62 @@
+# app/services/singleflight.py
+"""
+캐시 miss 시 업스트림 호출 합치기(single-flight)
+- 프로세스 내부: 같은 key로 동시에 들어온 요청은 먼저 온 1개만 fn 실행, 나머지는 결과 공유
+  (이벤트 루프 안에서 Future로 합침)
+- 레플리카/워커 간: Redis SET NX PX 짧은 락으로 1개만 fetch, 나머지는 결과 대기
+"""
+import asyncio
+import uuid
+
+# 내 토큰일 때만 삭제 (락 TTL 만료 후 다른 워커가 잡은 락을 지우지 않도록)
+_UNLOCK_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# key -> asyncio.Future (이벤트 루프 1개 안에서만 쓰므로 락 불필요)
+_acalls: dict = {}
+
+
+async def ado(key: str, fn):
+    """
+    fn은 coroutine 함수
+    반환: (결과, shared)
+    - shared=True 이면 다른 요청이 실행한 결과를 받은 것
+    - fn 예외는 대기 중인 모든 요청에 그대로 전달
+    - 기다리던 요청이 취소돼도 실행 중인 fn은 계속 (shield)
+    """
+    fut = _acalls.get(key)
+    if fut is not None:
+        return await asyncio.shield(fut), True
+
+    async def _run():
+        try:
+            return await fn()
+        finally:
+            _acalls.pop(key, None)
+
+    fut = asyncio.ensure_future(_run())
+    _acalls[key] = fut
+    return await asyncio.shield(fut), False
+
+
+def lock_key(key: str) -> str:
+    return f"{key}:lock"
+
+
+async def aredis_lock(r, key: str, ttl_ms: int):
+    """
+    성공 시 토큰, 이미 다른 워커가 잡고 있으면 None
+    (Redis 장애는 호출부에서 처리)
+    """
+    token = uuid.uuid4().hex
+    if await r.set(lock_key(key), token, nx=True, px=ttl_ms):
+        return token
+    return None
+
+
+async def aredis_unlock(r, key: str, token: str) -> None:
+    await r.eval(_UNLOCK_LUA, 1, lock_key(key), token)
@@ -1,22 +1,87 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from app.routers.ultra_ncst import router as ultra_router
 from app.routers.short_fcst import router as short_router
 from app.routers.mid_land import router as mid_land_router
 from app.routers.mid_temp import router as mid_temp_router
-from app.routers import dust
+from app.routers import dust, prefetch
+from app.services import cache, http_clients, metrics, migrations, quota, retention
+from app.services.db import close_async_pool, pool_stats
+
+
+HTTP_GZIP_MIN_BYTES = int(os.getenv("HTTP_GZIP_MIN_BYTES", "1024"))
+HTTP_GZIP_LEVEL = int(os.getenv("HTTP_GZIP_LEVEL", "6"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    http_clients.startup()
+    await migrations.startup()
+    prefetch.start()
+    retention.start()
+    metrics.start(cache.aclient())
+    yield
+    await metrics.stop(cache.aclient())
+    await retention.stop()
+    await prefetch.stop()
+    await dust.shutdown()
+    await cache.ashutdown()
+    await http_clients.shutdown()
+    await close_async_pool()
+
 
 app = FastAPI(
     title="KMA Weather API",
     description="KMA Weather API Wrapper (Ultra/Short/Mid)",
     version="1.1.0",
+    lifespan=lifespan,
 )
 
+# Accept-Encoding: gzip 이면 응답 압축 (이 크기 이상만)
+# 캐시에 gzip 으로 저장된 본문은 라우트가 Content-Encoding 을 달아 보냄 -> 여기서 다시 압축 안 함
+app.add_middleware(GZipMiddleware, minimum_size=HTTP_GZIP_MIN_BYTES, compresslevel=HTTP_GZIP_LEVEL)
+# 라우트별 지연/상태 (가장 바깥: 압축 시간까지 포함)
+app.add_middleware(metrics.MetricsMiddleware)
+
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
+@app.get("/health/db")
+async def health_db():
+    # 레플리카별 풀 사이징용 (워커 프로세스 단위 값)
+    return {"status": "ok", "pool": pool_stats()}
+
+@app.get("/health/http")
+async def health_http():
+    # provider별 업스트림 커넥션 풀 사용량 + 서킷 브레이커 상태
+    return {"status": "ok", **http_clients.stats()}
+
+@app.get("/health/cache")
+async def health_cache():
+    # 워커 단위 L1/L2(Redis) hit/miss
+    return {"status": "ok", **cache.stats()}
+
+@app.get("/health/quota")
+async def health_quota():
+    # API 키별 쿼터 한도 + 오늘 사용량 (Redis 공유 값)
+    return {"status": "ok", **await quota.status()}
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    # Prometheus 텍스트 형식 (레플리카 내 전체 워커 합계)
+    return PlainTextResponse(
+        await metrics.exposition(cache.aclient()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
 app.include_router(ultra_router, prefix="/weather", tags=["ultra"])
 app.include_router(short_router, prefix="/weather", tags=["short"])
 app.include_router(mid_land_router, prefix="/weather", tags=["mid"])
 app.include_router(mid_temp_router, prefix="/weather", tags=["mid"])
+app.include_router(prefetch.router, prefix="/weather", tags=["prefetch"])
 app.include_router(dust.router)
@@ -1,24 +1,38 @@
 # app/routers/dust.py
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
 import os
 import time
 import hashlib
-from datetime import date
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query
 
 from app.services.air_client import fetch_forecast_xml, fetch_realtime_json
-from app.services.air_parser import parse_seoul_grade, parse_seoul_realtime
+from app.services.air_parser import (
+    SIDO_NAMES,
+    build_station_index,
+    normalize_sido,
+    parse_grade_map,
+    realtime_from_index,
+    seoul_grade_from_map,
+)
+from app.services import singleflight
+from app.services.cache import count_l1, count_l2, count_stale, is_stale, loads, pack, release_ttl, CACHE_LOCK_TTL_MS
+from app.services.l1cache import l1
+from app.services.time_rules import now_kst
+
+log = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/dust", tags=["Dust"])
 
 # =========================
-# Redis cache (sync client)
+# Redis cache (async client - 이벤트 루프를 막지 않음)
 # =========================
 try:
-    import redis  # type: ignore
+    import redis.asyncio as redis  # type: ignore
 except Exception:
     redis = None  # redis 미설치/미사용 환경 대비
 
@@ -27,6 +41,8 @@ REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
 
 REDIS_PREFIX_DUST = os.getenv("REDIS_PREFIX_DUST", "dust")
 REDIS_TTL_DUST_SECONDS = int(os.getenv("REDIS_TTL_DUST_SECONDS", "1800"))
+# soft TTL 지난 뒤 이 시간 동안은 stale 값 즉시 응답 + 백그라운드 갱신
+REDIS_STALE_DUST_SECONDS = int(os.getenv("REDIS_STALE_DUST_SECONDS", str(REDIS_TTL_DUST_SECONDS)))
 
 _rds = None
 if redis is not None:
@@ -35,7 +51,8 @@ if redis is not None:
             host=REDIS_HOST,
             port=REDIS_PORT,
             db=0,
-            decode_responses=True,
+            # 값이 gzip 으로 저장될 수 있음 (CACHE_COMPRESS) -> 바이트로 읽고 cache.loads 로 해석
+            decode_responses=False,
             socket_connect_timeout=1,
             socket_timeout=2,
         )
@@ -56,34 +73,285 @@ def _cache_key(endpoint: str, search_date: str, station: str | None) -> str:
     return f"{REDIS_PREFIX_DUST}:{endpoint}:{h}"
 
 
-def _cache_get(key: str) -> tuple[dict | None, int | None]:
+async def _cache_get(key: str) -> tuple[dict | None, int | None]:
+    # L1(워커 내부) 먼저 -> Redis 왕복/json.loads 없이 응답
+    hit = l1.get(key)
+    if hit is not None:
+        count_l1(key)
+        return hit
     if _rds is None:
         return None, None
     try:
-        cached = _rds.get(key)
+        pipe = _rds.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.ttl(key)
+        cached, ttl = await pipe.execute()
+        count_l2(bool(cached), key)
         if not cached:
             return None, None
-        data = json.loads(cached)
-        ttl = _rds.ttl(key)
+        data = loads(cached)
+        l1.put(key, data, len(cached), ttl if ttl and ttl > 0 else None)
         return data, ttl
     except Exception:
         return None, None
 
 
-def _cache_set(key: str, value: dict, ttl_seconds: int) -> None:
+async def _cache_set(key: str, value: dict | str, ttl_seconds: int) -> None:
     if _rds is None:
         return
     try:
-        _rds.setex(key, ttl_seconds, json.dumps(value, ensure_ascii=False))
+        # 원본 XML/JSON 은 반복이 많아서 압축 효과가 큼 (CACHE_COMPRESS_MIN_BYTES 이상만)
+        raw = pack(value)
+        await _rds.setex(key, ttl_seconds, raw)
+        if l1.enabled:
+            l1.put(key, loads(raw), len(raw), ttl_seconds)
     except Exception:
         return
 
 
-async def _one(kind: str, search_date: str, station: str | None):
+# =========================
+# AirKorea 원본 payload 캐시 (엔드포인트/측정소와 무관하게 공유)
+# - 예보 XML: (searchDate, InformCode) / 실시간 JSON: (sidoName, numOfRows, pageNo)
+# - 측정소별/엔드포인트별 응답은 이 원본에서 파싱만 다시 함
+# =========================
+_raw_inflight: dict[str, asyncio.Task] = {}
+
+
+def _raw_key(*parts) -> str:
+    return ":".join([REDIS_PREFIX_DUST, "raw", *(str(p) for p in parts)])
+
+
+def _forecast_ok(xml: str) -> bool:
+    # 에러 응답(SERVICE KEY 오류 등)도 200 + XML로 옴 -> 정상 코드일 때만 캐시
+    return "<resultCode>00</resultCode>" in xml
+
+
+def _realtime_ok(data: dict) -> bool:
+    try:
+        return data["response"]["header"]["resultCode"] == "00"
+    except Exception:
+        return False
+
+
+async def _raw_cached(key: str, fetch, ok, *products: str):
+    """
+    원본 캐시 hit -> 그대로 / miss -> 워커 내부에서 key당 1번만 fetch 후 캐시
+    TTL은 해당 데이터의 다음 발표 직후까지
+    반환: (value, 캐시에 남은 TTL 초 | None)
+    """
+    value, ttl = await _cache_get(key)
+    if value is not None:
+        return value, (ttl if ttl and ttl > 0 else None)
+
+    task = _raw_inflight.get(key)
+    if task is None:
+        async def _load():
+            try:
+                v = await fetch()
+                if not ok(v):
+                    return v, None
+                ttl = release_ttl(REDIS_TTL_DUST_SECONDS, *products)
+                await _cache_set(key, v, ttl)
+                return v, ttl
+            finally:
+                _raw_inflight.pop(key, None)
+
+        task = asyncio.ensure_future(_load())
+        _raw_inflight[key] = task
+    # 기다리던 요청 하나가 취소돼도 공유 fetch는 계속
+    return await asyncio.shield(task)
+
+
+async def cached_forecast_xml(search_date: str, inform_code: str):
+    """
+    반환: (XML, 남은 TTL 초 | None)
+    """
+    return await _raw_cached(
+        _raw_key("forecast", search_date, inform_code),
+        lambda: fetch_forecast_xml(search_date, inform_code),
+        _forecast_ok,
+        "dust_fcst",
+    )
+
+
+async def cached_realtime_json(sido_name: str, num_rows: int = 100, page_no: int = 1):
+    """
+    반환: (payload, 남은 TTL 초 | None)
+    """
+    return await _raw_cached(
+        _raw_key("realtime", sido_name, num_rows, page_no),
+        lambda: fetch_realtime_json(sido_name, num_rows, page_no),
+        _realtime_ok,
+        "dust_realtime",
+    )
+
+
+# 시도 하나 전체 측정소를 1페이지로 (경기도 측정소 100곳 이상)
+AIRKOREA_REALTIME_ROWS = int(os.getenv("AIRKOREA_REALTIME_ROWS", "1000"))
+
+# sido -> (만료 monotonic, 측정소 인덱스) / (searchDate, InformCode) -> (만료 monotonic, 날짜별 등급표)
+# 원본 payload 캐시와 같은 시점에 만료 -> 갱신 주기당 파싱 1번
+_indexes: dict[str, tuple[float, dict]] = {}
+_grade_maps: dict[tuple[str, str], tuple[float, dict]] = {}
+# memo 하나당 최대 항목 수 (만료 전이라도 넘치면 오래된 것부터 버림)
+DUST_MEMO_MAX_ENTRIES = int(os.getenv("DUST_MEMO_MAX_ENTRIES", "64"))
+
+
+def _memo_put(memo: dict, key, ttl: int | None, value) -> None:
+    if not ttl:
+        return
+    now = time.monotonic()
+    # 만료된 항목 정리 (searchDate는 요청마다 달라질 수 있음)
+    for k in [k for k, (exp, _) in memo.items() if exp <= now]:
+        memo.pop(k, None)
+    memo.pop(key, None)
+    # 그래도 꽉 차면 가장 먼저 넣은 항목부터 제거 (dict 는 삽입 순서 유지)
+    while memo and len(memo) >= max(1, DUST_MEMO_MAX_ENTRIES):
+        memo.pop(next(iter(memo)))
+    memo[key] = (now + ttl, value)
+
+
+def _memo_get(memo: dict, key):
+    hit = memo.get(key)
+    if hit is not None and hit[0] > time.monotonic():
+        return hit[1]
+    return None
+
+
+async def forecast_grades(search_date: str, inform_code: str) -> dict:
+    """
+    예보 XML 1번 파싱 -> 날짜 -> 지역 -> 등급 (모든 지역/날짜 조회를 이 표 하나로)
+    """
+    key = (search_date, inform_code)
+    dates = _memo_get(_grade_maps, key)
+    if dates is not None:
+        return dates
+
+    xml, ttl = await cached_forecast_xml(search_date, inform_code)
+    dates = parse_grade_map(xml)
+    _memo_put(_grade_maps, key, ttl, dates)
+    return dates
+
+
+async def station_index(sido: str) -> dict:
+    index = _memo_get(_indexes, sido)
+    if index is not None:
+        return index
+
+    data, ttl = await cached_realtime_json(sido, AIRKOREA_REALTIME_ROWS, 1)
+    if not _realtime_ok(data):
+        header = (data.get("response") or {}).get("header") or {}
+        raise RuntimeError(f"AirKorea error: {header.get('resultCode')} {header.get('resultMsg')}")
+
+    index = build_station_index(data)
+    _memo_put(_indexes, sido, ttl, index)
+    return index
+
+
+def _hard_ttl() -> int:
+    # Redis TTL = soft TTL + stale 구간 (hard TTL)
+    # soft TTL은 예보/실시간 중 먼저 갱신되는 발표 직후까지 (CACHE_TTL_MODE=fixed 면 REDIS_TTL_DUST_SECONDS)
+    ttl = release_ttl(REDIS_TTL_DUST_SECONDS, "dust_fcst", "dust_realtime")
+    return ttl + REDIS_STALE_DUST_SECONDS
+
+# key -> 진행 중인 백그라운드 갱신 task (중복 갱신 방지 + task GC 방지)
+_refreshing: dict[str, asyncio.Task] = {}
+
+
+async def _refresh(key: str, build) -> None:
+    token = None
+    try:
+        if _rds is not None:
+            # 다른 워커/레플리카가 이미 갱신 중이면 스킵
+            token = await singleflight.aredis_lock(_rds, key, CACHE_LOCK_TTL_MS)
+            if token is None:
+                return
+        result = await build()
+        if result.get("ok"):
+            await _cache_set(key, result, _hard_ttl())
+    except Exception:
+        log.warning("dust background refresh failed: %s", key, exc_info=True)
+    finally:
+        if token is not None:
+            try:
+                await singleflight.aredis_unlock(_rds, key, token)
+            except Exception:
+                pass
+        _refreshing.pop(key, None)
+
+
+async def shutdown() -> None:
+    for t in list(_refreshing.values()):
+        t.cancel()
+    await asyncio.gather(*_refreshing.values(), return_exceptions=True)
+    if _rds is not None:
+        await _rds.aclose()
+
+
+def _schedule_refresh(key: str, build) -> None:
+    if key in _refreshing:
+        return
+    l1.delete(key)
+    _refreshing[key] = asyncio.create_task(_refresh(key, build))
+
+
+async def _serve(key: str, build) -> dict:
+    """
+    캐시 hit -> 그대로 (soft TTL 지났으면 stale:true + 백그라운드 갱신)
+    miss -> build() 결과가 ok일 때만 캐시
+    """
+    # ---------- cache hit ----------
+    cached, ttl = await _cache_get(key)
+    if cached is not None:
+        stale = is_stale(ttl, REDIS_STALE_DUST_SECONDS)
+        if stale:
+            count_stale(key)
+            _schedule_refresh(key, build)
+        cached["source"] = "cache"
+        cached["cache_key"] = key
+        cached["ttl"] = ttl
+        cached["stale"] = stale
+        return cached
+
+    t0 = time.time()
+    result = await build()
+
+    # 실패 응답은 캐시 안 함(원하면 짧게 캐시도 가능)
+    hard_ttl = _hard_ttl()
+    if result.get("ok"):
+        await _cache_set(key, result, hard_ttl)
+
+    result["source"] = "api"
+    result["cache_key"] = key
+    result["ttl"] = hard_ttl if result.get("ok") else None
+    result["stale"] = False
+    result["took_ms"] = round((time.time() - t0) * 1000, 1)
+    return result
+
+
+# 실시간(수치)은 시도 단위 1번 호출에 PM10/PM25가 같이 들어있음
+_SEOUL = "서울"
+
+
+async def _fetch_parts(kinds: tuple[str, ...], search_date: str) -> dict:
+    """
+    요청 하나에 필요한 AirKorea 호출을 중복 없이 동시에 (asyncio.gather)
+    - 예보 XML: kind별 1번 / 실시간 JSON: kind 수와 상관없이 1번
+    - 각각 원본 캐시(cached_*)를 먼저 봄 -> 측정소가 달라도 업스트림은 갱신 주기당 1번
+    반환: {("forecast", kind): 날짜별 등급표 | ("realtime",): 측정소 인덱스 / 실패면 예외}
+    """
+    calls = {("forecast", kind): forecast_grades(search_date, kind) for kind in kinds}
+    calls[("realtime",)] = station_index(_SEOUL)
+    results = await asyncio.gather(*calls.values(), return_exceptions=True)
+    return dict(zip(calls, results))
+
+
+def _one(kind: str, search_date: str, station: str | None, parts: dict):
     """
     kind: "PM10" | "PM25"
     search_date: "YYYY-MM-DD"
     station: 특정 측정소명(없으면 서울 평균)
+    parts: _fetch_parts() 결과
     """
     out = {
         "kind": kind,
@@ -93,8 +361,10 @@ async def _one(kind: str, search_date: str, station: str | None):
 
     # 1) 예보(등급) - 실패해도 500 내지 말고 error로 내린다
     try:
-        xml = await fetch_forecast_xml(search_date, kind)
-        out["forecast"] = parse_seoul_grade(xml, search_date)
+        dates = parts[("forecast", kind)]
+        if isinstance(dates, BaseException):
+            raise dates
+        out["forecast"] = seoul_grade_from_map(dates, search_date)
     except Exception as e:
         out["forecast"] = {
             "ok": False,
@@ -104,8 +374,10 @@ async def _one(kind: str, search_date: str, station: str | None):
 
     # 2) 실시간(수치) - 실패해도 500 내지 말고 error로 내린다
     try:
-        rt = await fetch_realtime_json("서울", 100, 1)
-        out["realtime"] = parse_seoul_realtime(rt, kind, station=station)
+        index = parts[("realtime",)]
+        if isinstance(index, BaseException):
+            raise index
+        out["realtime"] = realtime_from_index(index, kind, station=station)
     except Exception as e:
         out["realtime"] = {
             "ok": False,
@@ -116,24 +388,11 @@ async def _one(kind: str, search_date: str, station: str | None):
     return out
 
 
-@router.get("/seoul")
-async def seoul(
-    search_date: str = Query(default_factory=lambda: date.today().isoformat()),
-    station: str | None = Query(default=None, description="특정 측정소명(예: 중구). 없으면 서울 평균"),
-):
-    # ---------- cache hit ----------
-    key = _cache_key("seoul", search_date, station)
-    cached, ttl = _cache_get(key)
-    if cached is not None:
-        cached["source"] = "cache"
-        cached["cache_key"] = key
-        cached["ttl"] = ttl
-        return cached
-
-    t0 = time.time()
-
-    pm10 = await _one("PM10", search_date, station)
-    pm25 = await _one("PM25", search_date, station)
+async def _build_seoul(search_date: str, station: str | None) -> dict:
+    # 예보 2건 + 실시간 1건을 동시에 -> 업스트림 RTT 1번 수준
+    parts = await _fetch_parts(("PM10", "PM25"), search_date)
+    pm10 = _one("PM10", search_date, station, parts)
+    pm25 = _one("PM25", search_date, station, parts)
 
     # 한쪽이라도 실패면 디버깅 쉽게 원본 그대로
     if (
@@ -142,22 +401,16 @@ async def seoul(
         or not pm10["realtime"].get("ok")
         or not pm25["realtime"].get("ok")
     ):
-        result = {
+        return {
             "ok": False,
             "date": search_date,
             "station": station,
             "pm10": pm10,
             "pm25": pm25,
         }
-        # 실패 응답은 캐시 안 함(원하면 짧게 캐시도 가능)
-        result["source"] = "api"
-        result["cache_key"] = key
-        result["ttl"] = None
-        result["took_ms"] = round((time.time() - t0) * 1000, 1)
-        return result
 
     # 둘 다 성공했을 때만 깔끔한 응답
-    result = {
+    return {
         "ok": True,
         "date": search_date,
         "dataTime_forecast": pm10["forecast"]["dataTime"],
@@ -174,117 +427,142 @@ async def seoul(
         "realtime_agg": None if station else pm10["realtime"].get("agg"),
     }
 
-    # ---------- cache set ----------
-    _cache_set(key, result, REDIS_TTL_DUST_SECONDS)
-
-    result["source"] = "api"
-    result["cache_key"] = key
-    result["ttl"] = REDIS_TTL_DUST_SECONDS
-    result["took_ms"] = round((time.time() - t0) * 1000, 1)
-    return result
 
-
-@router.get("/seoul/pm10")
-async def seoul_pm10(
-    search_date: str = Query(default_factory=lambda: date.today().isoformat()),
-    station: str | None = Query(default=None, description="특정 측정소명(예: 중구). 없으면 서울 평균"),
-):
-    # ---------- cache hit ----------
-    key = _cache_key("seoul_pm10", search_date, station)
-    cached, ttl = _cache_get(key)
-    if cached is not None:
-        cached["source"] = "cache"
-        cached["cache_key"] = key
-        cached["ttl"] = ttl
-        return cached
-
-    t0 = time.time()
-    result_raw = await _one("PM10", search_date, station)
+async def _build_single(kind: str, search_date: str, station: str | None) -> dict:
+    field = kind.lower()  # "pm10" | "pm25"
+    parts = await _fetch_parts((kind,), search_date)
+    result_raw = _one(kind, search_date, station, parts)
 
     # 실패해도 500 금지: ok:false로 내려줌
     if not result_raw["forecast"].get("ok") or not result_raw["realtime"].get("ok"):
-        result = {
+        return {
             "ok": False,
             "date": search_date,
             "station": station,
-            "pm10": result_raw,
+            field: result_raw,
         }
-        result["source"] = "api"
-        result["cache_key"] = key
-        result["ttl"] = None
-        result["took_ms"] = round((time.time() - t0) * 1000, 1)
-        return result
 
-    result = {
+    return {
         "ok": True,
         "date": search_date,
         "station": station,
         "dataTime_forecast": result_raw["forecast"]["dataTime"],
         "dataTime_realtime": result_raw["realtime"]["dataTime"],
-        "pm10": {
+        field: {
             "grade": result_raw["forecast"]["seoulGrade"],
             "value": result_raw["realtime"]["value"],
         },
         "realtime_agg": None if station else result_raw["realtime"].get("agg"),
     }
 
-    _cache_set(key, result, REDIS_TTL_DUST_SECONDS)
 
-    result["source"] = "api"
-    result["cache_key"] = key
-    result["ttl"] = REDIS_TTL_DUST_SECONDS
-    result["took_ms"] = round((time.time() - t0) * 1000, 1)
-    return result
+@router.get("/seoul")
+async def seoul(
+    search_date: str = Query(default_factory=lambda: now_kst().date().isoformat(), pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    station: str | None = Query(default=None, description="특정 측정소명(예: 중구). 없으면 서울 평균"),
+):
+    key = _cache_key("seoul", search_date, station)
+    return await _serve(key, lambda: _build_seoul(search_date, station))
+
+
+@router.get("/seoul/pm10")
+async def seoul_pm10(
+    search_date: str = Query(default_factory=lambda: now_kst().date().isoformat(), pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    station: str | None = Query(default=None, description="특정 측정소명(예: 중구). 없으면 서울 평균"),
+):
+    key = _cache_key("seoul_pm10", search_date, station)
+    return await _serve(key, lambda: _build_single("PM10", search_date, station))
 
 
 @router.get("/seoul/pm25")
 async def seoul_pm25(
-    search_date: str = Query(default_factory=lambda: date.today().isoformat()),
+    search_date: str = Query(default_factory=lambda: now_kst().date().isoformat(), pattern=r"^\d{4}-\d{2}-\d{2}$"),
     station: str | None = Query(default=None, description="특정 측정소명(예: 중구). 없으면 서울 평균"),
 ):
-    # ---------- cache hit ----------
     key = _cache_key("seoul_pm25", search_date, station)
-    cached, ttl = _cache_get(key)
-    if cached is not None:
-        cached["source"] = "cache"
-        cached["cache_key"] = key
-        cached["ttl"] = ttl
-        return cached
+    return await _serve(key, lambda: _build_single("PM25", search_date, station))
 
-    t0 = time.time()
-    result_raw = await _one("PM25", search_date, station)
 
-    if not result_raw["forecast"].get("ok") or not result_raw["realtime"].get("ok"):
-        result = {
-            "ok": False,
-            "date": search_date,
-            "station": station,
-            "pm25": result_raw,
+def _sido_view(sido: str, index: dict, station: str | None) -> dict:
+    pm10 = realtime_from_index(index, "PM10", station)
+    pm25 = realtime_from_index(index, "PM25", station)
+    return {
+        "ok": pm10["ok"] and pm25["ok"],
+        "sido": sido,
+        "dataTime": index["dataTime"],
+        "station": station,
+        "stations": len(index["stations"]),
+        "pm10": pm10,
+        "pm25": pm25,
+    }
+
+
+@router.get("/forecast")
+async def forecast_all_regions(
+    search_date: str = Query(default_factory=lambda: now_kst().date().isoformat(), pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    kind: str | None = Query(default=None, pattern="^(PM10|PM25)$", description="PM10 | PM25 (없으면 둘 다)"),
+):
+    """
+    미세먼지 예보 등급: 문서에 들어있는 모든 날짜 x 모든 지역
+    (search_date는 조회 기준 발표일, 보통 오늘~모레까지 포함)
+    """
+    kinds = (kind,) if kind else ("PM10", "PM25")
+    results = await asyncio.gather(*(forecast_grades(search_date, k) for k in kinds), return_exceptions=True)
+
+    out = {"ok": True, "search_date": search_date}
+    for k, dates in zip(kinds, results):
+        if isinstance(dates, BaseException):
+            out["ok"] = False
+            out[k.lower()] = {"ok": False, "reason": "FETCH_FORECAST_ERROR", "error": str(dates)}
+            continue
+        if not dates:
+            out["ok"] = False
+        out[k.lower()] = {
+            "ok": bool(dates),
+            "dates": {d: {"dataTime": v["dataTime"], "grades": v["grades"]} for d, v in dates.items()},
         }
-        result["source"] = "api"
-        result["cache_key"] = key
-        result["ttl"] = None
-        result["took_ms"] = round((time.time() - t0) * 1000, 1)
-        return result
+    return out
 
-    result = {
-        "ok": True,
-        "date": search_date,
-        "station": station,
-        "dataTime_forecast": result_raw["forecast"]["dataTime"],
-        "dataTime_realtime": result_raw["realtime"]["dataTime"],
-        "pm25": {
-            "grade": result_raw["forecast"]["seoulGrade"],
-            "value": result_raw["realtime"]["value"],
-        },
-        "realtime_agg": None if station else result_raw["realtime"].get("agg"),
+
+@router.get("/all")
+async def all_sido():
+    """
+    전국 시도 실시간 스냅샷 (시도별 평균/최소/최대/p50/p90)
+    시도 인덱스는 동시에 받아오고, 실패한 시도만 ok:false
+    """
+    t0 = time.time()
+    results = await asyncio.gather(*(station_index(s) for s in SIDO_NAMES), return_exceptions=True)
+
+    out = {}
+    for sido, index in zip(SIDO_NAMES, results):
+        if isinstance(index, BaseException):
+            out[sido] = {"ok": False, "reason": "FETCH_REALTIME_ERROR", "error": str(index)}
+            continue
+        view = _sido_view(sido, index, None)
+        out[sido] = {k: view[k] for k in ("ok", "dataTime", "stations", "pm10", "pm25")}
+
+    return {
+        "ok": all(v["ok"] for v in out.values()),
+        "sido": out,
+        "took_ms": round((time.time() - t0) * 1000, 1),
     }
 
-    _cache_set(key, result, REDIS_TTL_DUST_SECONDS)
 
-    result["source"] = "api"
-    result["cache_key"] = key
-    result["ttl"] = REDIS_TTL_DUST_SECONDS
-    result["took_ms"] = round((time.time() - t0) * 1000, 1)
-    return result
+@router.get("/{sido}")
+async def sido_realtime(
+    sido: str,
+    station: str | None = Query(default=None, description="특정 측정소명. 없으면 시도 전체 통계"),
+):
+    """
+    시도 실시간 수치 (sido: 한글 시도명 또는 영문 별칭, 예: 부산 / busan)
+    """
+    name = normalize_sido(sido)
+    if name is None:
+        raise HTTPException(status_code=404, detail=f"unknown sido: {sido}")
+
+    try:
+        index = await station_index(name)
+    except Exception as e:
+        return {"ok": False, "sido": name, "station": station, "reason": "FETCH_REALTIME_ERROR", "error": str(e)}
 
+    return _sido_view(name, index, station)
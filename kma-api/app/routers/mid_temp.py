@@ -1,69 +1,134 @@
 # app/routers/mid_temp.py
 import os
-from fastapi import APIRouter, HTTPException, Query
-from psycopg2.extras import Json
+from fastapi import APIRouter, HTTPException, Query, Request
+from psycopg.types.json import Jsonb
 
-from app.services.db import fetch_one, execute
-from app.services.kma_client import get_mid_temp as kma_get_mid_temp
+from app.services.breaker import UpstreamUnavailable
+from app.services.conditional import cache_control, conditional_json, content_hash, mid_cache_control, not_modified
+from app.services.db import afetch_one
+from app.services.migrations import ensure_migrated
+from app.services.kma_client import aget_mid_temp as kma_get_mid_temp
 from app.services.time_rules import latest_mid_tmfc, prev_mid_tmfc
 
 SCHEMA = os.getenv("DB_SCHEMA", "api")
 router = APIRouter()
 
 SQL_SEL = f"""
-SELECT reg_id, tm_fc, data, created_at
+SELECT reg_id, tm_fc, data, content_hash, created_at
 FROM {SCHEMA}.weather_mid_temp
 WHERE reg_id = %s AND tm_fc = %s
 LIMIT 1;
 """
 
+# If-None-Match 재검증용: data(jsonb)는 안 읽음
+SQL_SEL_HASH = f"""
+SELECT content_hash
+FROM {SCHEMA}.weather_mid_temp
+WHERE reg_id = %s AND tm_fc = %s
+LIMIT 1;
+"""
+
+# 업스트림 장애 시 폴백: 요청 tmFc 이전 중 가장 최근 발표 (unique (reg_id, tm_fc) 인덱스 역방향 1건)
+SQL_SEL_LATEST = f"""
+SELECT reg_id, tm_fc, data, content_hash, created_at
+FROM {SCHEMA}.weather_mid_temp
+WHERE reg_id = %s AND tm_fc <= %s
+ORDER BY tm_fc DESC
+LIMIT 1;
+"""
+
 SQL_UPSERT = f"""
-INSERT INTO {SCHEMA}.weather_mid_temp (reg_id, tm_fc, data)
-VALUES (%s, %s, %s)
+INSERT INTO {SCHEMA}.weather_mid_temp (reg_id, tm_fc, data, content_hash)
+VALUES (%s, %s, %s, %s)
 ON CONFLICT (reg_id, tm_fc)
 DO UPDATE SET
   data = EXCLUDED.data,
-  created_at = now();
+  content_hash = EXCLUDED.content_hash,
+  created_at = now()
+RETURNING created_at;
 """
 
 @router.get("/mid/temp", tags=["mid"], summary="Get Mid Temp")
-def get_mid_temp(
+async def get_mid_temp(
+    request: Request,
     regId: str = Query(...),
     tmFc: str | None = Query(None),
 ):
     tmfc = tmFc or latest_mid_tmfc()
+    cc = mid_cache_control(tmFc, tmfc)
+    # 조회 컬럼(content_hash 등)이 마이그레이션 후에만 있음 -> 시작 시 실패했으면 여기서 재시도 (성공 후엔 no-op)
+    await ensure_migrated()
+
+    # 0) 재검증(If-None-Match)이면 해시만 보고 304 (data 안 읽음)
+    if request.headers.get("if-none-match"):
+        row = await afetch_one(SQL_SEL_HASH, (regId, tmfc))
+        resp = not_modified(request, row and row["content_hash"], cc)
+        if resp is not None:
+            return resp
 
     # 1) DB 조회
-    row = fetch_one(SQL_SEL, (regId, tmfc))
+    row = await afetch_one(SQL_SEL, (regId, tmfc))
     if row:
-        return {
+        return conditional_json(request, {
             "source": "db",
             "regId": row["reg_id"],
             "tmFc": row["tm_fc"],
             "createdAt": row["created_at"].isoformat() if row.get("created_at") else None,
             "data": row["data"],
-        }
+        }, row["content_hash"] or content_hash(row["data"]), cc)
 
     # 2) KMA 호출 (폴백)
     used_tmfc = tmfc
+    payload = None
     try:
-        payload = kma_get_mid_temp(regId=regId, tmFc=tmfc)
-    except Exception:
-        tmfc2 = prev_mid_tmfc(tmfc)
-        try:
-            payload = kma_get_mid_temp(regId=regId, tmFc=tmfc2)
-            used_tmfc = tmfc2
-        except Exception as e2:
-            raise HTTPException(status_code=502, detail=f"KMA upstream error: {e2}")
+        payload = await kma_get_mid_temp(regId=regId, tmFc=tmfc)
+    except Exception as e:
+        err = e
+        # 서킷 open / 쿼터 초과(호출 전 거절)면 이전 발표 재호출도 바로 실패 -> 건너뜀
+        # (KMA 가 실제로 돌려준 503 등은 이전 발표로 재시도)
+        if not isinstance(e, UpstreamUnavailable):
+            tmfc2 = prev_mid_tmfc(tmfc)
+            try:
+                payload = await kma_get_mid_temp(regId=regId, tmFc=tmfc2)
+                used_tmfc = tmfc2
+            except Exception as e2:
+                err = e2
+
+    if payload is None:
+        # 업스트림 불가: DB에 남은 가장 최근 발표로 응답 (max-age=0 -> 복구되면 바로 새 값)
+        row = await afetch_one(SQL_SEL_LATEST, (regId, tmfc))
+        if row:
+            return conditional_json(request, {
+                "source": "db-fallback",
+                "regId": row["reg_id"],
+                "tmFc": row["tm_fc"],
+                "createdAt": row["created_at"].isoformat() if row.get("created_at") else None,
+                "data": row["data"],
+            }, row["content_hash"] or content_hash(row["data"]), cache_control(False, 0))
+        if isinstance(err, UpstreamUnavailable):
+            raise err
+        raise HTTPException(status_code=502, detail=f"KMA upstream error: {err}")
+
+    # KMA 에러 응답(resultCode != "00")은 저장/캐시하지 않음 (ETag 없이 no-store)
+    header = (payload.get("response") or {}).get("header") or {}
+    if header.get("resultCode") != "00":
+        return conditional_json(request, {
+            "source": "api",
+            "regId": regId,
+            "tmFc": used_tmfc,
+            "createdAt": None,
+            "data": payload,
+        }, None, cache_control(False, 0))
 
-    # 3) DB 저장
-    execute(SQL_UPSERT, (regId, used_tmfc, Json(payload)))
+    # 3) DB 저장 (upsert + RETURNING, 다시 조회하지 않음)
+    h = content_hash(payload)
+    saved = await afetch_one(SQL_UPSERT, (regId, used_tmfc, Jsonb(payload), h))
 
-    return {
+    return conditional_json(request, {
         "source": "api→db",
         "regId": regId,
         "tmFc": used_tmfc,
-        "createdAt": None,
+        "createdAt": saved["created_at"].isoformat() if saved and saved.get("created_at") else None,
         "data": payload,
-    }
+    }, h, mid_cache_control(tmFc, used_tmfc))
 
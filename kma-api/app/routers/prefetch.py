@@ -0,0 +1,200 @@
+# app/routers/prefetch.py
+"""
+KMA 발표 일정 기반 백그라운드 prefetch
+- 초단기 실황: 매시 40분 직후 / 단기예보: 발표시각+20분 직후 깨어남
+- REGIONS 격자 전체를 동시성 제한(PREFETCH_CONCURRENCY)으로 받아 캐시를 미리 채움
+- 레플리카 간 리더 선출: 발표 슬롯(base_date+base_time)별 Redis SET NX -> 슬롯당 1곳만 실행
+- 기본 비활성 (PREFETCH_ENABLED=1 로 켬)
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import time
+from datetime import timedelta
+
+from fastapi import APIRouter
+
+from app.routers.short_fcst import prefetch_short
+from app.routers.ultra_ncst import prefetch_ultra
+from app.services import quota
+from app.services.cache import aclient as redis_client
+from app.services.regions import REGIONS
+from app.services.time_rules import (
+    next_short_fcst_ready,
+    next_ultra_ncst_ready,
+    now_kst,
+    short_fcst_base_datetime,
+    ultra_ncst_base_datetime,
+)
+
+log = logging.getLogger(__name__)
+
+router = APIRouter()
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "0") == "1"
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "4"))
+# 조회 가능 시각 이후 추가 여유 + 레플리카별 랜덤 지터
+PREFETCH_DELAY_SECONDS = float(os.getenv("PREFETCH_DELAY_SECONDS", "30"))
+PREFETCH_JITTER_SECONDS = float(os.getenv("PREFETCH_JITTER_SECONDS", "30"))
+PREFETCH_ON_STARTUP = os.getenv("PREFETCH_ON_STARTUP", "1") == "1"
+PREFETCH_LEADER_TTL = int(os.getenv("PREFETCH_LEADER_TTL", "900"))
+
+_INSTANCE = f"{socket.gethostname()}:{os.getpid()}"
+
+# kind -> (prefetch 함수, 다음 조회 가능 시각, 현재 base(date, time))
+_JOBS = {
+    "ultra": (prefetch_ultra, next_ultra_ncst_ready, ultra_ncst_base_datetime),
+    "short": (prefetch_short, next_short_fcst_ready, short_fcst_base_datetime),
+}
+
+_status = {
+    kind: {
+        "runs": 0,
+        "skipped_not_leader": 0,
+        "next_run": None,
+        "last_slot": None,
+        "last_started": None,
+        "last_duration_ms": None,
+        "last_ok": None,
+        "last_failed": None,
+        "last_error": None,
+    }
+    for kind in _JOBS
+}
+_tasks: list[asyncio.Task] = []
+
+
+def _grid_points() -> list[tuple[int, int]]:
+    # 같은 격자를 쓰는 지역은 1번만
+    return sorted({(v["nx"], v["ny"]) for v in REGIONS.values()})
+
+
+def _key(kind: str, suffix: str) -> str:
+    prefix = os.getenv("REDIS_PREFIX", "weather")
+    return f"{prefix}:prefetch:{kind}:{suffix}"
+
+
+async def _acquire_slot(r, kind: str, slot: str) -> bool:
+    return bool(await r.set(_key(kind, slot), _INSTANCE, nx=True, ex=PREFETCH_LEADER_TTL))
+
+
+async def _publish_last_run(r, kind: str, run: dict) -> None:
+    # 어느 워커/레플리카가 실행했든 status 에서 보이도록 Redis에 기록
+    try:
+        await r.set(_key(kind, "last"), json.dumps(run, ensure_ascii=False))
+    except Exception:
+        pass
+
+
+async def run_once(kind: str) -> None:
+    fn, _, base_fn = _JOBS[kind]
+    st = _status[kind]
+    slot = "".join(base_fn())
+    r = redis_client()
+
+    try:
+        leader = await _acquire_slot(r, kind, slot)
+    except Exception as e:
+        # Redis 없으면 채워 넣을 곳도 없음
+        st["last_error"] = f"leader election failed: {e}"
+        return
+    if not leader:
+        st["skipped_not_leader"] += 1
+        return
+
+    sem = asyncio.Semaphore(PREFETCH_CONCURRENCY)
+
+    async def _one(nx: int, ny: int) -> bool:
+        async with sem:
+            try:
+                return await fn(r, nx, ny)
+            except Exception:
+                log.warning("prefetch %s failed: nx=%s ny=%s", kind, nx, ny, exc_info=True)
+                return False
+
+    started = now_kst()
+    t0 = time.perf_counter()
+    # 쿼터 우선순위: user 몫 예약분까지 쓰고, 초당 한도에 걸리면 실패 대신 대기
+    with quota.priority(quota.PREFETCH):
+        results = await asyncio.gather(*(_one(nx, ny) for nx, ny in _grid_points()))
+    ok = sum(1 for x in results if x)
+
+    run = {
+        "instance": _INSTANCE,
+        "slot": slot,
+        "started": started.isoformat(timespec="seconds"),
+        "duration_ms": round((time.perf_counter() - t0) * 1000, 1),
+        "ok": ok,
+        "failed": len(results) - ok,
+    }
+    st["runs"] += 1
+    st["last_slot"] = run["slot"]
+    st["last_started"] = run["started"]
+    st["last_duration_ms"] = run["duration_ms"]
+    st["last_ok"] = run["ok"]
+    st["last_failed"] = run["failed"]
+    st["last_error"] = None
+    await _publish_last_run(r, kind, run)
+
+
+async def _loop(kind: str) -> None:
+    _, next_ready, _ = _JOBS[kind]
+    first = PREFETCH_ON_STARTUP
+
+    while True:
+        if not first:
+            now = now_kst()
+            ready = next_ready(now)
+            delay = (ready - now).total_seconds() + PREFETCH_DELAY_SECONDS
+            delay += random.uniform(0, PREFETCH_JITTER_SECONDS)
+            _status[kind]["next_run"] = (now + timedelta(seconds=delay)).isoformat(timespec="seconds")
+            await asyncio.sleep(delay)
+        first = False
+        try:
+            await run_once(kind)
+        except Exception as e:
+            _status[kind]["last_error"] = str(e)
+            log.exception("prefetch %s loop error", kind)
+
+
+def start() -> None:
+    if not PREFETCH_ENABLED or _tasks:
+        return
+    for kind in _JOBS:
+        _tasks.append(asyncio.create_task(_loop(kind)))
+
+
+async def stop() -> None:
+    for t in _tasks:
+        t.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+
+
+@router.get("/prefetch/status")
+async def prefetch_status():
+    """
+    jobs: 이 워커 기준 상태 / last_run: 클러스터 전체에서 마지막으로 실행된 run
+    """
+    last_run = {}
+    try:
+        r = redis_client()
+        for kind in _JOBS:
+            v = await r.get(_key(kind, "last"))
+            last_run[kind] = json.loads(v) if v else None
+    except Exception:
+        last_run = None
+
+    return {
+        "enabled": PREFETCH_ENABLED,
+        "instance": _INSTANCE,
+        "concurrency": PREFETCH_CONCURRENCY,
+        "grid_points": len(_grid_points()),
+        "jobs": _status,
+        "last_run": last_run,
+    }
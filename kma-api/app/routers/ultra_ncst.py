@@ -1,11 +1,12 @@
 # app/routers/ultra_ncst.py
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Query, Request
 import os
 
-from app.services.kma_client import call_kma
-from app.services.time_rules import ultra_ncst_base_datetime
-from app.services.cache import client as redis_client, make_key, cache_get, cache_set
-from app.services.regions import REGIONS
+from app.services.kma_client import acall_kma
+from app.services.time_rules import previous_release, ultra_ncst_base_datetime
+from app.services.cache import aclient as redis_client, canonical_key, acache_set, aget_or_load_raw, aget_or_load_many, cached_response, release_ttl
+from app.services.batch import WEATHER_BATCH_CONCURRENCY, item_result, parse_targets
+from app.services.regions import REGIONS, GRID_NX_MAX, GRID_NY_MAX
 
 router = APIRouter()
 
@@ -42,20 +43,26 @@ def simplify_ultra_ncst(data: dict):
         "wind_dir_deg": to_float(value_map.get("VEC")),
     }
 
-@router.get("")
-def get_weather(nx: int = 60, ny: int = 127, request: Request = None):
-    r = redis_client()
+def _ttls() -> tuple[int, int]:
+    fixed = int(os.getenv("REDIS_TTL_ULTRA_SECONDS", "600"))
+    # 기본은 다음 초단기 실황 발표 직후 만료 (CACHE_TTL_MODE=fixed 면 REDIS_TTL_ULTRA_SECONDS)
+    ttl = release_ttl(fixed, "ultra_ncst")
+    # soft TTL(ttl) 지난 뒤 이 시간 동안은 stale 값 즉시 응답 + 백그라운드 갱신
+    # (조회 시점마다 바뀌는 release TTL이 아니라 고정값 기준이어야 stale 판정이 일정함)
+    stale_ttl = int(os.getenv("REDIS_STALE_ULTRA_SECONDS", str(fixed)))
+    return ttl, stale_ttl
+
+def ultra_cache_key(nx: int, ny: int, base_date: str, base_time: str) -> str:
+    # 라우트 별칭(/weather, /weather/ultra, /weather/ultra/{region})과 prefetch가 같은 키를 씀
+    # base_date/base_time 포함 -> 새 발표가 나오면 자연스럽게 새 키
     prefix = os.getenv("REDIS_PREFIX", "weather")
-    ttl = int(os.getenv("REDIS_TTL_ULTRA_SECONDS", "600"))
-
-    raw = str(request.url) if request else f"/weather?nx={nx}&ny={ny}"
-    k = make_key(prefix, raw)
+    return canonical_key(prefix, "ultra", nx, ny, base_date, base_time)
 
-    cached = cache_get(r, k)
-    if cached is not None:
-        return {"cached": True, **cached}
-
-    base_date, base_time = ultra_ncst_base_datetime()
+async def load_ultra(nx: int, ny: int, base_date: str, base_time: str):
+    """
+    KMA 호출 + 단순화 -> (value, ttl)  에러 응답이면 ttl=None(캐시 안 함)
+    """
+    ttl, _ = _ttls()
 
     params = {
         "pageNo": 1,
@@ -67,25 +74,90 @@ def get_weather(nx: int = 60, ny: int = 127, request: Request = None):
         "ny": ny,
     }
 
-    data = call_kma(KMA_URL_ULTRA_NCST, params)
+    data = await acall_kma(KMA_URL_ULTRA_NCST, params)
     header = data.get("response", {}).get("header", {})
     if header.get("resultCode") != "00":
-        return data
+        return data, None
+
+    return simplify_ultra_ncst(data), ttl
 
-    result = simplify_ultra_ncst(data)
-    cache_set(r, k, result, ttl)
-    return {"cached": False, **result}
+async def prefetch_ultra(r, nx: int, ny: int) -> bool:
+    """
+    발표 직후 스케줄러용: 캐시 유무와 상관없이 새로 받아서 덮어씀
+    """
+    base_date, base_time = ultra_ncst_base_datetime()
+    value, ttl = await load_ultra(nx, ny, base_date, base_time)
+    if not ttl:
+        return False
+    _, stale_ttl = _ttls()
+    await acache_set(r, ultra_cache_key(nx, ny, base_date, base_time), value, ttl, stale_ttl)
+    return True
+
+@router.get("")
+async def get_weather(request: Request, nx: int = Query(60, ge=1, le=GRID_NX_MAX), ny: int = Query(127, ge=1, le=GRID_NY_MAX)):
+    r = redis_client()
+    _, stale_ttl = _ttls()
+    base_date, base_time = ultra_ncst_base_datetime()
+    k = ultra_cache_key(nx, ny, base_date, base_time)
+
+    # 동시 miss는 key당 업스트림 1번만 (워커/레플리카 간은 Redis 락)
+    # hit는 캐시 바이트 그대로 응답, cached/stale 은 X-Cache / X-Cache-Stale 헤더
+    # 새 발표 키 miss 인데 직전 발표 캐시가 남아 있으면 그걸 stale 로 응답 + 새 키는 백그라운드로
+    # (KMA 장애/서킷 open 일 때도 같은 직전 발표 캐시로 폴백)
+    prev = previous_release("ultra_ncst")
+    prev_k = ultra_cache_key(nx, ny, prev.strftime("%Y%m%d"), prev.strftime("%H%M"))
+    body, cached, stale = await aget_or_load_raw(
+        r, k, lambda: load_ultra(nx, ny, base_date, base_time), stale_ttl, fallback_keys=(prev_k,), prev_key=prev_k,
+    )
+    return cached_response(request, body, cached, stale)
 
 @router.get("/ultra")
-def get_ultra(nx: int = 60, ny: int = 127, request: Request = None):
-    return get_weather(nx, ny, request)
+async def get_ultra(request: Request, nx: int = Query(60, ge=1, le=GRID_NX_MAX), ny: int = Query(127, ge=1, le=GRID_NY_MAX)):
+    return await get_weather(request, nx, ny)
+
+@router.get("/ultra/batch")
+async def get_ultra_batch(
+    regions: list[str] | None = Query(None, description="지역 키/이름 (예: seoul,busan 또는 반복)"),
+    points: list[str] | None = Query(None, description="nx,ny (예: 60,127;98,76 또는 반복)"),
+):
+    """
+    여러 지역/격자를 한 번에: hit는 Redis pipeline 1번, miss만 KMA 동시 호출
+    (동시 호출 수 WEATHER_BATCH_CONCURRENCY 제한, 항목별 ok/error)
+    """
+    targets, errors = parse_targets(regions, points)
+    r = redis_client()
+    _, stale_ttl = _ttls()
+    base_date, base_time = ultra_ncst_base_datetime()
+
+    prev = previous_release("ultra_ncst")
+    prev_date, prev_time = prev.strftime("%Y%m%d"), prev.strftime("%H%M")
+
+    items = [
+        (ultra_cache_key(nx, ny, base_date, base_time), lambda nx=nx, ny=ny: load_ultra(nx, ny, base_date, base_time))
+        for _, nx, ny in targets
+    ]
+    # 새 발표 miss 는 직전 발표 캐시가 있으면 stale 로 응답 + 백그라운드 갱신 (단건 라우트와 같음)
+    prev_keys = {
+        ultra_cache_key(nx, ny, base_date, base_time): ultra_cache_key(nx, ny, prev_date, prev_time)
+        for _, nx, ny in targets
+    }
+    results = await aget_or_load_many(r, items, stale_ttl, WEATHER_BATCH_CONCURRENCY, prev_keys=prev_keys)
+
+    out = [item_result(label, nx, ny, res) for (label, nx, ny), res in zip(targets, results)]
+    out.extend(errors)
+    return {
+        "base_date": base_date,
+        "base_time": base_time,
+        "count": len(out),
+        "ok": sum(1 for x in out if x["ok"]),
+        "items": out,
+    }
 
 @router.get("/ultra/{region}")
-def get_ultra_by_region(region: str, request: Request = None):
+async def get_ultra_by_region(request: Request, region: str):
     if region not in REGIONS:
         return {"error": "지원하지 않는 지역입니다", "supported": list(REGIONS.keys())}
 
     nx = REGIONS[region]["nx"]
     ny = REGIONS[region]["ny"]
-    return get_weather(nx=nx, ny=ny, request=request)
-
+    return await get_weather(request, nx=nx, ny=ny)
@@ -1,6 +1,7 @@
 # app/services/air_client.py
 import os
-import httpx
+
+from app.services import http_clients
 
 BASE = "https://apis.data.go.kr/B552584/ArpltnInforInqireSvc"
 SERVICE_KEY = os.getenv("AIRKOREA_SERVICE_KEY")
@@ -20,10 +21,9 @@ async def fetch_forecast_xml(search_date: str, inform_code: str) -> str:
         "searchDate": search_date,     # YYYY-MM-DD
         "InformCode": inform_code,     # PM10 or PM25
     }
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        r = await client.get(url, params=params)
-        r.raise_for_status()
-        return r.text
+    r = await http_clients.aget("airkorea", url, params=params, timeout=15.0)
+    r.raise_for_status()
+    return r.text
 
 async def fetch_realtime_json(sido_name: str = "서울", num_rows: int = 100, page_no: int = 1) -> dict:
     """
@@ -40,8 +40,7 @@ async def fetch_realtime_json(sido_name: str = "서울", num_rows: int = 100, pa
         "pageNo": str(page_no),
         "ver": "1.0",
     }
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        r = await client.get(url, params=params)
-        r.raise_for_status()
-        return r.json()
+    r = await http_clients.aget("airkorea", url, params=params, timeout=15.0)
+    r.raise_for_status()
+    return r.json()
 
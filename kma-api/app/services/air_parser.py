@@ -1,31 +1,62 @@
 # app/services/air_parser.py
+import io
 import re
-from statistics import mean
 from xml.etree import ElementTree as ET
 
-def parse_seoul_grade(xml_text: str, target_date: str) -> dict:
+# informGrade: "서울 : 보통,제주 : 좋음,..." -> (지역, 등급)
+_GRADE_RE = re.compile(r"\s*([^,:]+?)\s*:\s*([^,]+?)\s*(?:,|$)")
+
+def split_inform_grade(inform_grade: str) -> dict:
+    return {region: grade for region, grade in _GRADE_RE.findall(inform_grade)}
+
+def parse_grade_map(xml_text: str) -> dict:
     """
-    예보 XML에서 informGrade 문자열 중 '서울 : 보통' 같은 부분만 추출
+    예보 XML(getMinuDustFrcstDspth)을 iterparse로 1번만 훑어서
+    날짜(informData) -> {"dataTime", "grades": {지역: 등급}, "raw"} 로 변환
+    - 같은 날짜가 여러 발표에 걸쳐 있으면 문서 순서상 첫 item(최신 발표) 기준
+    - item 처리 후 바로 clear -> 문서 전체 트리를 들고 있지 않음
     """
-    try:
-        root = ET.fromstring(xml_text)
-        items = root.findall(".//item")
-        for it in items:
-            inform_data = (it.findtext("informData") or "").strip()
-            if inform_data != target_date:
-                continue
-
-            data_time = (it.findtext("dataTime") or "").strip()
-            inform_grade = (it.findtext("informGrade") or "").strip()
+    dates = {}
+    for _, el in ET.iterparse(io.BytesIO(xml_text.encode("utf-8")), events=("end",)):
+        if el.tag != "item":
+            continue
+        inform_data = (el.findtext("informData") or "").strip()
+        if inform_data and inform_data not in dates:
+            inform_grade = (el.findtext("informGrade") or "").strip()
+            dates[inform_data] = {
+                "dataTime": (el.findtext("dataTime") or "").strip(),
+                "grades": split_inform_grade(inform_grade),
+                "raw": inform_grade,
+            }
+        el.clear()
+    return dates
 
-            # '서울 : 보통' 패턴 추출 (쉼표로 지역 나열)
-            m = re.search(r"서울\s*:\s*([^,]+)", inform_grade)
-            if not m:
-                return {"ok": False, "reason": "SEOUL_NOT_FOUND", "dataTime": data_time, "raw": inform_grade}
+def grade_from_map(dates: dict, target_date: str, region: str = "서울") -> dict:
+    entry = dates.get(target_date)
+    if entry is None:
+        return {"ok": False, "reason": "DATE_NOT_FOUND"}
+    grade = entry["grades"].get(region)
+    if grade is None:
+        return {"ok": False, "reason": "REGION_NOT_FOUND", "region": region, "dataTime": entry["dataTime"], "raw": entry["raw"]}
+    return {"ok": True, "dataTime": entry["dataTime"], "region": region, "grade": grade}
 
-            return {"ok": True, "dataTime": data_time, "seoulGrade": m.group(1).strip()}
+def seoul_grade_from_map(dates: dict, target_date: str) -> dict:
+    """
+    parse_seoul_grade 와 같은 응답 형태
+    """
+    out = grade_from_map(dates, target_date, "서울")
+    if out["ok"]:
+        return {"ok": True, "dataTime": out["dataTime"], "seoulGrade": out["grade"]}
+    if out["reason"] == "REGION_NOT_FOUND":
+        return {"ok": False, "reason": "SEOUL_NOT_FOUND", "dataTime": out["dataTime"], "raw": out["raw"]}
+    return out
 
-        return {"ok": False, "reason": "DATE_NOT_FOUND"}
+def parse_seoul_grade(xml_text: str, target_date: str) -> dict:
+    """
+    예보 XML에서 informGrade 문자열 중 '서울 : 보통' 같은 부분만 추출
+    """
+    try:
+        return seoul_grade_from_map(parse_grade_map(xml_text), target_date)
     except Exception as e:
         return {"ok": False, "reason": "PARSE_ERROR", "error": str(e)}
 
@@ -41,6 +72,118 @@ def _to_int(v):
     except:
         return None
 
+# 시도별 실시간 측정 API(getCtprvnRltmMesureDnsty) sidoName
+SIDO_NAMES = (
+    "서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종", "경기",
+    "강원", "충북", "충남", "전북", "전남", "경북", "경남", "제주",
+)
+
+# URL에 한글 안 쓰는 클라이언트용 별칭
+SIDO_ALIASES = {
+    "seoul": "서울", "busan": "부산", "daegu": "대구", "incheon": "인천",
+    "gwangju": "광주", "daejeon": "대전", "ulsan": "울산", "sejong": "세종",
+    "gyeonggi": "경기", "gangwon": "강원", "chungbuk": "충북", "chungnam": "충남",
+    "jeonbuk": "전북", "jeonnam": "전남", "gyeongbuk": "경북", "gyeongnam": "경남",
+    "jeju": "제주",
+}
+
+# 인덱스 안 station 튜플 위치
+_PM_POS = {"PM10": 0, "PM25": 1}
+
+
+def normalize_sido(name: str) -> str | None:
+    name = name.strip()
+    if name in SIDO_NAMES:
+        return name
+    return SIDO_ALIASES.get(name.lower())
+
+
+def _percentile(sorted_values: list, q: float):
+    # 선형 보간 (numpy.percentile 기본값과 같은 방식)
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return round(sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo), 1)
+
+
+def _summary(values: list) -> dict | None:
+    if not values:
+        return None
+    values.sort()
+    return {
+        "avg": round(sum(values) / len(values), 1),
+        "min": values[0],
+        "max": values[-1],
+        "p50": _percentile(values, 0.5),
+        "p90": _percentile(values, 0.9),
+        "count": len(values),
+    }
+
+
+def build_station_index(realtime_json: dict) -> dict:
+    """
+    시도 실시간 JSON을 1번만 훑어서
+    - stations: 측정소명 -> (pm10, pm25, dataTime)  => 측정소 조회 O(1)
+    - stats: PM10/PM25 별 avg/min/max/p50/p90 (값 없는 측정소 제외)
+    를 미리 계산. 다음 갱신까지 이 인덱스 하나로 모든 조회를 처리
+    """
+    items = realtime_json["response"]["body"]["items"]
+
+    stations = {}
+    pm10s, pm25s = [], []
+    data_time = None
+    for it in items:
+        name = it.get("stationName")
+        if not name:
+            continue
+        pm10 = _to_int(it.get("pm10Value"))
+        pm25 = _to_int(it.get("pm25Value"))
+        dt = it.get("dataTime")
+        stations[name] = (pm10, pm25, dt)
+        if pm10 is not None:
+            pm10s.append(pm10)
+        if pm25 is not None:
+            pm25s.append(pm25)
+        if data_time is None and (pm10 is not None or pm25 is not None):
+            data_time = dt
+
+    return {
+        "dataTime": data_time,
+        "stations": stations,
+        "stats": {"PM10": _summary(pm10s), "PM25": _summary(pm25s)},
+    }
+
+
+def realtime_from_index(index: dict, kind: str, station: str | None = None) -> dict:
+    """
+    build_station_index 결과에서 pm10/pm25 수치 (parse_seoul_realtime 과 같은 응답 형태)
+    - station 지정되면 그 측정소 값
+    - 없으면 전체 평균(avg) + 최솟값/최댓값/p50/p90
+    """
+    pos = _PM_POS[kind]
+    if station:
+        row = index["stations"].get(station)
+        if row is None or row[pos] is None:
+            return {"ok": False, "reason": "NO_DATA", "kind": kind, "station": station}
+        return {"ok": True, "kind": kind, "dataTime": row[2], "station": station, "value": row[pos]}
+
+    stats = index["stats"][kind]
+    if not stats:
+        return {"ok": False, "reason": "NO_DATA", "kind": kind, "station": station}
+    return {
+        "ok": True,
+        "kind": kind,
+        "dataTime": index["dataTime"],
+        "agg": "avg",
+        "value": stats["avg"],
+        "min": stats["min"],
+        "max": stats["max"],
+        "p50": stats["p50"],
+        "p90": stats["p90"],
+        "count": stats["count"],
+    }
+
+
 def parse_seoul_realtime(realtime_json: dict, kind: str, station: str | None = None) -> dict:
     """
     실시간 JSON에서 pm10/pm25 수치 추출
@@ -49,40 +192,6 @@ def parse_seoul_realtime(realtime_json: dict, kind: str, station: str | None = N
     kind: "PM10" or "PM25"
     """
     try:
-        items = realtime_json["response"]["body"]["items"]
-        key = "pm10Value" if kind == "PM10" else "pm25Value"
-
-        rows = []
-        for it in items:
-            if station and (it.get("stationName") != station):
-                continue
-            rows.append({
-                "stationName": it.get("stationName"),
-                "dataTime": it.get("dataTime"),
-                "value": _to_int(it.get(key)),
-            })
-
-        rows = [r for r in rows if r["value"] is not None]
-        if not rows:
-            return {"ok": False, "reason": "NO_DATA", "kind": kind, "station": station}
-
-        # 대표 dataTime은 첫 row 기준(대부분 동일)
-        data_time = rows[0]["dataTime"]
-
-        if station:
-            return {"ok": True, "kind": kind, "dataTime": data_time, "station": station, "value": rows[0]["value"]}
-
-        values = [r["value"] for r in rows]
-        return {
-            "ok": True,
-            "kind": kind,
-            "dataTime": data_time,
-            "agg": "avg",
-            "value": round(mean(values), 1),
-            "min": min(values),
-            "max": max(values),
-            "count": len(values),
-        }
+        return realtime_from_index(build_station_index(realtime_json), kind, station)
     except Exception as e:
         return {"ok": False, "reason": "PARSE_ERROR", "error": str(e)}
-
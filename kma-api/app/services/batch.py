@@ -0,0 +1,73 @@
+# app/services/batch.py
+"""
+/weather/ultra/batch, /weather/short/batch 공통
+- regions(REGIONS 키/한글명) + points("nx,ny") 를 격자 목록으로 정규화
+- 같은 격자는 1번만 조회 (응답은 요청한 항목마다)
+"""
+import os
+
+from fastapi import HTTPException
+
+from app.services.regions import REGIONS, GRID_NX_MAX, GRID_NY_MAX
+
+# 한 요청에 담을 수 있는 최대 항목 수 / miss를 KMA로 동시에 보낼 최대 개수
+WEATHER_BATCH_MAX_ITEMS = int(os.getenv("WEATHER_BATCH_MAX_ITEMS", "50"))
+WEATHER_BATCH_CONCURRENCY = int(os.getenv("WEATHER_BATCH_CONCURRENCY", "8"))
+
+_BY_NAME = {v["name"]: k for k, v in REGIONS.items()}
+
+
+def _split(values: list[str] | None, sep: str) -> list[str]:
+    out = []
+    for v in values or []:
+        out.extend(x.strip() for x in v.split(sep) if x.strip())
+    return out
+
+
+def parse_targets(regions: list[str] | None, points: list[str] | None):
+    """
+    regions: ["seoul,busan"] / ["seoul", "부산"]  (쉼표 구분 또는 반복)
+    points: ["60,127;98,76"] / ["60,127", "98,76"] (세미콜론 구분 또는 반복)
+    반환: (targets [(label, nx, ny)], errors [항목별 에러])
+    """
+    targets, errors = [], []
+
+    for name in _split(regions, ","):
+        key = name if name in REGIONS else _BY_NAME.get(name)
+        if key is None:
+            errors.append({"target": name, "ok": False, "error": "지원하지 않는 지역입니다"})
+            continue
+        targets.append((name, REGIONS[key]["nx"], REGIONS[key]["ny"]))
+
+    for p in _split(points, ";"):
+        try:
+            nx, ny = (int(x) for x in p.split(","))
+        except ValueError:
+            errors.append({"target": p, "ok": False, "error": "nx,ny 형식이 아닙니다"})
+            continue
+        if not (1 <= nx <= GRID_NX_MAX and 1 <= ny <= GRID_NY_MAX):
+            errors.append({"target": p, "ok": False, "error": "격자 범위를 벗어났습니다"})
+            continue
+        targets.append((p, nx, ny))
+
+    if not targets and not errors:
+        raise HTTPException(status_code=400, detail="regions 또는 points 가 필요합니다")
+    if len(targets) + len(errors) > WEATHER_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"최대 {WEATHER_BATCH_MAX_ITEMS}개까지 요청할 수 있습니다")
+    return targets, errors
+
+
+def item_result(label: str, nx: int, ny: int, res) -> dict:
+    """
+    aget_or_load_many 결과 1개 -> 응답 항목 (실패해도 다른 항목에 영향 없음)
+    """
+    head = {"target": label, "nx": nx, "ny": ny}
+    if isinstance(res, BaseException):
+        detail = getattr(res, "detail", None) or str(res)
+        return {**head, "ok": False, "error": detail}
+
+    value, cached, stale = res
+    if "response" in value or "error" in value:
+        # KMA 에러 응답 (resultCode != 00) - 캐시 안 된 원본
+        return {**head, "ok": False, "cached": cached, "error": value.get("error") or value.get("response", {}).get("header")}
+    return {**head, "ok": True, "cached": cached, "stale": stale, **value}
@@ -0,0 +1,95 @@
+# app/services/conditional.py
+"""
+조건부 GET: ETag / If-None-Match -> 304, Cache-Control
+- ETag = 저장된 행의 content_hash (data 기준) -> 같은 행이면 항상 같은 값
+- 발표가 끝난 과거 데이터는 길게(immutable), 현재 발표는 짧게 캐시
+  -> CDN/브라우저가 반복 요청을 흡수, 재검증도 304(본문 없음)로 끝남
+"""
+import hashlib
+import os
+
+import orjson
+from fastapi import Request, Response
+
+from app.services.time_rules import latest_mid_tmfc, seconds_until_next_release
+
+# 다시 바뀌지 않는 과거 발표/월 데이터
+HTTP_MAX_AGE_IMMUTABLE = int(os.getenv("HTTP_MAX_AGE_IMMUTABLE", "604800"))
+# 현재 발표 (다음 발표 전이라도 이 값보다 길게는 안 줌)
+HTTP_MAX_AGE_CURRENT = int(os.getenv("HTTP_MAX_AGE_CURRENT", "300"))
+
+
+def content_hash(data) -> str:
+    # 행에 저장하는 해시 (키 순서와 무관)
+    return hashlib.sha256(orjson.dumps(data, option=orjson.OPT_SORT_KEYS)).hexdigest()[:32]
+
+
+def etag(hash_value: str) -> str:
+    return f'"{hash_value}"'
+
+
+def etag_matches(if_none_match: str | None, tag: str) -> bool:
+    """
+    If-None-Match 는 약한 비교 (W/ 접두어 무시), "*" 는 항상 일치
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == tag:
+            return True
+    return False
+
+
+def cache_control(immutable: bool, max_age: int | None = None) -> str:
+    """
+    immutable: 과거 발표/월 -> 길게
+    아니면 min(HTTP_MAX_AGE_CURRENT, max_age) (max_age: 보통 다음 발표까지 남은 초)
+    """
+    if immutable:
+        return f"public, max-age={HTTP_MAX_AGE_IMMUTABLE}, immutable"
+    age = HTTP_MAX_AGE_CURRENT if max_age is None else min(HTTP_MAX_AGE_CURRENT, max_age)
+    return f"public, max-age={max(0, age)}"
+
+
+def not_modified(request: Request, hash_value: str | None, cc: str) -> Response | None:
+    """
+    If-None-Match 가 hash_value 와 맞으면 304 응답, 아니면 None
+    """
+    if not hash_value:
+        return None
+    tag = etag(hash_value)
+    if etag_matches(request.headers.get("if-none-match"), tag):
+        return Response(status_code=304, headers={"ETag": tag, "Cache-Control": cc})
+    return None
+
+
+def conditional_json(request: Request, payload: dict, hash_value: str | None, cc: str) -> Response:
+    """
+    304 또는 200(JSON + ETag + Cache-Control)
+    hash_value 가 없으면(에러 payload 등) ETag 없이 no-store
+    """
+    if not hash_value:
+        return Response(content=orjson.dumps(payload), media_type="application/json", headers={"Cache-Control": "no-store"})
+    resp = not_modified(request, hash_value, cc)
+    if resp is not None:
+        return resp
+    return Response(
+        content=orjson.dumps(payload),
+        media_type="application/json",
+        headers={"ETag": etag(hash_value), "Cache-Control": cc},
+    )
+
+
+def mid_cache_control(requested_tmfc: str | None, used_tmfc: str) -> str:
+    """
+    중기예보: tmFc 를 명시한 과거 발표 -> immutable
+    tmFc 생략(최신 발표) / 최신 tmFc / 이전 발표로 폴백한 응답 -> 다음 중기 발표까지만
+    """
+    if requested_tmfc and used_tmfc == requested_tmfc and used_tmfc < latest_mid_tmfc():
+        return cache_control(True)
+    return cache_control(False, seconds_until_next_release("mid_fcst"))
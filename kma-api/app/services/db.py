@@ -1,54 +1,117 @@
 # app/services/db.py
 import os
+import time
 import logging
-from contextlib import contextmanager
+import asyncio
+from contextlib import asynccontextmanager
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import AsyncConnectionPool
+
+from app.services import metrics
 
 log = logging.getLogger(__name__)
 
 
-def get_conn():
-    return psycopg2.connect(
-        host=os.getenv("DB_HOST"),
-        port=int(os.getenv("DB_PORT", "5432")),
-        dbname=os.getenv("DB_NAME"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        sslmode=os.getenv("DB_SSLMODE", "disable"),
-        connect_timeout=3,
-    )
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+
+
+def _conn_params() -> dict:
+    # psycopg(3) 연결 파라미터 (libpq 키워드)
+    schema = os.getenv("DB_SCHEMA", "public").strip() or "public"
+    return {
+        "host": os.getenv("DB_HOST"),
+        "port": int(os.getenv("DB_PORT", "5432")),
+        "dbname": os.getenv("DB_NAME"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "sslmode": os.getenv("DB_SSLMODE", "disable"),
+        "connect_timeout": 3,
+        # 세션 search_path를 DB_SCHEMA로 고정 (연결당 1회)
+        "options": f"-c search_path={schema}",
+    }
+
+
+# =========================
+# 프로세스 전역 커넥션 풀 (psycopg 3 AsyncConnectionPool)
+# - SQL 은 %s 플레이스홀더
+# - 빌리는 동안 이벤트 루프를 막지 않음 -> 업스트림 대기 중에도 다른 요청 처리
+# =========================
+_apool: AsyncConnectionPool | None = None
+_apool_lock = asyncio.Lock()
+
+
+async def get_async_pool() -> AsyncConnectionPool:
+    global _apool
+    if _apool is not None:
+        return _apool
+    async with _apool_lock:
+        if _apool is None:
+            pool = AsyncConnectionPool(
+                kwargs=_conn_params(),
+                min_size=DB_POOL_MIN,
+                max_size=max(1, DB_POOL_MAX, DB_POOL_MIN),
+                timeout=DB_POOL_TIMEOUT,
+                # 대여 전 살아있는지 확인 (죽은 연결은 버리고 새로)
+                check=AsyncConnectionPool.check_connection,
+                open=False,
+            )
+            # wait=False: 부팅 시 DB가 잠깐 늦어도 앱이 안 죽게 (백그라운드로 min_size 채움)
+            await pool.open(wait=False)
+            _apool = pool
+    return _apool
+
+
+async def close_async_pool():
+    global _apool
+    if _apool is not None:
+        await _apool.close()
+        _apool = None
+
+
+def pool_stats() -> dict:
+    # psycopg_pool 통계 (pool_size, pool_available, requests_waiting 등)
+    if _apool is None:
+        return {"initialized": False}
+    return {"initialized": True, **_apool.get_stats()}
 
 
-@contextmanager
-def get_cursor(dict_cursor: bool = True):
-    conn = get_conn()
+@asynccontextmanager
+async def aget_cursor(dict_cursor: bool = True):
+    """
+    커밋/롤백, 깨진 연결 폐기는 psycopg_pool 이 처리
+    (빈 연결이 DB_POOL_TIMEOUT 안에 안 나오면 psycopg_pool.PoolTimeout)
+    """
+    t0 = time.perf_counter()
+    pool = await get_async_pool()
     try:
-        cur = conn.cursor(cursor_factory=RealDictCursor if dict_cursor else None)
-        yield conn, cur
-        conn.commit()
+        async with pool.connection() as conn:
+            async with conn.cursor(row_factory=dict_row if dict_cursor else tuple_row) as cur:
+                yield conn, cur
     except Exception:
-        conn.rollback()
         log.exception("DB query failed")
+        metrics.inc("db_errors_total", 'pool="async"')
         raise
     finally:
-        conn.close()
+        # 연결 대여 대기 + 쿼리 + 커밋
+        metrics.observe("db_query_duration_seconds", 'pool="async"', time.perf_counter() - t0)
 
 
-def fetch_one(sql: str, params: tuple = ()):
-    with get_cursor(dict_cursor=True) as (_, cur):
-        cur.execute(sql, params)
-        return cur.fetchone()
+async def afetch_one(sql: str, params: tuple = ()):
+    async with aget_cursor(dict_cursor=True) as (_, cur):
+        await cur.execute(sql, params)
+        return await cur.fetchone()
 
 
-def fetch_all(sql: str, params: tuple = ()):
-    with get_cursor(dict_cursor=True) as (_, cur):
-        cur.execute(sql, params)
-        return cur.fetchall()
+async def afetch_all(sql: str, params: tuple = ()):
+    async with aget_cursor(dict_cursor=True) as (_, cur):
+        await cur.execute(sql, params)
+        return await cur.fetchall()
 
 
-def execute(sql: str, params: tuple = ()):
-    with get_cursor(dict_cursor=False) as (_, cur):
-        cur.execute(sql, params)
+async def aexecute(sql: str, params: tuple = ()):
+    async with aget_cursor(dict_cursor=False) as (_, cur):
+        await cur.execute(sql, params)
         return cur.rowcount
@@ -1,47 +1,50 @@
 # app/services/kma_client.py
 import os
-import requests
+import httpx
 from typing import Optional
 from fastapi import HTTPException
 
+from app.services import http_clients
+from app.services.breaker import UpstreamRejected, unavailable
 
-def call_kma(url: str, params: dict, timeout: int = 20) -> dict:
-    """
-    KMA API 공통 호출 함수.
-    """
+
+def _kma_params(params: dict) -> dict:
     auth_key = os.getenv("KMA_AUTHKEY")
     if not auth_key:
         raise HTTPException(status_code=500, detail="KMA_AUTHKEY not set")
 
     params = dict(params)
     params["authKey"] = auth_key
+    return params
 
-    try:
-        r = requests.get(url, params=params, timeout=timeout)
-    except requests.RequestException as e:
-        raise HTTPException(status_code=500, detail=str(e))
 
+def _kma_json(r: httpx.Response) -> dict:
     if r.status_code != 200:
         raise HTTPException(status_code=r.status_code, detail=r.text)
 
-    data = r.json()
-    header = data.get("response", {}).get("header", {})
-    if header.get("resultCode") != "00":
-        return data
+    # resultCode != "00" 인 에러 응답도 그대로 반환 (판단은 호출부)
+    return r.json()
 
-    return data
 
-
-def get_mid_temp(
-    regId: str,
-    tmFc: Optional[str] = None,
-    pageNo: int = 1,
-    numOfRows: int = 100,
-) -> dict:
+async def acall_kma(url: str, params: dict, timeout: int = 20) -> dict:
     """
-    중기 기온 조회
+    KMA API 공통 호출 함수 (응답 대기 중 이벤트 루프를 막지 않음)
     """
-    url = "https://apihub.kma.go.kr/api/typ02/openApi/MidFcstInfoService/getMidTa"
+    params = _kma_params(params)
+    try:
+        r = await http_clients.aget("kma", url, params=params, timeout=timeout)
+    except UpstreamRejected as e:
+        raise unavailable(e)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return _kma_json(r)
+
+
+KMA_URL_MID_TA = "https://apihub.kma.go.kr/api/typ02/openApi/MidFcstInfoService/getMidTa"
+KMA_URL_MID_LAND = "https://apihub.kma.go.kr/api/typ02/openApi/MidFcstInfoService/getMidLandFcst"
+
+
+def _mid_params(regId: str, tmFc: Optional[str], pageNo: int, numOfRows: int) -> dict:
     params = {
         "pageNo": pageNo,
         "numOfRows": numOfRows,
@@ -50,11 +53,22 @@ def get_mid_temp(
     }
     if tmFc:
         params["tmFc"] = tmFc
+    return params
 
-    return call_kma(url, params, timeout=20)
+
+async def aget_mid_temp(
+    regId: str,
+    tmFc: Optional[str] = None,
+    pageNo: int = 1,
+    numOfRows: int = 100,
+) -> dict:
+    """
+    중기 기온 조회
+    """
+    return await acall_kma(KMA_URL_MID_TA, _mid_params(regId, tmFc, pageNo, numOfRows), timeout=20)
 
 
-def get_mid_land(
+async def aget_mid_land(
     regId: str,
     tmFc: Optional[str] = None,
     pageNo: int = 1,
@@ -63,15 +77,5 @@ def get_mid_land(
     """
     중기 육상 예보 조회
     """
-    url = "https://apihub.kma.go.kr/api/typ02/openApi/MidFcstInfoService/getMidLandFcst"
-    params = {
-        "pageNo": pageNo,
-        "numOfRows": numOfRows,
-        "dataType": "JSON",
-        "regId": regId,
-    }
-    if tmFc:
-        params["tmFc"] = tmFc
-
-    return call_kma(url, params, timeout=20)
+    return await acall_kma(KMA_URL_MID_LAND, _mid_params(regId, tmFc, pageNo, numOfRows), timeout=20)
 
@@ -0,0 +1,324 @@
+# app/services/metrics.py
+"""
+Prometheus 텍스트 형식 지표 (/metrics)
+- 라우트별 지연 히스토그램, provider별 업스트림 지연/에러, 캐시 prefix별 hit/miss/stale,
+  DB 쿼리 시간 + 풀 상태
+- 요청 경로에서는 워커 메모리 dict 에 더하기만 (I/O 없음, 락 1번)
+- 멀티 워커: 워커마다 METRICS_FLUSH_SECONDS 마다 증가분만 Redis 해시에 HINCRBYFLOAT (pipeline 1번)
+  -> 어느 워커가 scrape 를 받아도 레플리카 전체 합계, 워커가 재시작돼도 카운터가 줄지 않음
+- 풀/in-flight 같은 현재값(gauge)은 워커별 스냅샷 (worker 라벨, 갱신이 끊긴 워커는 제외)
+- Redis 를 못 쓰면 이 워커 값만
+"""
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+
+import orjson
+
+log = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# 0이면 워커 간 합산 안 함 (단일 워커)
+METRICS_REDIS = os.getenv("METRICS_REDIS", "1") == "1"
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+# 레플리카(호스트)마다 따로 -> Prometheus 가 레플리카별로 scrape 해도 중복 합산 안 됨
+METRICS_KEY = os.getenv(
+    "METRICS_KEY", f"{os.getenv('REDIS_PREFIX', 'weather')}:metrics:{socket.gethostname()}"
+)
+# 레플리카가 사라진 뒤 남은 키 정리용
+METRICS_KEY_TTL_SECONDS = int(os.getenv("METRICS_KEY_TTL_SECONDS", "86400"))
+
+# 지연 히스토그램 버킷(초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_LE = [str(b) for b in LATENCY_BUCKETS] + ["+Inf"]
+
+# name -> (type, help)
+METRICS = {
+    "http_requests_total": ("counter", "HTTP requests by route, method and status class"),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency by route"),
+    "upstream_requests_total": ("counter", "Upstream calls by provider and outcome"),
+    "upstream_request_duration_seconds": ("histogram", "Upstream call latency by provider"),
+    "upstream_breaker_rejected_total": ("counter", "Upstream calls failed fast by an open circuit breaker"),
+    "upstream_breaker_transitions_total": ("counter", "Circuit breaker state changes by provider and new state"),
+    "upstream_quota_rejected_total": ("counter", "Upstream calls refused by the shared API key quota"),
+    "upstream_quota_errors_total": ("counter", "Quota checks skipped because Redis was unavailable"),
+    "cache_requests_total": ("counter", "Cache lookups by key prefix and result (hit_l1, hit_l2, miss)"),
+    "cache_stale_total": ("counter", "Stale cache values served by key prefix"),
+    "cache_fallback_total": ("counter", "Previous-release cache values served after an upstream failure"),
+    "db_query_duration_seconds": ("histogram", "DB cursor time (borrow + queries + commit) by pool"),
+    "db_errors_total": ("counter", "DB errors by pool"),
+}
+
+# (series, labels, le) -> 누적값  (series: 카운터 이름 또는 히스토그램 이름 + _bucket/_sum/_count)
+_values: dict = {}
+# Redis 에 이미 더한 값 (다음 flush 는 차이만)
+_flushed: dict = {}
+_lock = threading.Lock()
+_flush_lock = asyncio.Lock()
+_task: asyncio.Task | None = None
+
+
+def _esc(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def labels(**kw) -> str:
+    # 'route="/weather/ultra",method="GET"'
+    return ",".join(f'{k}="{_esc(v)}"' for k, v in kw.items())
+
+
+def _worker() -> str:
+    # fork 이후 값이어야 함 (import 시점에 고정하지 않음)
+    return str(os.getpid())
+
+
+def inc(name: str, lbl: str = "", value: float = 1) -> None:
+    if not METRICS_ENABLED:
+        return
+    k = (name, lbl, "")
+    with _lock:
+        _values[k] = _values.get(k, 0) + value
+
+
+def observe(name: str, lbl: str, seconds: float) -> None:
+    if not METRICS_ENABLED:
+        return
+    # 버킷은 누적 아닌 구간별로 1만 더함 -> 출력할 때 누적
+    b = (name + "_bucket", lbl, _LE[bisect_left(LATENCY_BUCKETS, seconds)])
+    s = (name + "_sum", lbl, "")
+    c = (name + "_count", lbl, "")
+    with _lock:
+        _values[b] = _values.get(b, 0) + 1
+        _values[s] = _values.get(s, 0) + seconds
+        _values[c] = _values.get(c, 0) + 1
+
+
+def _prefix(key: str) -> str:
+    # weather:ultra:... -> weather / dust:raw:... -> dust
+    return key.split(":", 1)[0] or "none"
+
+
+def cache_event(key: str, result: str) -> None:
+    inc("cache_requests_total", labels(prefix=_prefix(key), result=result))
+
+
+def cache_stale(key: str) -> None:
+    inc("cache_stale_total", labels(prefix=_prefix(key)))
+
+
+# =========================
+# 라우트별 지연 (순수 ASGI 미들웨어: BaseHTTPMiddleware 처럼 본문을 감싸지 않음)
+# =========================
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        t0 = time.perf_counter()
+        status = [500]
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            # 라벨은 실제 경로가 아니라 라우트 템플릿 (/weather/mid/land) -> 시계열 수 고정
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            lbl = labels(route=path, method=scope.get("method", ""))
+            observe("http_request_duration_seconds", lbl, time.perf_counter() - t0)
+            inc("http_requests_total", f'{lbl},status="{status[0] // 100}xx"')
+
+
+# =========================
+# gauge (scrape / flush 시점의 현재값)
+# =========================
+def _flat(out: list, name: str, lbl: str, d: dict) -> None:
+    for k, v in d.items():
+        if isinstance(v, bool) or not isinstance(v, (int, float)):
+            continue
+        out.append((f"{name}_{k}", lbl, v))
+
+
+def gauges() -> list:
+    """
+    [(name, labels, value)] - 워커 단위 현재값
+    """
+    # db/http_clients/breaker 가 이 모듈을 import -> 순환 import 피하려고 여기서
+    from app.services import http_clients
+    from app.services.breaker import STATE_VALUE
+    from app.services.db import pool_stats
+    from app.services.l1cache import l1
+
+    out = []
+    pools = pool_stats()
+    _flat(out, "db_pool", labels(pool="async"), pools if pools.get("initialized") else {})
+    for name, s in http_clients.stats()["providers"].items():
+        _flat(out, "upstream", labels(provider=name), {
+            k: s[k] for k in ("in_flight", "connections", "idle", "active") if k in s
+        })
+        # 0=closed 1=half_open 2=open
+        out.append(("upstream_breaker_state", labels(provider=name), STATE_VALUE[s["breaker"]["state"]]))
+    _flat(out, "cache_l1", "", {k: v for k, v in l1.stats().items() if k in ("entries", "bytes")})
+    return out
+
+
+# =========================
+# 워커 간 합산 (Redis)
+# =========================
+def _field(k: tuple) -> str:
+    return "\t".join(k)
+
+
+def _unfield(f) -> tuple:
+    if isinstance(f, bytes):
+        f = f.decode()
+    name, lbl, le = f.split("\t")
+    return name, lbl, le
+
+
+async def flush(r) -> None:
+    """
+    지난 flush 이후 증가분을 Redis 에 더하고, 이 워커의 gauge 스냅샷 저장
+    """
+    async with _flush_lock:
+        with _lock:
+            snap = dict(_values)
+        delta = {k: v - _flushed.get(k, 0) for k, v in snap.items() if v != _flushed.get(k, 0)}
+        pipe = r.pipeline(transaction=False)
+        for k, v in delta.items():
+            pipe.hincrbyfloat(METRICS_KEY, _field(k), v)
+        pipe.hset(f"{METRICS_KEY}:workers", _worker(), orjson.dumps({"ts": time.time(), "gauges": gauges()}))
+        pipe.expire(METRICS_KEY, METRICS_KEY_TTL_SECONDS)
+        pipe.expire(f"{METRICS_KEY}:workers", METRICS_KEY_TTL_SECONDS)
+        await pipe.execute()
+        # 성공했을 때만 -> 실패한 증가분은 다음 flush 에 다시
+        _flushed.update(snap)
+
+
+async def _collect(r) -> tuple[dict, list]:
+    await flush(r)
+    pipe = r.pipeline(transaction=False)
+    pipe.hgetall(METRICS_KEY)
+    pipe.hgetall(f"{METRICS_KEY}:workers")
+    totals, workers = await pipe.execute()
+
+    values = {_unfield(f): float(v) for f, v in totals.items()}
+    out = []
+    cutoff = time.time() - METRICS_FLUSH_SECONDS * 3
+    gone = []
+    for w, raw in workers.items():
+        w = w.decode() if isinstance(w, bytes) else w
+        snap = orjson.loads(raw)
+        if snap["ts"] < cutoff:
+            gone.append(w)
+            continue
+        for name, lbl, v in snap["gauges"]:
+            out.append((name, ",".join(p for p in (lbl, f'worker="{w}"') if p), v))
+    if gone:
+        await r.hdel(f"{METRICS_KEY}:workers", *gone)
+    return values, out
+
+
+def _fmt(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def _line(name: str, lbl: str, v: float) -> str:
+    return f"{name}{{{lbl}}} {_fmt(v)}" if lbl else f"{name} {_fmt(v)}"
+
+
+def render(values: dict, gauge_values: list) -> str:
+    # values: {(series, labels, le): 값} -> 텍스트 형식 0.0.4
+    by_metric: dict = {}
+    for (series, lbl, le), v in values.items():
+        for suffix in ("_bucket", "_sum", "_count", ""):
+            base = series[: len(series) - len(suffix)] if suffix else series
+            if series.endswith(suffix) and base in METRICS:
+                by_metric.setdefault(base, {}).setdefault(lbl, {})[suffix + le] = v
+                break
+
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        rows = by_metric.get(name)
+        if not rows:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for lbl in sorted(rows):
+            row = rows[lbl]
+            if kind != "histogram":
+                lines.append(_line(name, lbl, row.get("", 0)))
+                continue
+            acc = 0
+            for le in _LE:
+                acc += row.get("_bucket" + le, 0)
+                lines.append(_line(f"{name}_bucket", ",".join(p for p in (lbl, f'le="{le}"') if p), acc))
+            lines.append(_line(f"{name}_sum", lbl, row.get("_sum", 0)))
+            lines.append(_line(f"{name}_count", lbl, row.get("_count", 0)))
+
+    seen = set()
+    for name, lbl, v in sorted(gauge_values):
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# TYPE {name} gauge")
+        lines.append(_line(name, lbl, v))
+    return "\n".join(lines) + "\n"
+
+
+async def exposition(r=None) -> str:
+    """
+    /metrics 본문: Redis 합산 (실패하면 이 워커 값만)
+    """
+    if r is not None and METRICS_REDIS:
+        try:
+            values, gauge_values = await _collect(r)
+            return render(values, gauge_values)
+        except Exception:
+            log.warning("metrics: redis aggregation failed, serving this worker only", exc_info=True)
+    with _lock:
+        values = dict(_values)
+    return render(values, [(n, ",".join(p for p in (lbl, f'worker="{_worker()}"') if p), v) for n, lbl, v in gauges()])
+
+
+async def _loop(r) -> None:
+    while True:
+        await asyncio.sleep(METRICS_FLUSH_SECONDS)
+        try:
+            await flush(r)
+        except Exception:
+            log.debug("metrics flush failed", exc_info=True)
+
+
+def start(r) -> None:
+    global _task
+    if not (METRICS_ENABLED and METRICS_REDIS) or METRICS_FLUSH_SECONDS <= 0 or _task is not None:
+        return
+    _task = asyncio.create_task(_loop(r))
+
+
+async def stop(r=None) -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    await asyncio.gather(_task, return_exceptions=True)
+    _task = None
+    # 종료 직전 남은 증가분 반영, 이 워커 gauge 는 제거
+    if r is not None:
+        try:
+            await flush(r)
+            await r.hdel(f"{METRICS_KEY}:workers", _worker())
+        except Exception:
+            pass
@@ -0,0 +1,140 @@
+# app/services/migrations.py
+"""
+DB 스키마 마이그레이션 (테이블 / 유니크 키 / 인덱스)
+- MIGRATIONS 를 버전 순서대로 적용, schema_migrations 에 기록된 버전은 건너뜀
+- 전체를 트랜잭션 1개 + advisory lock 으로 실행 -> 레플리카가 동시에 떠도 1곳만 적용
+- 이미 손으로 만든 테이블이 있어도 깨지지 않게 IF NOT EXISTS 로 작성
+- 이미 적용된 버전은 고치지 말고 새 버전을 뒤에 추가
+
+수동 실행: python -m app.services.migrations
+"""
+import asyncio
+import logging
+import os
+
+from app.services.db import aget_cursor
+
+log = logging.getLogger(__name__)
+
+SCHEMA = os.getenv("DB_SCHEMA", "api")
+
+# 앱에서 자동 적용 (lifespan 시작 시 1번, 실패했으면 새 컬럼을 쓰는 라우트에서 재시도) / 0이면 수동 실행만
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "1") == "1"
+
+# pg_advisory_xact_lock 키 (서비스별로 다르게)
+MIGRATION_LOCK_ID = 7_302_001
+
+MIGRATIONS: list[tuple[int, str, list[str]]] = [
+    (1, "base tables", [
+        f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA}.weather_mid_land (
+            reg_id varchar(16) NOT NULL,
+            tm_fc varchar(12) NOT NULL,
+            base_date date,
+            data jsonb NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now()
+        )
+        """,
+        f"""
+        CREATE TABLE IF NOT EXISTS {SCHEMA}.weather_mid_temp (
+            reg_id varchar(16) NOT NULL,
+            tm_fc varchar(12) NOT NULL,
+            data jsonb NOT NULL,
+            created_at timestamptz NOT NULL DEFAULT now()
+        )
+        """,
+    ]),
+    # 라우트의 ON CONFLICT (reg_id, tm_fc) 대상 = 조회 키
+    (2, "mid forecast unique keys", [
+        f"""
+        CREATE UNIQUE INDEX IF NOT EXISTS weather_mid_land_reg_tmfc_uq
+        ON {SCHEMA}.weather_mid_land (reg_id, tm_fc)
+        """,
+        f"""
+        CREATE UNIQUE INDEX IF NOT EXISTS weather_mid_temp_reg_tmfc_uq
+        ON {SCHEMA}.weather_mid_temp (reg_id, tm_fc)
+        """,
+    ]),
+    # retention 정리용 (오래된 발표 범위 삭제)
+    (3, "mid forecast created_at indexes", [
+        f"""
+        CREATE INDEX IF NOT EXISTS weather_mid_land_created_idx
+        ON {SCHEMA}.weather_mid_land (created_at)
+        """,
+        f"""
+        CREATE INDEX IF NOT EXISTS weather_mid_temp_created_idx
+        ON {SCHEMA}.weather_mid_temp (created_at)
+        """,
+    ]),
+    # ETag 용 (새 행은 앱에서 conditional.content_hash, 기존 행은 md5 로 채움 - 행마다 일정하기만 하면 됨)
+    (4, "mid forecast content_hash", [
+        f"ALTER TABLE {SCHEMA}.weather_mid_land ADD COLUMN IF NOT EXISTS content_hash text",
+        f"ALTER TABLE {SCHEMA}.weather_mid_temp ADD COLUMN IF NOT EXISTS content_hash text",
+        f"UPDATE {SCHEMA}.weather_mid_land SET content_hash = md5(data::text) WHERE content_hash IS NULL",
+        f"UPDATE {SCHEMA}.weather_mid_temp SET content_hash = md5(data::text) WHERE content_hash IS NULL",
+    ]),
+]
+
+_migrated = False
+_lock = asyncio.Lock()
+
+
+async def migrate() -> list[int]:
+    """
+    아직 안 된 버전 적용 -> 이번에 적용한 버전 목록
+    """
+    applied = []
+    async with aget_cursor(dict_cursor=False) as (_, cur):
+        # 락을 먼저: 동시에 뜬 레플리카는 여기서 대기 후 이미 적용된 걸 보고 건너뜀
+        await cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        await cur.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+        await cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {SCHEMA}.schema_migrations (
+                version integer PRIMARY KEY,
+                name text NOT NULL,
+                applied_at timestamptz NOT NULL DEFAULT now()
+            )
+            """
+        )
+        await cur.execute(f"SELECT version FROM {SCHEMA}.schema_migrations")
+        done = {r[0] for r in await cur.fetchall()}
+
+        for version, name, statements in MIGRATIONS:
+            if version in done:
+                continue
+            for sql in statements:
+                await cur.execute(sql)
+            await cur.execute(
+                f"INSERT INTO {SCHEMA}.schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name),
+            )
+            applied.append(version)
+            log.info("migration %s applied: %s", version, name)
+    return applied
+
+
+async def ensure_migrated() -> None:
+    """
+    워커당 1번만 실제로 확인 (시작 시 실패했으면 다음 요청에서 다시 시도, 성공 후엔 바로 return)
+    """
+    global _migrated
+    if _migrated or not DB_AUTO_MIGRATE:
+        return
+    async with _lock:
+        if not _migrated:
+            await migrate()
+            _migrated = True
+
+
+async def startup() -> None:
+    try:
+        await ensure_migrated()
+    except Exception:
+        # 부팅 시 DB가 잠깐 늦어도 앱이 안 죽게 (라우트에서 다시 시도)
+        log.warning("DB migration on startup failed", exc_info=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print({"applied": asyncio.run(migrate())})
@@ -1,6 +1,10 @@
 # regions.py
 # 초단기/단기예보 공통 격자 좌표
 
+# KMA 동네예보 격자 범위 (Lambert 5km 격자)
+GRID_NX_MAX = 149
+GRID_NY_MAX = 253
+
 REGIONS = {
     "seoul": {
         "name": "서울",
@@ -0,0 +1,83 @@
+# app/services/retention.py
+"""
+오래된 중기예보 행 정리 (발표(tm_fc)마다 행이 쌓여서 테이블이 계속 커짐)
+- created_at 이 WEATHER_MID_RETENTION_DAYS 보다 오래된 행 삭제
+  (조회는 최신 발표 위주, 지난 tmFc 를 다시 요청하면 KMA 에서 다시 받아 저장)
+- 레플리카 여러 개면 advisory lock 잡은 1곳만 실행
+
+수동 실행: python -m app.services.retention
+"""
+import asyncio
+import logging
+import os
+import time
+
+from app.services.db import aget_cursor
+
+log = logging.getLogger(__name__)
+
+SCHEMA = os.getenv("DB_SCHEMA", "api")
+
+# 주기(초), 0이면 백그라운드 실행 안 함 (수동 실행만)
+RETENTION_INTERVAL_SECONDS = int(os.getenv("RETENTION_INTERVAL_SECONDS", "86400"))
+WEATHER_MID_RETENTION_DAYS = int(os.getenv("WEATHER_MID_RETENTION_DAYS", "30"))
+
+RETENTION_LOCK_ID = 7_302_002
+
+_TABLES = ("weather_mid_land", "weather_mid_temp")
+
+_task: asyncio.Task | None = None
+
+
+async def prune() -> dict | None:
+    """
+    정리 1회 -> {테이블: 삭제 행 수}, 다른 레플리카가 실행 중이면 None
+    (WEATHER_MID_RETENTION_DAYS=0 이면 아무것도 지우지 않음)
+    """
+    if WEATHER_MID_RETENTION_DAYS <= 0:
+        return {}
+    t0 = time.perf_counter()
+    out = {}
+    async with aget_cursor(dict_cursor=False) as (_, cur):
+        await cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (RETENTION_LOCK_ID,))
+        if not (await cur.fetchone())[0]:
+            return None
+        for table in _TABLES:
+            await cur.execute(
+                f"DELETE FROM {SCHEMA}.{table} WHERE created_at < now() - make_interval(days => %s)",
+                (WEATHER_MID_RETENTION_DAYS,),
+            )
+            out[table] = cur.rowcount
+    out["took_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    log.info("retention done: %s", out)
+    return out
+
+
+async def _loop() -> None:
+    while True:
+        await asyncio.sleep(RETENTION_INTERVAL_SECONDS)
+        try:
+            await prune()
+        except Exception:
+            log.warning("retention failed", exc_info=True)
+
+
+def start() -> None:
+    global _task
+    if RETENTION_INTERVAL_SECONDS <= 0 or WEATHER_MID_RETENTION_DAYS <= 0 or _task is not None:
+        return
+    _task = asyncio.create_task(_loop())
+
+
+async def stop() -> None:
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    await asyncio.gather(_task, return_exceptions=True)
+    _task = None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(prune()))
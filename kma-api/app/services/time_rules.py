@@ -1,28 +1,103 @@
 # app/services/time_rules.py
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple
 
+# 컨테이너는 UTC로 돌기 때문에 naive datetime.now()를 쓰면 base_time이 9시간 어긋남
+# 한국은 서머타임이 없어서 고정 오프셋으로 충분 (slim 이미지에 tzdata 없어도 동작)
+KST = timezone(timedelta(hours=9), "KST")
+
 # KMA 동네예보(단기예보) 발표 시각 (KST 기준)
 VILAGE_FCST_BASE_TIMES = (2, 5, 8, 11, 14, 17, 20, 23)
 
+# KMA 중기예보 발표 시각 (KST 기준)
+MID_FCST_BASE_TIMES = (6, 18)
+
+# 에어코리아 미세먼지 예보(getMinuDustFrcstDspth) 발표 시각 (KST 기준)
+DUST_FCST_BASE_TIMES = (5, 11, 17, 23)
+
+# 발표 후 API에서 조회 가능해지기까지 여유(분)
+ULTRA_NCST_DELAY_MINUTES = 40
+SHORT_FCST_DELAY_MINUTES = 20
+MID_FCST_DELAY_MINUTES = 0
+DUST_FCST_DELAY_MINUTES = 20
+DUST_REALTIME_DELAY_MINUTES = 20
+
+# product -> (발표 시(hour) 목록, 조회 가능까지 지연(분))
+RELEASE_CALENDAR = {
+    "ultra_ncst": (tuple(range(24)), ULTRA_NCST_DELAY_MINUTES),
+    "vilage_fcst": (VILAGE_FCST_BASE_TIMES, SHORT_FCST_DELAY_MINUTES),
+    "mid_fcst": (MID_FCST_BASE_TIMES, MID_FCST_DELAY_MINUTES),
+    "dust_fcst": (DUST_FCST_BASE_TIMES, DUST_FCST_DELAY_MINUTES),
+    "dust_realtime": (tuple(range(24)), DUST_REALTIME_DELAY_MINUTES),
+}
 
-def _floor_to_latest_base_time(now: datetime, base_hours=VILAGE_FCST_BASE_TIMES) -> Tuple[str, str]:
+
+def now_kst() -> datetime:
+    return datetime.now(KST)
+
+
+def _as_kst(now: Optional[datetime]) -> datetime:
     """
-    now 기준, base_hours 중 '가장 최근' 발표시각을 골라 base_date/base_time 반환.
-    예) 12:10 -> 11:00
-        01:10 -> (전날) 23:00
+    None -> 현재 KST
+    naive -> KST 벽시계 시각으로 간주 / aware -> KST로 변환
     """
-    candidates = [
-        now.replace(hour=h, minute=0, second=0, microsecond=0)
-        for h in base_hours
-    ]
-    past = [dt for dt in candidates if dt <= now]
-    if past:
-        chosen = max(past)
-    else:
-        chosen = (now - timedelta(days=1)).replace(hour=23, minute=0, second=0, microsecond=0)
+    if now is None:
+        return now_kst()
+    if now.tzinfo is None:
+        return now.replace(tzinfo=KST)
+    return now.astimezone(KST)
 
-    return chosen.strftime("%Y%m%d"), chosen.strftime("%H%M")
+
+def current_release(product: str, now: Optional[datetime] = None) -> datetime:
+    """
+    지금 조회 가능한 가장 최근 발표시각 (발표 + 지연이 지난 것 중 최신, KST)
+    예) ultra_ncst 12:10 -> 11:00 / 12:45 -> 12:00
+        vilage_fcst 01:10 -> (전날) 23:00
+    """
+    hours, delay = RELEASE_CALENDAR[product]
+    safe_now = _as_kst(now) - timedelta(minutes=delay)
+    for days in (0, 1):
+        day = safe_now - timedelta(days=days)
+        for h in sorted(hours, reverse=True):
+            t = day.replace(hour=h, minute=0, second=0, microsecond=0)
+            if t <= safe_now:
+                return t
+    raise ValueError(f"no release hours for {product}")
+
+
+def previous_release(product: str, now: Optional[datetime] = None) -> datetime:
+    """
+    current_release 바로 전 발표시각 (업스트림 장애 시 직전 발표 캐시로 폴백할 때)
+    예) ultra_ncst 12:45 -> 11:00 / vilage_fcst 12:10 -> 08:00
+    """
+    _, delay = RELEASE_CALENDAR[product]
+    t = current_release(product, now)
+    return current_release(product, t + timedelta(minutes=delay) - timedelta(seconds=1))
+
+
+def next_release(product: str, now: Optional[datetime] = None) -> datetime:
+    """
+    다음 발표분이 조회 가능해지는 시각 (발표시각 + 지연, KST)
+    예) vilage_fcst 12:10 -> 14:20 / 23:30 -> (다음날) 02:20
+    """
+    hours, delay = RELEASE_CALENDAR[product]
+    now = _as_kst(now)
+    for days in (0, 1):
+        day = now + timedelta(days=days)
+        for h in sorted(hours):
+            t = day.replace(hour=h, minute=0, second=0, microsecond=0) + timedelta(minutes=delay)
+            if t > now:
+                return t
+    raise ValueError(f"no release hours for {product}")
+
+
+def seconds_until_next_release(*products: str, now: Optional[datetime] = None) -> int:
+    """
+    여러 product가 섞인 응답이면 가장 먼저 바뀌는 쪽 기준
+    """
+    now = _as_kst(now)
+    nxt = min(next_release(p, now) for p in products)
+    return max(0, int((nxt - now).total_seconds()))
 
 
 def ultra_ncst_base_datetime(now: Optional[datetime] = None) -> Tuple[str, str]:
@@ -30,9 +105,8 @@ def ultra_ncst_base_datetime(now: Optional[datetime] = None) -> Tuple[str, str]:
     초단기 실황(getUltraSrtNcst)
     - 보통 관측/제공 지연을 고려해 now-40분 후 '정시(HH00)' 사용
     """
-    now = now or datetime.now()
-    target = now - timedelta(minutes=40)
-    return target.strftime("%Y%m%d"), target.strftime("%H") + "00"
+    t = current_release("ultra_ncst", now)
+    return t.strftime("%Y%m%d"), t.strftime("%H%M")
 
 
 def short_fcst_base_datetime(now: Optional[datetime] = None) -> Tuple[str, str]:
@@ -41,9 +115,25 @@ def short_fcst_base_datetime(now: Optional[datetime] = None) -> Tuple[str, str]:
     - now-20분 안전버퍼 적용 후
     - 최근 발표시각(0200/0500/...)으로 내림
     """
-    now = now or datetime.now()
-    safe_now = now - timedelta(minutes=20)
-    return _floor_to_latest_base_time(safe_now, VILAGE_FCST_BASE_TIMES)
+    t = current_release("vilage_fcst", now)
+    return t.strftime("%Y%m%d"), t.strftime("%H%M")
+
+
+def next_ultra_ncst_ready(now: Optional[datetime] = None) -> datetime:
+    """
+    초단기 실황 새 base_time(HH00)이 조회 가능해지는 다음 시각 = 매시 40분
+    (ultra_ncst_base_datetime 의 now-40분 규칙과 짝)
+    """
+    return next_release("ultra_ncst", now)
+
+
+def next_short_fcst_ready(now: Optional[datetime] = None) -> datetime:
+    """
+    단기예보 다음 발표분이 조회 가능해지는 시각 = 발표시각 + 20분
+    예) 12:10 -> 14:20
+        23:30 -> (다음날) 02:20
+    """
+    return next_release("vilage_fcst", now)
 
 
 def latest_mid_tmfc(now: Optional[datetime] = None) -> str:
@@ -51,17 +141,7 @@ def latest_mid_tmfc(now: Optional[datetime] = None) -> str:
     중기(tmFc) 기본값: 06:00 또는 18:00 기준 가장 최근 발표시각.
     반환: YYYYMMDDHHMM
     """
-    now = now or datetime.now()
-    hh = now.hour
-
-    if hh < 6:
-        dt = (now - timedelta(days=1)).replace(hour=18, minute=0, second=0, microsecond=0)
-    elif hh < 18:
-        dt = now.replace(hour=6, minute=0, second=0, microsecond=0)
-    else:
-        dt = now.replace(hour=18, minute=0, second=0, microsecond=0)
-
-    return dt.strftime("%Y%m%d%H%M")
+    return current_release("mid_fcst", now).strftime("%Y%m%d%H%M")
 
 
 def prev_mid_tmfc(tmfc: str) -> str:
@@ -81,4 +161,3 @@ def prev_mid_tmfc(tmfc: str) -> str:
         dt = dt.replace(minute=0)
 
     return dt.strftime("%Y%m%d%H%M")
-